@@ -0,0 +1,221 @@
+"""
+Awaitable versions of the ``crud`` functions for ``AsyncSession``.
+
+Each call runs the matching ``crud`` function through ``AsyncSession.run_sync``:
+the query logic stays in one place while the database I/O is awaited on the
+event loop through the async driver instead of occupying a threadpool worker.
+"""
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import changelog, config, crud, invalidation, models, schemas, search as fts, serializers, stats, write_queue
+
+
+def _is_locked(exc: OperationalError) -> bool:
+    return "database is locked" in str(exc.orig) or "database table is locked" in str(exc.orig)
+
+
+async def _write(db: AsyncSession, fn, *args):
+    """
+    Run a crud write, retrying the whole transaction with backoff when SQLite reports a lock,
+    then make the shared cache invalidations its commit deferred (see invalidation.apply_shared).
+
+    busy_timeout already waits for a writer to finish; this covers the case where another
+    worker committed since our transaction's snapshot, which SQLite refuses without waiting.
+    """
+    for attempt in range(config.DB_WRITE_RETRIES + 1):
+        try:
+            result = await db.run_sync(fn, *args)
+        except OperationalError as exc:
+            if attempt == config.DB_WRITE_RETRIES or not _is_locked(exc):
+                raise
+            await db.rollback()
+            await asyncio.sleep(0.01 * 2 ** attempt)
+            continue
+        await invalidation.apply_shared(db.sync_session)
+        return result
+
+
+# Started by main.py when GROUP_COMMIT_ENABLED; until then every write commits on its own
+group_commit = write_queue.WriteQueue(_write)
+
+
+async def _grouped_write(db: AsyncSession, fn, *args):
+    """
+    Like _write, but through the group-commit queue while it runs. The queued write uses the
+    flusher's session rather than ``db``, and its result arrives once its group commits.
+    """
+    if group_commit.running:
+        return await group_commit.submit(fn, *args)
+    return await _write(db, fn, *args)
+
+
+async def get_park(db: AsyncSession, park_id: int) -> Optional[models.Park]:
+    return await db.run_sync(crud.get_park, park_id)
+
+
+async def get_parks(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Park]:
+    return await db.run_sync(crud.get_parks, skip, limit, after_id)
+
+
+async def get_park_row(db: AsyncSession, park_id: int):
+    return await db.run_sync(crud.get_park_row, park_id)
+
+
+async def get_park_rows(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    columns=serializers.PARK_COLUMNS,
+    updated_since: Optional[datetime] = None,
+):
+    return await db.run_sync(crud.get_park_rows, skip, limit, after_id, columns, updated_since)
+
+
+async def get_park_locations(db: AsyncSession):
+    return await db.run_sync(crud.get_park_locations)
+
+
+async def get_park_rows_by_ids(db: AsyncSession, park_ids: List[int], columns=serializers.PARK_COLUMNS):
+    return await db.run_sync(crud.get_park_rows_by_ids, park_ids, columns)
+
+
+async def create_park(db: AsyncSession, park: schemas.ParkCreate) -> models.Park:
+    return await _grouped_write(db, crud.create_park, park)
+
+
+async def bulk_create_parks(db: AsyncSession, rows: List[dict]) -> int:
+    return await _write(db, crud.bulk_create_parks, rows)
+
+
+async def get_existing_park_ids(db: AsyncSession, park_ids: List[int]) -> set:
+    return await db.run_sync(crud.get_existing_park_ids, park_ids)
+
+
+async def update_park(db: AsyncSession, park_id: int, park: schemas.ParkCreate) -> Optional[models.Park]:
+    return await _grouped_write(db, crud.update_park, park_id, park)
+
+
+async def delete_park(db: AsyncSession, park_id: int) -> bool:
+    return await _grouped_write(db, crud.delete_park, park_id)
+
+
+async def get_images_for_parks(db: AsyncSession, park_ids: List[int]):
+    return await db.run_sync(crud.get_images_for_parks, park_ids)
+
+
+async def add_park_image(db: AsyncSession, park_id: int, image: schemas.ParkImageCreate) -> Optional[models.ParkImage]:
+    return await _write(db, crud.add_park_image, park_id, image)
+
+
+async def delete_park_image(db: AsyncSession, park_id: int, image_id: int) -> bool:
+    return await _write(db, crud.delete_park_image, park_id, image_id)
+
+
+async def get_species(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Species]:
+    return await db.run_sync(crud.get_species, skip, limit, after_id)
+
+
+async def get_species_by_id(db: AsyncSession, species_id: int) -> Optional[models.Species]:
+    return await db.run_sync(crud.get_species_by_id, species_id)
+
+
+async def get_species_rows(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    columns=serializers.SPECIES_COLUMNS,
+    updated_since: Optional[datetime] = None,
+):
+    return await db.run_sync(crud.get_species_rows, skip, limit, after_id, columns, updated_since)
+
+
+async def get_species_rows_by_ids(db: AsyncSession, species_ids: List[int], columns=serializers.SPECIES_COLUMNS):
+    return await db.run_sync(crud.get_species_rows_by_ids, species_ids, columns)
+
+
+async def get_species_by_park(db: AsyncSession, park_id: int) -> List[models.Species]:
+    return await db.run_sync(crud.get_species_by_park, park_id)
+
+
+async def get_species_for_parks(db: AsyncSession, park_ids: List[int], per_park: int):
+    return await db.run_sync(crud.get_species_for_parks, park_ids, per_park)
+
+
+async def create_species(db: AsyncSession, species: schemas.SpeciesCreate) -> models.Species:
+    return await _grouped_write(db, crud.create_species, species)
+
+
+async def bulk_create_species(db: AsyncSession, rows: List[dict]) -> int:
+    return await _write(db, crud.bulk_create_species, rows)
+
+
+async def update_species(db: AsyncSession, species_id: int, species: schemas.SpeciesCreate) -> Optional[models.Species]:
+    return await _grouped_write(db, crud.update_species, species_id, species)
+
+
+async def delete_species(db: AsyncSession, species_id: int) -> bool:
+    return await _grouped_write(db, crud.delete_species, species_id)
+
+
+async def get_changes(db: AsyncSession, since: int, limit: int, entities: Sequence[str] = changelog.ENTITIES):
+    return await db.run_sync(changelog.read, since, limit, entities)
+
+
+async def get_recent_species(db: AsyncSession, limit: int, park_id: Optional[int] = None):
+    return await db.run_sync(crud.get_recent_species, limit, park_id)
+
+
+async def get_totals(db: AsyncSession) -> dict:
+    return await db.run_sync(stats.totals)
+
+
+async def get_park_stats(db: AsyncSession, park_id: int):
+    return await db.run_sync(stats.for_park, park_id)
+
+
+async def get_top_parks(db: AsyncSession, limit: int):
+    return await db.run_sync(stats.top_parks, limit)
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[models.User]:
+    return await db.run_sync(crud.get_user_by_username, username)
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    return await db.run_sync(crud.get_user_by_id, user_id)
+
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.User]:
+    return await db.run_sync(crud.get_users, skip, limit, after_id)
+
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: Optional[str] = None) -> models.User:
+    return await _write(db, crud.create_user, user, hashed_password)
+
+
+async def update_user_password(db: AsyncSession, user_id: int, hashed_password: str) -> Optional[models.User]:
+    return await _write(db, crud.update_user_password, user_id, hashed_password)
+
+
+async def update_user_role(db: AsyncSession, user_id: int, role: str) -> Optional[models.User]:
+    return await _grouped_write(db, crud.update_user_role, user_id, role)
+
+
+async def revoke_token(db: AsyncSession, jti: str, expires_at: float) -> None:
+    return await _write(db, crud.revoke_token, jti, expires_at)
+
+
+async def get_rows_count(db: AsyncSession, model) -> int:
+    return await db.run_sync(crud.get_rows_count, model)
+
+
+
+async def search(db: AsyncSession, q: str, kinds=("park", "species"), limit: int = 20, offset: int = 0):
+    return await db.run_sync(fts.search, q, kinds, limit, offset)
\ No newline at end of file
@@ -2,14 +2,17 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app import crud, models
-from app.db import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, config, models, schemas
+from app.db import get_async_db
+from app.user_cache import revoked_tokens, user_cache
 from typing import Dict, Any
+import time
+import uuid
 
 SECRET_KEY = "051020021596_very_secret_key"
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = config.ACCESS_TOKEN_EXPIRE_MINUTES
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
@@ -20,14 +23,12 @@ def create_access_token(data: Dict, expires_delta: timedelta = None) -> str:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": int(time.time()), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> models.User:
+def decode_token(token: str) -> Dict[str, Any]:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -35,17 +36,44 @@ def get_current_user(
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        user = crud.get_user_by_username(db, username=username)
-        if user is None:
-            raise credentials_exception
-        return user
     except JWTError:
         raise credentials_exception
+    if payload.get("sub") is None or revoked_tokens.is_revoked(payload.get("jti")):
+        raise credentials_exception
+    return payload
+
+
+def _principal_from_claims(payload: Dict[str, Any]):
+    # Only trust the claims if the user has not changed since the token was issued
+    if payload.get("uid") is None or payload.get("role") is None:
+        return None
+    if user_cache.changed_since(payload["sub"], payload.get("iat", 0)):
+        return None
+    return schemas.User(id=payload["uid"], username=payload["sub"], role=payload["role"])
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> models.User:
+    payload = decode_token(token)
+    username: str = payload["sub"]
+    if config.AUTH_MODE == "stateless":
+        user = user_cache.get(username) or _principal_from_claims(payload)
+        if user is not None:
+            user_cache.put(user)
+            return user
+    user = await async_crud.get_user_by_username(db, username=username)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if config.AUTH_MODE == "stateless":
+        user_cache.put(schemas.User.model_validate(user, from_attributes=True))
+    return user
 
-def get_admin_user(current_user: models.User = Depends(get_current_user)):
+async def get_admin_user(current_user: models.User = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized, Admin privilages required")
     return current_user
\ No newline at end of file
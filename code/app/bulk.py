@@ -0,0 +1,201 @@
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import config, schemas
+from app.serializers import dump_json
+
+CSV_TYPES = ("text/csv", "application/csv")
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+async def _lines(request: Request) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yield ``(line_number, line)`` from the request body as it arrives.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    number = 0
+    try:
+        async for chunk in request.stream():
+            buffer += decoder.decode(chunk)
+            *complete, buffer = buffer.split("\n")
+            for line in complete:
+                number += 1
+                yield number, line
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail=f"Body is not valid UTF-8 (after line {number})")
+    if buffer:
+        yield number + 1, buffer
+
+
+async def _ndjson_records(lines) -> AsyncIterator[Tuple[int, object]]:
+    async for number, line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, exc
+
+
+async def _csv_records(lines) -> AsyncIterator[Tuple[int, object]]:
+    header = None
+    pending: List[str] = []
+    start = 0
+    async for number, line in lines:
+        if not pending:
+            start = number
+        pending.append(line)
+        record = "\n".join(pending)
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            continue
+        pending = []
+        row = next(csv.reader([record]), [])
+        if not any(field.strip() for field in row):
+            continue
+        if header is None:
+            header = [field.strip() for field in row]
+            continue
+        if len(row) != len(header):
+            # zip() would silently drop extra values or leave trailing columns unset
+            yield start, ValueError(f"Expected {len(header)} fields, got {len(row)}")
+            continue
+        # Empty cells are missing values, not empty strings
+        yield start, {name: value if value != "" else None for name, value in zip(header, row)}
+    if pending:
+        yield start, ValueError("Unterminated quoted field")
+
+
+def records(request: Request) -> AsyncIterator[Tuple[int, object]]:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in CSV_TYPES:
+        return _csv_records(_lines(request))
+    if content_type in NDJSON_TYPES:
+        return _ndjson_records(_lines(request))
+    raise HTTPException(
+        status_code=415, detail="Send the rows as text/csv or application/x-ndjson (one JSON object per line)"
+    )
+
+
+def park_row(record: dict) -> dict:
+    # CSV (and flat NDJSON) rows carry latitude/longitude as columns rather than a location object
+    if "location" not in record and ("latitude" in record or "longitude" in record):
+        record = dict(record, location={"latitude": record.get("latitude"), "longitude": record.get("longitude")})
+    park = schemas.ParkCreate(**record)
+    return {
+        "name": park.name,
+        "description": park.description,
+        "images": [image.model_dump() for image in park.images or []],
+        "latitude": park.location.latitude,
+        "longitude": park.location.longitude,
+    }
+
+
+def species_row(record: dict) -> dict:
+    return schemas.SpeciesCreate(**record).model_dump()
+
+
+def _error(line: int, exc: Exception) -> dict:
+    if isinstance(exc, ValidationError):
+        messages = [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in exc.errors()]
+    else:
+        messages = [str(exc)]
+    return {"line": line, "errors": messages}
+
+
+async def validated_chunks(
+    request: Request, to_row: Callable[[dict], dict], chunk_size: int = config.BULK_CHUNK_SIZE
+) -> AsyncIterator[Tuple[List[Tuple[int, dict]], List[dict]]]:
+    """
+    Parse and validate the streamed body, yielding ``(rows, errors)`` every ``chunk_size`` records.
+
+    ``rows`` are ``(line, row)`` pairs ready for insert(); ``errors`` are per-line reports.
+    """
+    rows: List[Tuple[int, dict]] = []
+    errors: List[dict] = []
+    async for line, record in records(request):
+        try:
+            if isinstance(record, Exception):
+                raise record
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            rows.append((line, to_row(record)))
+        except (ValidationError, ValueError) as exc:
+            errors.append(_error(line, exc))
+        if len(rows) + len(errors) >= chunk_size:
+            yield rows, errors
+            rows, errors = [], []
+    if rows or errors:
+        yield rows, errors
+
+
+class ImportReport:
+    def __init__(self, max_errors: int = config.BULK_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def add_errors(self, errors: List[dict]) -> None:
+        self.failed += len(errors)
+        self.errors.extend(errors[: max(self.max_errors - len(self.errors), 0)])
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+class Related(NamedTuple):
+    """
+    Child rows exported with each row: loaded per fetched batch, passed to ``to_dict`` as its
+    second argument for NDJSON and flattened by ``to_csv`` into one extra CSV column.
+    """
+
+    column: str
+    load: Callable[[AsyncSession, List[int]], Awaitable[Dict[int, list]]]
+    to_csv: Callable[[list], str]
+
+
+async def stream_export(
+    db: AsyncSession, columns, to_dict: Callable, fmt: str, related: Optional[Related] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream every row of ``columns`` as NDJSON or CSV, ``EXPORT_BATCH_SIZE`` rows per fetch.
+
+    The generator owns ``db`` from here on: the dependency has already released it by
+    the time the response body is sent, so the session is closed here when done.
+    """
+    try:
+        statement = select(*columns).order_by(columns[0]).execution_options(yield_per=config.EXPORT_BATCH_SIZE)
+        result = await db.stream(statement)
+        if fmt == "csv":
+            header = [column.key for column in columns] + ([related.column] if related else [])
+            yield (",".join(header) + "\r\n").encode("utf-8")
+        async for partition in result.partitions():
+            children = await related.load(db, [row.id for row in partition]) if related else {}
+            if fmt == "csv":
+                if related:
+                    partition = [tuple(row) + (related.to_csv(children.get(row.id, [])),) for row in partition]
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(partition)
+                yield buffer.getvalue().encode("utf-8")
+            elif related:
+                yield b"".join(dump_json(to_dict(row, children.get(row.id, []))) + b"\n" for row in partition)
+            else:
+                yield b"".join(dump_json(to_dict(row)) + b"\n" for row in partition)
+    finally:
+        await db.close()
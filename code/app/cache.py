@@ -0,0 +1,197 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from app import config
+
+# Response headers that are part of the cached representation
+CACHED_HEADERS = ("x-next-cursor", "x-missing-ids", "x-total-count")
+
+
+class MemoryBackend:
+    """
+    In-process LRU with per-entry TTL. Namespace versions are kept apart so eviction can't reset them.
+    """
+
+    # Each worker process has its own copy
+    shared = False
+
+    def __init__(self, max_entries: int = config.CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def incr_version(self, name: str) -> int:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+
+class RedisBackend:
+    """
+    Backend for any client exposing the redis-py ``get``/``set(ex=)``/``incr`` API
+    (redis-py itself, a fakeredis instance, or another Redis-compatible store).
+
+    The calls block on a network round trip, so ResponseCache makes them from the
+    threadpool rather than on the event loop (see ResponseCache._call).
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "parks-api:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, ex=max(int(ttl), 1))
+
+    def get_version(self, name: str) -> int:
+        return int(self.client.get(f"{self.prefix}version:{name}") or 0)
+
+    def incr_version(self, name: str) -> int:
+        return int(self.client.incr(f"{self.prefix}version:{name}"))
+
+
+def _matching_tag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    The If-None-Match tag that ``etag`` satisfies, or None.
+
+    A client revalidating a compressed response sends the W/ form CompressionMiddleware gave
+    the 200; the 304 repeats that tag so the validator stays the same across the round-trip.
+    """
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == etag or tag == "W/" + etag:
+            return tag
+    return None
+
+
+def _encode_entry(etag: str, headers: dict, body: bytes) -> bytes:
+    header_lines = "".join(f"{name}:{value}\n" for name, value in headers.items())
+    return f"{etag}\n{header_lines}\n".encode("latin-1") + body
+
+
+def _decode_entry(raw: bytes) -> Tuple[str, dict, bytes]:
+    head, _, body = raw.partition(b"\n\n")
+    etag, *header_lines = head.decode("latin-1").split("\n")
+    headers = dict(line.split(":", 1) for line in header_lines if line)
+    return etag, headers, body
+
+
+class ResponseCache:
+    """
+    Caches GET response bodies keyed by route and query, with strong ETags.
+
+    Keys embed a version number per namespace ("parks", "species"), so
+    ``invalidate`` only has to bump a counter for every dependent key to miss.
+    """
+
+    def __init__(self, backend=None, ttl: float = config.CACHE_TTL, max_age: int = config.CACHE_MAX_AGE):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_age = max_age
+
+    @property
+    def shared(self) -> bool:
+        return self.backend is not None and self.backend.shared
+
+    def invalidate(self, *namespaces: str) -> None:
+        if self.backend is not None:
+            for namespace in namespaces:
+                self.backend.incr_version(namespace)
+
+    async def _call(self, fn: Callable, *args):
+        # A shared backend is a network round trip; keep it off the event loop
+        if self.shared:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    def _key(self, request: Request, namespaces: Iterable[str]) -> str:
+        versions = ",".join(f"{ns}={self.backend.get_version(ns)}" for ns in namespaces)
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        return f"response:{versions}:{request.url.path}?{query}"
+
+    def _finish(self, request: Request, etag: str, headers: dict, body: bytes) -> Response:
+        headers = dict(headers, ETag=etag, **{"Cache-Control": f"public, max-age={self.max_age}, must-revalidate"})
+        matched = _matching_tag(request.headers.get("if-none-match"), etag)
+        if matched is not None:
+            return Response(status_code=304, headers=dict(headers, ETag=matched))
+        return Response(body, headers=headers, media_type="application/json")
+
+    async def cached(
+        self, request: Request, namespaces: Iterable[str], build: Callable[[], Awaitable[Response]]
+    ) -> Response:
+        """
+        Serve ``request`` from the cache, or call ``build`` and store its response.
+
+        A hit never calls ``build``, so conditional requests answer 304 without a query.
+        """
+        if self.backend is None:
+            return await build()
+        namespaces = tuple(namespaces)
+        key = await self._call(self._key, request, namespaces)
+        # A client reading its own writes skips entries a lagging replica may have filled since
+        raw = None if getattr(request.state, "primary_sticky", False) else await self._call(self.backend.get, key)
+        if raw is not None:
+            return self._finish(request, *_decode_entry(raw))
+        response = await build()
+        if response.status_code != 200:
+            return response
+        body = bytes(response.body)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        # Built from a replica, the response may predate writes that already invalidated the key
+        ttl = min(self.ttl, config.REPLICA_CACHE_TTL) if getattr(request.state, "replica", None) else self.ttl
+        await self._call(self.backend.set, key, _encode_entry(etag, headers, body), ttl)
+        return self._finish(request, etag, headers, body)
+
+
+def make_backend():
+    if config.CACHE_BACKEND == "memory":
+        return MemoryBackend()
+    if config.CACHE_BACKEND == "redis":
+        return RedisBackend.from_url(config.CACHE_REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(make_backend())
@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+PARK = "park"
+SPECIES = "species"
+ENTITIES = (PARK, SPECIES)
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Any constant works, as long as every writer of the log takes the same one
+_LOCK_KEY = 0x6C6F67
+
+
+def lock(db: Session) -> None:
+    """
+    Make ``db``'s transaction the only one writing the log until it commits or rolls back.
+
+    A sync token is the last change id a reader saw, so ids must become visible in id order:
+    a reader that got past id N+1 would never see an id N committing after it. SQLite runs
+    one write transaction at a time, which guarantees that already. PostgreSQL hands out ids
+    from a sequence in one order and commits in another, so there writers take turns on a
+    transaction-scoped advisory lock instead. Writers call this before their first statement,
+    so nobody waits for the lock while holding row locks the current holder might need.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(_LOCK_KEY)))
+
+
+def record(db: Session, entity: str, ids: Iterable[int], op: str = UPSERT) -> None:
+    """
+    Log that ``ids`` of ``entity`` were written, inside ``db``'s open transaction, so the
+    entries commit (or roll back) together with the write itself.
+
+    Takes the log's lock (see lock()) if the transaction doesn't hold it yet.
+    """
+    rows = [{"entity": entity, "entity_id": entity_id, "op": op} for entity_id in ids]
+    if rows:
+        lock(db)
+        db.execute(insert(models.Change), rows)
+
+
+class Entry(NamedTuple):
+    change_id: int
+    entity: str
+    entity_id: int
+    op: str
+
+
+def read(db: Session, since: int, limit: int, entities: Sequence[str] = ENTITIES) -> Tuple[List[Entry], int, bool]:
+    """
+    The changes after ``since``, at most ``limit`` log rows, collapsed to the latest one per
+    entity and ordered by it. Returns (entries, last change id read, whether more remain).
+
+    Ten updates to the same park between two syncs come back as a single entry, so the
+    payload tracks the number of rows changed rather than the number of writes.
+    """
+    table = models.Change
+    rows = db.execute(
+        select(table.id, table.entity, table.entity_id, table.op)
+        .where(table.id > since, table.entity.in_(entities))
+        .order_by(table.id)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest: Dict[Tuple[str, int], Entry] = {}
+    for row in rows:
+        key = (row.entity, row.entity_id)
+        # Re-inserted so the entity moves to the position of its latest change
+        latest.pop(key, None)
+        latest[key] = Entry(row.id, row.entity, row.entity_id, row.op)
+    return list(latest.values()), rows[-1].id if rows else since, has_more
+
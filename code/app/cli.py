@@ -0,0 +1,139 @@
+"""
+One-shot database commands, kept out of the API workers' startup path.
+
+    python -m app.cli init      # create tables, apply migrations and seed sample data
+    python -m app.cli migrate   # create missing tables and apply pending migrations
+    python -m app.cli seed      # seed sample data into an empty database
+    python -m app.cli status    # show the schema version and pending migrations
+    python -m app.cli replicate replica.db --interval 2   # keep a SQLite read replica (DATABASE_READ_URLS) in sync
+    python -m app.cli rebuild-stats [--check]             # recount the precomputed statistics
+"""
+import argparse
+import sys
+
+
+def cmd_init(args) -> int:
+    from app.db import init_db
+
+    init_db()
+    return 0
+
+
+def cmd_migrate(args) -> int:
+    from app.db import create_schema
+
+    create_schema()
+    return 0
+
+
+def cmd_seed(args) -> int:
+    from app.db import SessionLocal, seed_data
+
+    db = SessionLocal()
+    try:
+        seed_data(db)
+    finally:
+        db.close()
+    return 0
+
+
+def cmd_status(args) -> int:
+    from sqlalchemy import inspect
+
+    from app import migrations
+    from app.db import engine
+
+    with engine.connect() as connection:
+        if not inspect(connection).has_table(migrations.schema_version.name):
+            print("schema version: none (database not initialised)")
+            return 1
+        print(f"schema version: {migrations.current_version(connection)} of {migrations.latest_version()}")
+        waiting = migrations.pending(connection)
+    for number, description in waiting:
+        print(f"pending: {number} {description}")
+    return 1 if waiting else 0
+
+
+def cmd_replicate(args) -> int:
+    import logging
+    import sqlite3
+    import time
+    from contextlib import closing
+
+    from sqlalchemy.engine import make_url
+
+    from app import config, log
+
+    source = make_url(config.DATABASE_URL)
+    if source.get_backend_name() != "sqlite" or source.database in (None, "", ":memory:"):
+        print("replicate copies a SQLite database file; use the server's own replication for PostgreSQL", file=sys.stderr)
+        return 2
+    logger = log.get_logger("app.cli")
+    try:
+        while True:
+            start = time.monotonic()
+            # The backup API writes through SQLite's locking, so replica connections already open
+            # see the new pages on their next transaction instead of a replaced, stale file
+            with closing(sqlite3.connect(source.database)) as src, closing(
+                sqlite3.connect(args.target, timeout=config.SQLITE_BUSY_TIMEOUT_MS / 1000)
+            ) as dst:
+                src.backup(dst)
+            elapsed = time.monotonic() - start
+            log.event(logger, logging.INFO, "replica copied", target=args.target, seconds=round(elapsed, 3))
+            if args.interval <= 0:
+                return 0
+            time.sleep(max(args.interval - elapsed, 0))
+    except KeyboardInterrupt:
+        return 0
+
+
+def cmd_rebuild_stats(args) -> int:
+    import json
+
+    from app import invalidation, stats
+    from app.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.check:
+            drift = stats.check(db)
+        else:
+            drift = stats.rebuild(db)
+            # Cached /stats and list responses may carry the drifted numbers
+            invalidation.namespaces_changed(db, "parks", "species")
+            db.commit()
+    finally:
+        db.close()
+    print(json.dumps(drift, indent=2))
+    return 1 if args.check and (drift["counters"] or drift["parks"]) else 0
+
+
+COMMANDS = {
+    "init": (cmd_init, "create tables, apply migrations and seed sample data"),
+    "migrate": (cmd_migrate, "create missing tables and apply pending migrations"),
+    "seed": (cmd_seed, "seed sample data into an empty database"),
+    "status": (cmd_status, "show the schema version; exits 1 if migrations are pending"),
+    "replicate": (cmd_replicate, "copy the SQLite database to a read replica file, once or every --interval seconds"),
+    "rebuild-stats": (cmd_rebuild_stats, "recount the precomputed statistics and print the drift found"),
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+    parsers = {}
+    for name, (handler, help_text) in COMMANDS.items():
+        parsers[name] = commands.add_parser(name, help=help_text)
+        parsers[name].set_defaults(handler=handler)
+    parsers["replicate"].add_argument("target", help="replica database file")
+    parsers["replicate"].add_argument("--interval", type=float, default=0, help="repeat every N seconds; 0 copies once")
+    parsers["rebuild-stats"].add_argument("--check", action="store_true", help="only report drift; exits 1 if any")
+    args = parser.parse_args(argv)
+    from app import log
+
+    log.configure_logging()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import gzip
+import zlib
+from typing import Optional
+
+from app import config
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick br or gzip from an Accept-Encoding header, honouring q=0 exclusions; None means identity.
+    """
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    for encoding in (("br", "gzip") if brotli is not None else ("gzip",)):
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            # wbits=31 writes a gzip header and trailer around the deflate stream
+            self._zlib = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Flushed per chunk so streamed exports still reach the client as they are produced
+        if self._zlib is not None:
+            return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        return self._brotli.process(data) + self._brotli.flush()
+
+    def finish(self) -> bytes:
+        if self._zlib is not None:
+            return self._zlib.flush()
+        return self._brotli.finish()
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=config.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON, NDJSON and text responses with brotli (when installed)
+    or gzip, per the request's Accept-Encoding.
+
+    Whole bodies under ``minimum_size`` bytes go out as they are. Streamed bodies are
+    compressed chunk by chunk. Strong ETags become weak ones, since the bytes differ from
+    the identity representation; ResponseCache matches W/ tags on revalidation and answers
+    with the tag the client sent. Every compressible response, and every 304, carries
+    ``Vary: Accept-Encoding`` whether or not it was compressed, so a shared cache keeps the
+    encodings apart.
+    """
+
+    def __init__(self, app, minimum_size: int = config.COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else None
+
+        start = None
+        compressor: Optional[_Compressor] = None
+
+        async def send_wrapper(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None and message["type"] == "http.response.body":
+                chunk = compressor.compress(body) if body else b""
+                if not more_body:
+                    chunk += compressor.finish()
+                return await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            if message["type"] != "http.response.body" or start is None:
+                return await send(message)
+
+            response_start, start = start, None
+            headers = response_start.get("headers", [])
+            status = response_start["status"]
+            compressible = status not in (204, 304) and _compressible(headers)
+            if compressible or status == 304:
+                headers = _vary_accept_encoding(headers)
+            if encoding is None or not compressible or (not more_body and len(body) < self.minimum_size):
+                await send(dict(response_start, headers=headers))
+                return await send(message)
+            headers = _encoded_headers(headers, encoding)
+            if more_body:
+                compressor = _Compressor(encoding)
+                await send(dict(response_start, headers=headers))
+                return await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+            body = compress_body(body, encoding)
+            headers.append((b"content-length", str(len(body)).encode("latin-1")))
+            await send(dict(response_start, headers=headers))
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _compressible(headers) -> bool:
+    content_type = b""
+    for name, value in headers:
+        if name == b"content-encoding":
+            return False
+        if name == b"content-type":
+            content_type = value
+    return content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+
+def _vary_accept_encoding(headers) -> list:
+    vary = [value for name, value in headers if name == b"vary"]
+    if any(b"accept-encoding" in value.lower() for value in vary):
+        return list(headers)
+    merged = [(name, value) for name, value in headers if name != b"vary"]
+    merged.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+    return merged
+
+
+def _encoded_headers(headers, encoding: str) -> list:
+    encoded = []
+    for name, value in headers:
+        if name == b"content-length":
+            continue
+        if name == b"etag" and not value.startswith(b"W/"):
+            value = b"W/" + value
+        encoded.append((name, value))
+    encoded.append((b"content-encoding", encoding.encode("latin-1")))
+    return encoded
@@ -0,0 +1,155 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./tunisia_parks.db")
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 20)
+DB_POOL_TIMEOUT = _env_float("DB_POOL_TIMEOUT", 30.0)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+# Create missing tables and apply pending migrations when a worker starts. Seeding is never
+# done at startup, run `python -m app.cli init` once per database instead.
+STARTUP_MIGRATE = os.getenv("STARTUP_MIGRATE", "1") == "1"
+
+# Read replicas: comma-separated database URLs that read-only endpoints are spread over
+# round-robin (empty sends every read to DATABASE_URL). Each is health-checked every
+# REPLICA_HEALTH_INTERVAL seconds and skipped while it fails. A client that wrote reads from
+# the primary for READ_YOUR_WRITES_SECONDS afterwards, and responses built from a replica are
+# cached for at most REPLICA_CACHE_TTL seconds since they may trail the writes that invalidated them.
+DATABASE_READ_URLS = [url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_INTERVAL = _env_float("REPLICA_HEALTH_INTERVAL", 5.0)
+REPLICA_HEALTH_TIMEOUT = _env_float("REPLICA_HEALTH_TIMEOUT", 1.0)
+READ_YOUR_WRITES_SECONDS = _env_float("READ_YOUR_WRITES_SECONDS", 5.0)
+REPLICA_CACHE_TTL = _env_float("REPLICA_CACHE_TTL", 5.0)
+
+# Applied to every new SQLite connection, see db._set_sqlite_pragmas
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_CACHE_SIZE_KB = _env_int("SQLITE_CACHE_SIZE_KB", 64 * 1024)
+SQLITE_MMAP_SIZE = _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+
+# Multi-worker serving (`python -m app.main`): uvicorn worker processes and bind address
+WORKERS = _env_int("WORKERS", 1)
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = _env_int("PORT", 8000)
+# Each worker re-reads the shared invalidation log this often (seconds), which bounds how long
+# another worker's write can leave its caches stale. Rows are pruned after INVALIDATION_RETENTION.
+INVALIDATION_POLL_INTERVAL = _env_float("INVALIDATION_POLL_INTERVAL", 0.5)
+INVALIDATION_RETENTION = _env_float("INVALIDATION_RETENTION", 3600.0)
+# Write transactions retried after SQLite reports "database is locked"
+DB_WRITE_RETRIES = _env_int("DB_WRITE_RETRIES", 5)
+
+# Password hashing. Hashes made with other schemes/rounds are upgraded on the next login.
+PASSWORD_SCHEMES = [s.strip() for s in os.getenv("PASSWORD_SCHEMES", "bcrypt").split(",") if s.strip()]
+BCRYPT_ROUNDS = _env_int("BCRYPT_ROUNDS", 12)
+# Worker processes for hashing; 0 runs hashes in the default thread executor instead
+HASH_POOL_WORKERS = _env_int("HASH_POOL_WORKERS", os.cpu_count() or 1)
+HASH_MAX_CONCURRENCY = _env_int("HASH_MAX_CONCURRENCY", max(HASH_POOL_WORKERS, 1))
+# Hash requests allowed to wait for a slot before new ones are rejected
+HASH_QUEUE_LIMIT = _env_int("HASH_QUEUE_LIMIT", 64)
+
+# "db" looks the user up on every request; "stateless" trusts the signed sub/uid/role claims,
+# backed by the in-process user cache and revocation list in app/user_cache.py
+AUTH_MODE = os.getenv("AUTH_MODE", "db")
+ACCESS_TOKEN_EXPIRE_MINUTES = _env_int("ACCESS_TOKEN_EXPIRE_MINUTES", 30)
+USER_CACHE_TTL = _env_float("USER_CACHE_TTL", 300.0)
+USER_CACHE_MAX_SIZE = _env_int("USER_CACHE_MAX_SIZE", 10000)
+
+# Response cache for public reads: "memory", "redis" (CACHE_REDIS_URL) or "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 1024)
+CACHE_TTL = _env_float("CACHE_TTL", 300.0)
+# Sent to clients; 0 makes them revalidate with If-None-Match every time
+CACHE_MAX_AGE = _env_int("CACHE_MAX_AGE", 0)
+
+# Response compression: br (with the optional brotli package) or gzip, chosen from Accept-Encoding.
+# Bodies smaller than COMPRESSION_MIN_SIZE bytes are sent as they are.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = _env_int("COMPRESSION_MIN_SIZE", 1024)
+COMPRESSION_GZIP_LEVEL = _env_int("COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _env_int("COMPRESSION_BROTLI_QUALITY", 4)
+
+# Token-bucket rate limits as "<requests>/<seconds>" (the bucket also holds <requests> for bursts);
+# an empty value turns that limit off. Backend: "memory" (per worker), "redis" or "none".
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", CACHE_REDIS_URL)
+RATE_LIMIT_MAX_KEYS = _env_int("RATE_LIMIT_MAX_KEYS", 100000)
+RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "30/60")
+RATE_LIMIT_LOGIN_USER = os.getenv("RATE_LIMIT_LOGIN_USER", "10/60")
+RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "10/60")
+RATE_LIMIT_WRITE_USER = os.getenv("RATE_LIMIT_WRITE_USER", "300/60")
+# Each export streams a whole table
+RATE_LIMIT_EXPORT_USER = os.getenv("RATE_LIMIT_EXPORT_USER", "10/60")
+# Key clients by the first X-Forwarded-For address; only enable behind a proxy that sets it
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+# Admission control: requests served at once per worker, how many more may wait for a slot,
+# and for how long, before new ones are shed with 503. 0 disables it.
+MAX_CONCURRENT_REQUESTS = _env_int("MAX_CONCURRENT_REQUESTS", 128)
+ADMISSION_QUEUE_LIMIT = _env_int("ADMISSION_QUEUE_LIMIT", 1024)
+ADMISSION_QUEUE_TIMEOUT = _env_float("ADMISSION_QUEUE_TIMEOUT", 5.0)
+
+# Cell size of the in-memory grid behind GET /parks/nearby
+GEO_CELL_DEGREES = _env_float("GEO_CELL_DEGREES", 0.5)
+
+# Logging (app/log.py): level, "json" or "text", the share of per-request debug lines kept,
+# and the latency above which every request is logged at warning level
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_SAMPLE_RATE = _env_float("LOG_SAMPLE_RATE", 0.01)
+LOG_SLOW_REQUEST_MS = _env_float("LOG_SLOW_REQUEST_MS", 1000.0)
+# Prometheus metrics at /metrics, with per-request latency and SQL timing
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Most ids accepted by one GET /parks/?ids=... or /species/?ids=... batch read
+BATCH_MAX_IDS = _env_int("BATCH_MAX_IDS", 100)
+# Most species embedded per park by ?include=species; species_count still reports the full number
+EMBED_SPECIES_LIMIT = _env_int("EMBED_SPECIES_LIMIT", 50)
+
+# GET /sync: change-log rows read per batch (default and most a client may ask for). Server-sent
+# event streams poll for new changes every SYNC_POLL_INTERVAL seconds, send a comment after
+# SYNC_KEEPALIVE idle seconds so proxies keep them open, and end after SYNC_STREAM_MAX_SECONDS
+# (EventSource reconnects from the last event id), which bounds how long one holds an admission slot.
+SYNC_BATCH_SIZE = _env_int("SYNC_BATCH_SIZE", 500)
+SYNC_MAX_BATCH = _env_int("SYNC_MAX_BATCH", 5000)
+SYNC_POLL_INTERVAL = _env_float("SYNC_POLL_INTERVAL", 1.0)
+SYNC_KEEPALIVE = _env_float("SYNC_KEEPALIVE", 15.0)
+SYNC_STREAM_MAX_SECONDS = _env_float("SYNC_STREAM_MAX_SECONDS", 300.0)
+
+# Group commit (opt-in): admin creates, updates and deletes from concurrent requests are queued
+# and committed together, one transaction per GROUP_COMMIT_MAX_BATCH writes or per
+# GROUP_COMMIT_INTERVAL seconds after a group's first write, whichever comes first.
+GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "0") == "1"
+GROUP_COMMIT_INTERVAL = _env_float("GROUP_COMMIT_INTERVAL", 0.002)
+GROUP_COMMIT_MAX_BATCH = _env_int("GROUP_COMMIT_MAX_BATCH", 64)
+# On shutdown, seconds to let queued writes commit before failing the rest
+GROUP_COMMIT_DRAIN_TIMEOUT = _env_float("GROUP_COMMIT_DRAIN_TIMEOUT", 10.0)
+
+# Bulk import: rows validated and committed per transaction, and how many row errors are reported back
+BULK_CHUNK_SIZE = _env_int("BULK_CHUNK_SIZE", 1000)
+BULK_MAX_ERRORS = _env_int("BULK_MAX_ERRORS", 1000)
+# Rows fetched per round trip by the streaming exports
+EXPORT_BATCH_SIZE = _env_int("EXPORT_BATCH_SIZE", 1000)
+
+# OpenWeatherMap upstream. Point WEATHER_API_URL at a local stub to test without the real API.
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5/weather")
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "1b1c332cdf1e8c7cae8983a059a8b56f")
+WEATHER_TIMEOUT = _env_float("WEATHER_TIMEOUT", 5.0)
+WEATHER_CONNECT_TIMEOUT = _env_float("WEATHER_CONNECT_TIMEOUT", 2.0)
+WEATHER_MAX_CONNECTIONS = _env_int("WEATHER_MAX_CONNECTIONS", 20)
+WEATHER_CACHE_TTL = _env_float("WEATHER_CACHE_TTL", 600.0)
+# How long an expired entry may still be served while a background refresh runs.
+WEATHER_STALE_TTL = _env_float("WEATHER_STALE_TTL", 1800.0)
+# Decimal places kept when keying the cache on coordinates (2 ~= 1km).
+WEATHER_COORD_PRECISION = _env_int("WEATHER_COORD_PRECISION", 2)
+# Coordinates kept in the cache; the least recently used go first once it is full.
+WEATHER_CACHE_MAX_ENTRIES = _env_int("WEATHER_CACHE_MAX_ENTRIES", 10_000)
@@ -1,160 +1,393 @@
 from sqlalchemy.orm import Session
-from app import models, schemas
-from passlib.context import CryptContext
+import logging
+from datetime import datetime
+from app import changelog, hashing, invalidation, log, models, schemas, serializers, stats
 from typing import List, Optional
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm.attributes import set_committed_value
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = log.get_logger(__name__)
 
 
 def get_park(db: Session, park_id: int) -> Optional[models.Park]:
     return db.query(models.Park).filter(models.Park.id == park_id).first()
 
 
-def get_parks(db: Session, skip: int = 0, limit: int = 100) -> List[models.Park]:
-    return db.query(models.Park).offset(skip).limit(limit).all()
+def _page(query, model, skip: int, limit: int, after_id: Optional[int], order_by=None):
+    # Keyset pagination seeks past the last seen id instead of scanning `skip` rows
+    query = query.order_by(model.id if order_by is None else order_by)
+    if after_id is not None:
+        return query.where(model.id > after_id).limit(limit)
+    return query.offset(skip).limit(limit)
 
 
-def create_park(db: Session, park: schemas.ParkCreate):
-    # Create the park in the database
-    db_park = models.Park(
-        name=park.name,
-        description=park.description,
-        images=park.images,
-        latitude=park.location.latitude,  # Assuming location is a nested object with latitude
-        longitude=park.location.longitude  # and longitude
-    )
-    
-    # Add and commit the new park to the database
-    db.add(db_park)
-    db.commit()
-    db.refresh(db_park)
-    
-    # Return the park as a Pydantic model, not the raw SQLAlchemy model
-    return schemas.Park(
-        id=db_park.id,
-        name=db_park.name,
-        description=db_park.description,
-        location=schemas.Location(latitude=db_park.latitude, longitude=db_park.longitude),
-        images=db_park.images,
-        created_at=db_park.created_at,
-        updated_at=db_park.updated_at
-    )
+def get_parks(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Park]:
+    return _page(db.query(models.Park), models.Park, skip, limit, after_id).all()
+
+
+def get_park_row(db: Session, park_id: int):
+    # Column-level select: a plain row, no ORM identity map or attribute instrumentation
+    return db.execute(select(*serializers.PARK_COLUMNS).where(models.Park.id == park_id)).first()
+
+
+def _page_updated_after(query, model, skip: int, limit: int, after_id: Optional[int], updated_since: Optional[datetime]):
+    if updated_since is None:
+        return _page(query, model, skip, limit, after_id)
+    # Recent changes are few, so range over the updated_at index and sort the matches by id.
+    # Ordering by the expression `id + 0` stops SQLite from walking the primary key instead,
+    # which would read every older row to find them.
+    query = query.where(model.updated_at > updated_since)
+    return _page(query, model, skip, limit, after_id, order_by=model.id + 0)
+
+
+def get_park_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    columns=serializers.PARK_COLUMNS,
+    updated_since: Optional[datetime] = None,
+):
+    query = _page_updated_after(select(*columns), models.Park, skip, limit, after_id, updated_since)
+    return db.execute(query).all()
+
+
+def get_park_locations(db: Session):
+    return db.execute(select(models.Park.id, models.Park.latitude, models.Park.longitude)).all()
+
 
+def get_park_rows_by_ids(db: Session, park_ids: List[int], columns=serializers.PARK_COLUMNS):
+    return db.execute(select(*columns).where(models.Park.id.in_(park_ids))).all()
 
 
-def update_park(db: Session, park_id: int, park: schemas.ParkCreate) -> Optional[models.Park]:
-    db_park = get_park(db, park_id)
-    if db_park:
-        db_park.name = park.name
-        if park.location:  # Check if location is provided
-            db_park.latitude = park.location.latitude
-            db_park.longitude = park.location.longitude
-        db_park.description = park.description
-        db_park.images = park.images
+def _park_images(db: Session, park_id: int, images: Optional[List[schemas.ParkImageBase]]) -> List[models.ParkImage]:
+    if not images:
+        return []
+    rows = [dict(image.model_dump(), park_id=park_id, position=position) for position, image in enumerate(images)]
+    return db.scalars(insert(models.ParkImage).returning(models.ParkImage, sort_by_parameter_order=True), rows).all()
+
+
+def _returning(statement):
+    # The row comes back from the write itself instead of a refresh SELECT after commit;
+    # populate_existing updates an instance the session (or an earlier grouped write) already holds
+    return statement.execution_options(populate_existing=True)
+
+
+def create_park(db: Session, park: schemas.ParkCreate, commit: bool = True) -> models.Park:
+    changelog.lock(db)
+    db_park = db.scalar(_returning(insert(models.Park).values(
+        name=park.name,
+        description=park.description,
+        latitude=park.location.latitude,
+        longitude=park.location.longitude,
+    ).returning(models.Park)))
+    images = _park_images(db, db_park.id, park.images)
+    # Loaded without marking the collection changed, and without a lazy load async callers can't do
+    set_committed_value(db_park, "images", images)
+    changelog.record(db, changelog.PARK, [db_park.id])
+    stats.parks_added(db, {db_park.id: len(images)})
+    invalidation.namespaces_changed(db, "parks")
+    if commit:
         db.commit()
-        db.refresh(db_park)
+    return db_park
+
+
+def bulk_create_parks(db: Session, rows: List[dict]) -> int:
+    changelog.lock(db)
+    # One executemany and one commit for the whole chunk instead of a commit and refresh per row
+    galleries = [row.get("images") or [] for row in rows]
+    park_rows = [{key: value for key, value in row.items() if key != "images"} for row in rows]
+    park_ids = db.scalars(insert(models.Park).returning(models.Park.id, sort_by_parameter_order=True), park_rows).all()
+    image_rows = [
+        dict(image, park_id=park_id, position=position)
+        for park_id, gallery in zip(park_ids, galleries)
+        for position, image in enumerate(gallery)
+    ]
+    if image_rows:
+        db.execute(insert(models.ParkImage), image_rows)
+    changelog.record(db, changelog.PARK, park_ids)
+    stats.parks_added(db, {park_id: len(gallery) for park_id, gallery in zip(park_ids, galleries)})
+    invalidation.namespaces_changed(db, "parks")
+    db.commit()
+    return len(rows)
+
+
+def get_existing_park_ids(db: Session, park_ids: List[int]) -> set:
+    return set(db.scalars(select(models.Park.id).where(models.Park.id.in_(park_ids))))
+
+
+def update_park(db: Session, park_id: int, park: schemas.ParkCreate, commit: bool = True) -> Optional[models.Park]:
+    changelog.lock(db)
+    values = {"name": park.name, "description": park.description}
+    if park.location:  # Check if location is provided
+        values.update(latitude=park.location.latitude, longitude=park.location.longitude)
+    db_park = db.scalar(_returning(
+        update(models.Park).where(models.Park.id == park_id).values(**values).returning(models.Park)
+    ))
+    if db_park is None:
+        return None
+    if park.images is not None:
+        # Replaces the whole gallery; append/remove single images through add_park_image/delete_park_image
+        removed = db.execute(delete(models.ParkImage).where(models.ParkImage.park_id == park_id)).rowcount
+        images = _park_images(db, park_id, park.images)
+        stats.images_changed(db, park_id, len(images) - removed)
+    else:
+        images = db.scalars(
+            select(models.ParkImage).where(models.ParkImage.park_id == park_id).order_by(models.ParkImage.position)
+        ).all()
+    set_committed_value(db_park, "images", images)
+    changelog.record(db, changelog.PARK, [park_id])
+    invalidation.namespaces_changed(db, "parks")
+    if commit:
+        db.commit()
+    return db_park
+
+
+def delete_park(db: Session, park_id: int, commit: bool = True) -> bool:
+    changelog.lock(db)
+    if db.scalar(select(models.Park.id).where(models.Park.id == park_id)) is None:
+        return False
+    # Deleting a park detaches its species (park_id is nulled), which syncs as an update of each
+    detached = db.scalars(
+        update(models.Species).where(models.Species.park_id == park_id).values(park_id=None).returning(models.Species.id)
+    ).all()
+    db.execute(delete(models.ParkImage).where(models.ParkImage.park_id == park_id))
+    db.execute(delete(models.Park).where(models.Park.id == park_id))
+    changelog.record(db, changelog.PARK, [park_id], changelog.DELETE)
+    changelog.record(db, changelog.SPECIES, detached)
+    stats.park_removed(db, park_id)
+    invalidation.namespaces_changed(db, "parks", "species")
+    if commit:
+        db.commit()
+    return True
 
-        # Manually return the location details within the park
-        db_park.location = schemas.Location(
-            latitude=db_park.latitude,
-            longitude=db_park.longitude
-        )
 
-        return db_park
-    return None
+def get_images_for_parks(db: Session, park_ids: List[int]):
+    query = (
+        select(*serializers.IMAGE_COLUMNS)
+        .where(models.ParkImage.park_id.in_(park_ids))
+        .order_by(models.ParkImage.park_id, models.ParkImage.position)
+    )
+    return db.execute(query).all()
+
+
+def _touch_park(db: Session, park_id: int) -> bool:
+    # A gallery edit changes the park's representation, so updated_since readers must see it too
+    result = db.execute(update(models.Park).where(models.Park.id == park_id).values(updated_at=func.now()))
+    return result.rowcount > 0
+
+
+def add_park_image(db: Session, park_id: int, image: schemas.ParkImageCreate) -> Optional[models.ParkImage]:
+    """
+    Insert ``image`` into the park's gallery, at ``image.position`` or after the last image.
+
+    Besides the gallery's rows only the park's updated_at is written, and the change log
+    records the park as changed, since its representation did.
+    """
+    changelog.lock(db)
+    if not _touch_park(db, park_id):
+        return None
+    last = db.scalar(select(func.max(models.ParkImage.position)).where(models.ParkImage.park_id == park_id))
+    if last is None or image.position is None or image.position > last:
+        position = 0 if last is None else last + 1
+    else:
+        position = image.position
+        db.execute(
+            update(models.ParkImage)
+            .where(models.ParkImage.park_id == park_id, models.ParkImage.position >= position)
+            .values(position=models.ParkImage.position + 1)
+        )
+    db_image = models.ParkImage(park_id=park_id, position=position, **image.model_dump(exclude={"position"}))
+    db.add(db_image)
+    changelog.record(db, changelog.PARK, [park_id])
+    stats.images_changed(db, park_id, 1)
+    invalidation.namespaces_changed(db, "parks")
+    db.commit()
+    db.refresh(db_image)
+    return db_image
 
 
-def delete_park(db: Session, park_id: int) -> bool:
-    db_park = get_park(db, park_id)
-    if db_park:
-        db.delete(db_park)
+def delete_park_image(db: Session, park_id: int, image_id: int) -> bool:
+    changelog.lock(db)
+    result = db.execute(
+        delete(models.ParkImage).where(models.ParkImage.id == image_id, models.ParkImage.park_id == park_id)
+    )
+    if result.rowcount:
+        _touch_park(db, park_id)
+        changelog.record(db, changelog.PARK, [park_id])
+        stats.images_changed(db, park_id, -1)
+        invalidation.namespaces_changed(db, "parks")
         db.commit()
         return True
+    db.rollback()
     return False
 
 
-def get_species(db: Session, skip: int = 0, limit: int = 100) -> List[models.Species]:
-    return db.query(models.Species).offset(skip).limit(limit).all()
+def get_species(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.Species]:
+    return _page(db.query(models.Species), models.Species, skip, limit, after_id).all()
 
 
 def get_species_by_id(db: Session, species_id: int) -> Optional[models.Species]:
     return db.query(models.Species).filter(models.Species.id == species_id).first()
 
 
-def get_species_by_park(db: Session, park_id: int) -> List[models.Species]:
-    return db.query(models.Species).filter(models.Species.park_id == park_id).all()
+def get_species_rows(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    after_id: Optional[int] = None,
+    columns=serializers.SPECIES_COLUMNS,
+    updated_since: Optional[datetime] = None,
+):
+    query = _page_updated_after(select(*columns), models.Species, skip, limit, after_id, updated_since)
+    return db.execute(query).all()
+
+
+def get_species_rows_by_ids(db: Session, species_ids: List[int], columns=serializers.SPECIES_COLUMNS):
+    return db.execute(select(*columns).where(models.Species.id.in_(species_ids))).all()
 
 
-def create_species(db: Session, species: schemas.SpeciesCreate) -> models.Species:
-    db_species = models.Species(
+def get_species_by_park(db: Session, park_id: int) -> List[models.Species]:
+    # Served in id order straight from the (park_id, id) index, no sort step
+    return db.query(models.Species).filter(models.Species.park_id == park_id).order_by(models.Species.id).all()
+
+
+def get_species_for_parks(db: Session, park_ids: List[int], per_park: int):
+    """
+    First ``per_park`` species of each park plus each park's total, in a single query.
+    """
+    partition = models.Species.park_id
+    ranked = select(
+        *serializers.SPECIES_COLUMNS,
+        func.row_number().over(partition_by=partition, order_by=models.Species.id).label("position"),
+        func.count().over(partition_by=partition).label("total"),
+    ).where(partition.in_(park_ids)).subquery()
+    query = select(ranked).where(ranked.c.position <= per_park).order_by(ranked.c.park_id, ranked.c.id)
+    return db.execute(query).all()
+
+
+def get_recent_species(db: Session, limit: int, park_id: Optional[int] = None):
+    """
+    The ``limit`` most recently added species, newest first, walking the primary key (or the
+    (park_id, id) index for one park) backwards rather than sorting on created_at.
+    """
+    query = select(*serializers.SPECIES_COLUMNS)
+    if park_id is not None:
+        query = query.where(models.Species.park_id == park_id)
+    return db.execute(query.order_by(models.Species.id.desc()).limit(limit)).all()
+
+
+def create_species(db: Session, species: schemas.SpeciesCreate, commit: bool = True) -> models.Species:
+    changelog.lock(db)
+    db_species = db.scalar(_returning(insert(models.Species).values(
         name=species.name,
         scientific_name=species.scientific_name,
         park_id=species.park_id,
         description=species.description,
         image=species.image,
-    )
-    db.add(db_species)
-    db.commit()
-    db.refresh(db_species)
+    ).returning(models.Species)))
+    changelog.record(db, changelog.SPECIES, [db_species.id])
+    stats.species_added(db, [db_species.park_id])
+    invalidation.namespaces_changed(db, "species")
+    if commit:
+        db.commit()
     return db_species
 
 
-def update_species(db: Session, species_id: int, species: schemas.SpeciesCreate) -> Optional[models.Species]:
-    db_species = get_species_by_id(db, species_id)
-    if db_species:
-        db_species.name = species.name
-        db_species.scientific_name = species.scientific_name
-        db_species.park_id = species.park_id
-        db_species.description = species.description
-        db_species.image = species.image
+def bulk_create_species(db: Session, rows: List[dict]) -> int:
+    changelog.lock(db)
+    species_ids = db.scalars(insert(models.Species).returning(models.Species.id, sort_by_parameter_order=True), rows).all()
+    changelog.record(db, changelog.SPECIES, species_ids)
+    stats.species_added(db, [row.get("park_id") for row in rows])
+    invalidation.namespaces_changed(db, "species")
+    db.commit()
+    return len(rows)
+
+
+def update_species(db: Session, species_id: int, species: schemas.SpeciesCreate, commit: bool = True) -> Optional[models.Species]:
+    changelog.lock(db)
+    current = db.execute(select(models.Species.park_id).where(models.Species.id == species_id)).first()
+    if current is None:
+        return None
+    stats.species_moved(db, current.park_id, species.park_id)
+    db_species = db.scalar(_returning(update(models.Species).where(models.Species.id == species_id).values(
+        name=species.name,
+        scientific_name=species.scientific_name,
+        park_id=species.park_id,
+        description=species.description,
+        image=species.image,
+    ).returning(models.Species)))
+    changelog.record(db, changelog.SPECIES, [species_id])
+    invalidation.namespaces_changed(db, "species")
+    if commit:
         db.commit()
-        db.refresh(db_species)
-        return db_species
-    return None
+    return db_species
 
 
-def delete_species(db: Session, species_id: int) -> bool:
-    db_species = get_species_by_id(db, species_id)
-    if db_species:
-        db.delete(db_species)
+def delete_species(db: Session, species_id: int, commit: bool = True) -> bool:
+    changelog.lock(db)
+    deleted = db.execute(
+        delete(models.Species).where(models.Species.id == species_id).returning(models.Species.park_id)
+    ).first()
+    if deleted is None:
+        return False
+    changelog.record(db, changelog.SPECIES, [species_id], changelog.DELETE)
+    stats.species_removed(db, deleted.park_id)
+    invalidation.namespaces_changed(db, "species")
+    if commit:
         db.commit()
-        return True
-    return False
+    return True
 
 
 def get_user_by_username(db: Session, username: str) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.username == username).first()
 
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    print(f"Trying to create user {user.username}")
-    hashed_password = pwd_context.hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None) -> models.User:
+    if hashed_password is None:
+        hashed_password = hash_password(user.password)
     db_user = models.User(username=user.username, password=hashed_password)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    print(f"user {db_user.username} created with id {db_user.id}")
+    log.event(logger, logging.INFO, "user created", username=db_user.username, user_id=db_user.id)
     return db_user
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.id == user_id).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[models.User]:
+    return _page(db.query(models.User), models.User, skip, limit, after_id).all()
 
-def update_user_role(db: Session, user_id: int, role:str) -> Optional[models.User]:
+def update_user_password(db: Session, user_id: int, hashed_password: str) -> Optional[models.User]:
   db_user = get_user_by_id(db, user_id)
   if db_user:
-    db_user.role = role
+    db_user.password = hashed_password
     db.commit()
     db.refresh(db_user)
     return db_user
   return None
 
+def update_user_role(db: Session, user_id: int, role:str, commit: bool = True) -> Optional[models.User]:
+  db_user = db.scalar(_returning(update(models.User).where(models.User.id == user_id).values(role=role).returning(models.User)))
+  if db_user:
+    # Tokens still carry the old role claim, stop trusting them in stateless auth
+    invalidation.user_changed(db, db_user.username)
+    if commit:
+      db.commit()
+    return db_user
+  return None
+
+def revoke_token(db: Session, jti: str, expires_at: float) -> None:
+    invalidation.token_revoked(db, jti, expires_at)
+    db.commit()
+
+def hash_password(password: str) -> str:
+    return hashing.hash_password_sync(password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    print(f"plain_password = {plain_password}, hashed_password = {hashed_password}")
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.get_context().verify(plain_password, hashed_password)
 
 
 def get_rows_count(db:Session, model):
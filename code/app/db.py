@@ -1,24 +1,163 @@
-from sqlalchemy import create_engine
+import time
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.models import Base, Park, Species, User # Import Park from models
-from app import crud, schemas
+from app import config, crud, log, metrics, migrations, replicas, schemas
 from typing import List
 from sqlalchemy import func
+import logging
 
 
-DATABASE_URL = "sqlite:///./tunisia_parks.db"
+DATABASE_URL = config.DATABASE_URL
+
+logger = log.get_logger(__name__)
+
+
+class TimedQueuePool(metrics.TimedCheckout, QueuePool):
+    metrics_name = "sync"
+    # Keep pool logging under "sqlalchemy.pool" instead of this module's "app.*" loggers
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+
+class TimedAsyncQueuePool(metrics.TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers keep going while a writer commits
+        cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(
+    url: str = DATABASE_URL, pool_size: int = config.DB_POOL_SIZE, max_overflow: int = config.DB_MAX_OVERFLOW
+) -> Engine:
+    """
+    Create an engine tuned for the backend in ``url`` (SQLite pragmas or a PostgreSQL pool).
+    """
+    if url.startswith("sqlite"):
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            # In-memory databases live on a single connection, keep SQLAlchemy's default pool
+            engine = create_engine(url, echo=config.DB_ECHO, connect_args={"check_same_thread": False})
+        else:
+            engine = create_engine(
+                url,
+                echo=config.DB_ECHO,
+                connect_args={"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000},
+                poolclass=TimedQueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=config.DB_POOL_TIMEOUT,
+            )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+    return create_engine(
+        url,
+        echo=config.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        # Drop connections the server or a proxy closed while they sat idle in the pool
+        pool_pre_ping=True,
+    )
+
+
+def to_async_url(url: str) -> str:
+    """
+    Map a sync database URL onto its async driver (aiosqlite / asyncpg).
+    """
+    backend, sep, rest = url.partition("://")
+    dialect = backend.split("+", 1)[0]
+    driver = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}.get(dialect, backend)
+    return f"{driver}{sep}{rest}"
+
+
+def create_async_db_engine(
+    url: str = DATABASE_URL, pool_size: int = config.DB_POOL_SIZE, max_overflow: int = config.DB_MAX_OVERFLOW
+) -> AsyncEngine:
+    """
+    Async counterpart of create_db_engine, with the same pool settings and SQLite pragmas.
+    """
+    async_url = to_async_url(url)
+    if url.startswith("sqlite"):
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            engine = create_async_engine(async_url, echo=config.DB_ECHO)
+        else:
+            engine = create_async_engine(
+                async_url,
+                echo=config.DB_ECHO,
+                connect_args={"timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000},
+                # aiosqlite defaults to NullPool, which would reconnect and rerun the pragmas per request
+                poolclass=TimedAsyncQueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=config.DB_POOL_TIMEOUT,
+            )
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return engine
+    return create_async_engine(
+        async_url,
+        echo=config.DB_ECHO,
+        poolclass=TimedAsyncQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
 
 # Initialize the SQLAlchemy engine and session
-engine = create_engine(DATABASE_URL)
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the request handlers; the sync one stays for seeding and scripts
+async_engine = create_async_db_engine()
+# Objects stay usable after commit: lazy refreshes are not possible outside the session's greenlet
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
-def init_db():
+# Engines for DATABASE_READ_URLS; empty unless replicas are configured
+read_replicas = replicas.ReplicaSet.from_urls(config.DATABASE_READ_URLS, create_async_db_engine)
+
+if config.METRICS_ENABLED:
+    metrics.instrument_engine(engine, "sync")
+    metrics.instrument_engine(async_engine.sync_engine, "async")
+    for index, replica in enumerate(read_replicas.replicas):
+        metrics.instrument_engine(replica.engine.sync_engine, f"replica{index}")
+
+
+def create_schema():
     """
-    Initialize the database by creating all tables and seeding data.
+    Create missing tables and apply pending migrations. Cheap once the schema is current.
     """
-    print('Attempting to create tables')
     Base.metadata.create_all(bind=engine)
+    applied = migrations.migrate(engine)
+    if applied:
+        log.event(logger, logging.INFO, "migrations applied", versions=applied)
+
+
+def init_db():
+    """
+    Initialize the database by creating the schema and seeding data (see app/cli.py).
+    """
+    create_schema()
     db = SessionLocal()
     try:
         seed_data(db)
@@ -30,7 +169,6 @@ def get_db():
     """
     Dependency for getting a new database session.
     """
-    print(f"trying to get db session")
     db = SessionLocal()
     try:
         yield db
@@ -38,15 +176,57 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency for getting a new async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_write_db(request: Request, db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    """
+    Dependency for handlers that write: a primary session. Flags the request so that
+    replicas.ReadYourWritesMiddleware keeps this client's reads on the primary for a while.
+    """
+    request.state.wrote_primary = True
+    return db
+
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    """
+    Dependency for read-only handlers: a session on the next healthy replica, or on the
+    primary when none is configured or healthy, or the client wrote within READ_YOUR_WRITES_SECONDS.
+    """
+    replica = None
+    if read_replicas.replicas:
+        if replicas.sticky_until(request.cookies) > time.time():
+            request.state.primary_sticky = True
+        else:
+            replica = read_replicas.choose()
+    if replica is None:
+        metrics.db_read_sessions.inc("primary")
+        yield primary
+        return
+    request.state.replica = replica.name
+    metrics.db_read_sessions.inc(replica.name)
+    async with replica.sessionmaker() as db:
+        try:
+            yield db
+        except OperationalError as exc:
+            # Unreachable or mid-copy; keep requests off it until the next health check passes
+            replica.mark(False, reason=str(exc.orig))
+            raise
+
+
 def seed_data(db):
     """
     Seed the database with initial data if not already present.
     """
     # Check if data is already present
-    print("Seed data method has started")
-    print(f"current row count = {crud.get_rows_count(db, Park)}")
-    if crud.get_rows_count(db, Park) > 0:
-        print("Parks are found in the database, existing seed data method")
+    park_count = crud.get_rows_count(db, Park)
+    if park_count > 0:
+        log.event(logger, logging.DEBUG, "seed skipped", parks=park_count)
         return
 
     # Define initial parks data
@@ -55,13 +235,13 @@ def seed_data(db):
             name="Ichkeul National Park",
             location=schemas.Location(latitude=37.15, longitude=9.666),
             description="A beautiful national park in northern Tunisia.",
-            images="https://example.com/ichkeul1.jpg,https://example.com/ichkeul2.jpg"
+            images=["https://example.com/ichkeul1.jpg", "https://example.com/ichkeul2.jpg"]
         ),
         schemas.ParkCreate(
             name="Boukornine National Park",
             location=schemas.Location(latitude=36.742, longitude=10.266),
             description="A national park with unique mountains and flora",
-            images="https://example.com/boukornine1.jpg,https://example.com/boukornine2.jpg"
+            images=["https://example.com/boukornine1.jpg", "https://example.com/boukornine2.jpg"]
         ),
     ]
 
@@ -109,16 +289,15 @@ def seed_data(db):
     # Create parks
     for park_data in initial_parks:
         park = crud.create_park(db, park_data)
-        print(f"park {park.name} created with id {park.id}")
+        log.event(logger, logging.INFO, "park seeded", name=park.name, park_id=park.id)
 
     # Create species
     for species_data in initial_species:
         species = crud.create_species(db, species_data)
-        print(f"species {species.name} created with id {species.id}")
+        log.event(logger, logging.INFO, "species seeded", name=species.name, species_id=species.id)
 
     # Create users and set admin role if applicable
     for user_data in initial_users:
         user = crud.create_user(db, user_data)
-        print(f"user {user.username} created with id {user.id}")
         if user.username == "admin_user_789":
             crud.update_user_role(db, user.id, role="admin")
\ No newline at end of file
@@ -0,0 +1,128 @@
+import asyncio
+import heapq
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app import config
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+BRUTE_FORCE_MAX_POINTS = 4096
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Fixed-size lat/lon grid of points for nearest-within-radius queries.
+    """
+
+    def __init__(self, points: Iterable[Tuple[int, float, float]], cell_degrees: float = config.GEO_CELL_DEGREES):
+        self.cell = cell_degrees
+        self.lat_cells = int(math.ceil(180 / cell_degrees)) + 1
+        self.lon_cells = int(math.ceil(360 / cell_degrees))
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, float, float]]] = defaultdict(list)
+        self.size = 0
+        for point_id, lat, lon in points:
+            if lat is None or lon is None:
+                continue
+            self.cells[self._cell(lat, lon)].append((point_id, lat, lon))
+            self.size += 1
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor((lat + 90) / self.cell)), int(math.floor((lon + 180) / self.cell)) % self.lon_cells
+
+    def _ring(self, row0: int, col0: int, ring: int):
+        rows = range(max(row0 - ring, 0), min(row0 + ring, self.lat_cells - 1) + 1)
+        for row in rows:
+            if ring == 0 or abs(row - row0) == ring:
+                cols = range(col0 - ring, col0 + ring + 1)
+            else:
+                cols = (col0 - ring, col0 + ring)
+            for col in cols:
+                yield row, col % self.lon_cells
+
+    def nearby(self, lat: float, lon: float, radius_km: float, limit: int) -> List[Tuple[float, int]]:
+        """
+        Return up to ``limit`` ``(distance_km, id)`` pairs within ``radius_km``, nearest first.
+
+        Cells are visited in square rings around the query cell; the search stops
+        once the ``limit``-th best match is closer than anything in the next ring.
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        max_lat = min(abs(lat) + dlat, 90.0)
+        cos_lat = math.cos(math.radians(max_lat))
+        dlon = 180.0 if cos_lat < 1e-9 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+        max_ring = int(math.ceil(max(dlat, dlon) / self.cell)) + 1
+        # Smallest distance one ring step can cover: a cell's lon width at the highest reachable latitude
+        step_km = self.cell * KM_PER_DEGREE * cos_lat
+        if self.size <= BRUTE_FORCE_MAX_POINTS and (2 * max_ring + 1) ** 2 > self.size:
+            # Few points spread over many cells: scoring all of them beats walking empty rings
+            matches = (
+                (haversine_km(lat, lon, plat, plon), point_id)
+                for points in self.cells.values()
+                for point_id, plat, plon in points
+            )
+            return heapq.nsmallest(limit, (match for match in matches if match[0] <= radius_km))
+        row0, col0 = self._cell(lat, lon)
+        best: List[Tuple[float, int]] = []  # max-heap on distance via negation
+        seen = set() if 2 * max_ring + 1 >= self.lon_cells else None
+        unvisited = len(self.cells)
+        for ring in range(max_ring + 1):
+            if unvisited == 0 or (len(best) >= limit and -best[0][0] <= (ring - 1) * step_km):
+                break
+            for key in self._ring(row0, col0, ring):
+                if seen is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                points = self.cells.get(key)
+                if not points:
+                    continue
+                unvisited -= 1
+                for point_id, plat, plon in points:
+                    if abs(plat - lat) > dlat:
+                        continue
+                    distance = haversine_km(lat, lon, plat, plon)
+                    if distance > radius_km:
+                        continue
+                    if len(best) < limit:
+                        heapq.heappush(best, (-distance, point_id))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, point_id))
+        return sorted((-negated, point_id) for negated, point_id in best)
+
+
+class ParkLocator:
+    """
+    Lazily (re)built GridIndex over park coordinates. crud marks it stale on every park write.
+    """
+
+    def __init__(self):
+        self._index: Optional[GridIndex] = None
+        self._stale = True
+        self._lock: Optional[asyncio.Lock] = None
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    async def get_index(self, load_points) -> GridIndex:
+        if self._stale or self._index is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._stale or self._index is None:
+                    # Clear the flag first so a write landing during the load marks it stale again
+                    self._stale = False
+                    self._index = GridIndex(await load_points())
+        return self._index
+
+
+park_locator = ParkLocator()
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from app import config, metrics
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+_context: Optional["CryptContext"] = None
+
+
+class HashPoolBusy(Exception):
+    """
+    Raised when more hash requests are waiting than HASH_QUEUE_LIMIT allows.
+    """
+
+
+def get_context() -> "CryptContext":
+    global _context
+    if _context is None:
+        # Imported on first use: workers that never hash a password skip passlib's import cost
+        from passlib.context import CryptContext
+
+        _context = CryptContext(
+            schemes=config.PASSWORD_SCHEMES,
+            deprecated="auto",
+            bcrypt__rounds=config.BCRYPT_ROUNDS,
+        )
+    return _context
+
+
+# Module-level so they can be pickled into worker processes
+def hash_password_sync(password: str) -> str:
+    return get_context().hash(password)
+
+
+def verify_and_update_sync(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash uses an outdated scheme or work factor, return a new one.
+    """
+    context = get_context()
+    if not context.verify(password, hashed_password):
+        return False, None
+    if context.needs_update(hashed_password):
+        return True, context.hash(password)
+    return True, None
+
+
+class HashPool:
+    """
+    Bounded process pool for password hashing with its own concurrency limit and queue metrics.
+    """
+
+    def __init__(
+        self,
+        workers: int = config.HASH_POOL_WORKERS,
+        max_concurrency: int = config.HASH_MAX_CONCURRENCY,
+        queue_limit: int = config.HASH_QUEUE_LIMIT,
+    ):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_limit = queue_limit
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {
+            "queued": 0,
+            "running": 0,
+            "completed": 0,
+            "rejected": 0,
+            "wait_seconds_total": 0.0,
+            "run_seconds_total": 0.0,
+        }
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.stats["queued"] >= self.queue_limit:
+            self.stats["rejected"] += 1
+            raise HashPoolBusy()
+        self.stats["queued"] += 1
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.stats["queued"] -= 1
+        started_at = time.perf_counter()
+        self.stats["wait_seconds_total"] += started_at - queued_at
+        self.stats["running"] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._semaphore.release()
+            self.stats["running"] -= 1
+            self.stats["completed"] += 1
+            self.stats["run_seconds_total"] += time.perf_counter() - started_at
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pool = HashPool()
+
+
+def _collect_pool_stats() -> None:
+    for stat, value in pool.stats.items():
+        metrics.hash_pool.set(stat, value=value)
+
+
+metrics.registry.add_collector(_collect_pool_stats)
+
+
+async def hash_password(password: str) -> str:
+    return await pool.run(hash_password_sync, password)
+
+
+async def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await pool.run(verify_and_update_sync, password, hashed_password)
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import config, log, models
+from app.cache import response_cache
+from app.geo import park_locator
+from app.user_cache import revoked_tokens, user_cache
+
+NAMESPACE = "namespace"
+USER = "user"
+TOKEN = "token"
+
+_PENDING = "pending_invalidations"
+_SHARED = "shared_invalidations"
+
+logger = log.get_logger(__name__)
+
+
+def _publish(db: Session, kind: str, key: str, expires_at: Optional[float] = None) -> None:
+    now = time.time()
+    expires_at = now if expires_at is None else expires_at
+    db.add(models.Invalidation(kind=kind, key=key, created_at=now, expires_at=expires_at))
+    db.info.setdefault(_PENDING, []).append((kind, key, now, expires_at))
+
+
+def namespaces_changed(db: Session, *namespaces: str) -> None:
+    """
+    Record that cached reads of ``namespaces`` are stale, inside ``db``'s open transaction.
+
+    This process applies it as soon as the transaction commits; the other workers
+    pick it up from the invalidations table on their next poll.
+    """
+    for namespace in namespaces:
+        _publish(db, NAMESPACE, namespace)
+
+
+def user_changed(db: Session, username: str) -> None:
+    # Kept while tokens issued before the change could still be presented
+    _publish(db, USER, username, time.time() + config.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def token_revoked(db: Session, jti: str, expires_at: float) -> None:
+    _publish(db, TOKEN, jti, expires_at)
+
+
+def apply(kind: str, key: str, created_at: float, expires_at: float, remote: bool = False) -> None:
+    if kind == NAMESPACE:
+        # A shared (Redis) backend already saw the writer's version bump
+        if not (remote and response_cache.shared):
+            response_cache.invalidate(key)
+        if key == "parks":
+            park_locator.invalidate()
+    elif kind == USER:
+        user_cache.invalidate(key, at=created_at)
+    elif kind == TOKEN:
+        revoked_tokens.revoke(key, expires_at)
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    # Under AsyncSession this runs on the event loop, where a Redis version bump would block
+    # it; those are left for async_crud to make through apply_shared once the commit returns
+    defer = response_cache.shared and _on_event_loop()
+    for change in session.info.pop(_PENDING, ()):
+        kind, key = change[0], change[1]
+        if defer and kind == NAMESPACE:
+            session.info.setdefault(_SHARED, set()).add(key)
+            apply(*change, remote=True)
+        else:
+            apply(*change)
+
+
+async def apply_shared(session: Session) -> None:
+    """
+    Bump the shared cache versions a commit on ``session`` deferred, from the threadpool.
+    """
+    namespaces = session.info.pop(_SHARED, None)
+    if namespaces:
+        await run_in_threadpool(response_cache.invalidate, *sorted(namespaces))
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+class InvalidationPoller:
+    """
+    Replays the invalidations other workers committed, so per-process caches stay coherent.
+
+    The log id doubles as a database-wide version counter: each poll reads the rows
+    past the last id this worker has seen. Changes made in this worker are applied
+    on commit and again when polled, which is harmless.
+    """
+
+    def __init__(self, interval: float = config.INVALIDATION_POLL_INTERVAL):
+        self.interval = interval
+        self.last_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._polls = 0
+
+    def _rows(self, db: Session) -> List[Tuple]:
+        table = models.Invalidation
+        columns = (table.id, table.kind, table.key, table.created_at, table.expires_at)
+        if self.last_id is None:
+            # Fresh process: caches start empty, only replay what still affects authentication
+            self.last_id = db.scalar(select(func.coalesce(func.max(table.id), 0)))
+            query = select(*columns).where(
+                table.id <= self.last_id, table.kind.in_((USER, TOKEN)), table.expires_at > time.time()
+            )
+        else:
+            query = select(*columns).where(table.id > self.last_id)
+        return db.execute(query.order_by(table.id)).all()
+
+    def poll(self, db: Session) -> int:
+        rows = self._rows(db)
+        for row in rows:
+            apply(row.kind, row.key, row.created_at, row.expires_at, remote=True)
+            self.last_id = max(self.last_id, row.id)
+        self._polls += 1
+        if self.interval > 0 and self._polls % max(int(300 / self.interval), 1) == 0:
+            self.prune(db)
+        return len(rows)
+
+    def prune(self, db: Session) -> None:
+        cutoff = time.time() - config.INVALIDATION_RETENTION
+        db.execute(delete(models.Invalidation).where(models.Invalidation.expires_at < cutoff))
+        db.commit()
+
+    async def _run(self, session_factory) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with session_factory() as db:
+                    await db.run_sync(self.poll)
+            except SQLAlchemyError as exc:
+                log.event(logger, logging.WARNING, "invalidation poll failed", error=str(exc))
+
+    async def start(self, session_factory) -> None:
+        """
+        Catch up once (before the worker serves requests), then keep polling in the background.
+        """
+        async with session_factory() as db:
+            await db.run_sync(self.poll)
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+poller = InvalidationPoller()
@@ -0,0 +1,98 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Optional
+
+from app import config
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, event and the ``fields`` passed to ``event()``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def configure_logging() -> None:
+    """
+    Route the ``app`` loggers through a queue so request handlers never block on stream writes.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if config.LOG_FORMAT == "json" else TextFormatter())
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    root = logging.getLogger("app")
+    root.setLevel(config.LOG_LEVEL.upper())
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+def event(logger: logging.Logger, level: int, message: str, sample_rate: float = 1.0, **fields) -> None:
+    """
+    Log ``message`` with structured ``fields``. Returns before building anything when ``level``
+    is disabled, and keeps only ``sample_rate`` of the calls when it is enabled.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    if sample_rate < 1.0:
+        fields["sample_rate"] = sample_rate
+    logger.log(level, message, extra={"fields": fields})
+
+
+def log_slow_request(method: str, route: str, status: int, elapsed: float, stats) -> None:
+    """
+    MetricsMiddleware hook: warn about requests slower than LOG_SLOW_REQUEST_MS, sample the rest at debug.
+    """
+    duration_ms = round(elapsed * 1000, 2)
+    if duration_ms >= config.LOG_SLOW_REQUEST_MS:
+        level, sample_rate = logging.WARNING, 1.0
+    else:
+        level, sample_rate = logging.DEBUG, config.LOG_SAMPLE_RATE
+    event(
+        _request_logger, level, "request", sample_rate,
+        method=method, route=route, status=status, duration_ms=duration_ms,
+        db_queries=stats.queries, db_ms=round(stats.query_seconds * 1000, 2),
+    )
+
+
+_request_logger = get_logger("app.request")
@@ -1,18 +1,83 @@
-from fastapi import FastAPI
-from app.routes import parks, species, users
-from app.db import init_db
+import math
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.routes import health, parks, search, species, stats, sync, users
+from app import async_crud, compression, config, hashing, invalidation, log, metrics, ratelimit, replicas
+from app.db import AsyncSessionLocal, async_engine, create_schema, read_replicas
+from app.weather import close_weather_client
+
+log.configure_logging()
 
 app = FastAPI()
 
+if read_replicas.replicas:
+    app.add_middleware(replicas.ReadYourWritesMiddleware)
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(compression.CompressionMiddleware)
+if config.MAX_CONCURRENT_REQUESTS > 0:
+    app.add_middleware(ratelimit.AdmissionMiddleware)
+# Added last so it is outermost and also records the requests admission control sheds
+if config.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware, on_finish=log.log_slow_request)
+
 app.include_router(parks.router)
 app.include_router(species.router)
 app.include_router(users.router)
+app.include_router(search.router)
+app.include_router(sync.router)
+app.include_router(stats.router)
+app.include_router(health.router)
+
+@app.exception_handler(hashing.HashPoolBusy)
+async def hash_pool_busy_handler(request: Request, exc: hashing.HashPoolBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many password operations in progress, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(ratelimit.RateLimited)
+async def rate_limited_handler(request: Request, exc: ratelimit.RateLimited):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, try again later"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 
 @app.on_event("startup")
 async def startup_event():
-    init_db()
+    if config.STARTUP_MIGRATE:
+        create_schema()
+    await invalidation.poller.start(AsyncSessionLocal)
+    await read_replicas.start(AsyncSessionLocal)
+    if config.GROUP_COMMIT_ENABLED:
+        await async_crud.group_commit.start(AsyncSessionLocal)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await async_crud.group_commit.stop()
+    await invalidation.poller.stop()
+    await read_replicas.stop()
+    await close_weather_client()
+    await async_engine.dispose()
+    hashing.pool.shutdown()
 
 
 if __name__ == "__main__":
+    import os
+
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+
+    if config.WORKERS > 1:
+        # Migrate once here instead of racing in every worker; workers need an import string
+        create_schema()
+        os.environ["STARTUP_MIGRATE"] = "0"
+        uvicorn.run("app.main:app", host=config.HOST, port=config.PORT, workers=config.WORKERS)
+    else:
+        uvicorn.run(app, host=config.HOST, port=config.PORT)
\ No newline at end of file
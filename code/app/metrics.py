@@ -0,0 +1,308 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets in seconds, from cache hits up to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        lines = self.header()
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Holds the metrics and renders them in the Prometheus text format (0.0.4).
+
+    Collectors run at scrape time to refresh gauges that mirror state held elsewhere.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+)
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+)
+http_in_flight = registry.register(
+    # By method only: the route template is not known until routing has run
+    Gauge("http_requests_in_flight", "Requests currently being served.", ("method",))
+)
+db_queries = registry.register(
+    Histogram("db_queries_per_request", "SQL statements issued per HTTP request.", ("route",), QUERY_COUNT_BUCKETS)
+)
+db_query_duration = registry.register(
+    Histogram("db_query_duration_seconds", "Time spent executing single SQL statements.")
+)
+db_pool_wait = registry.register(
+    Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", ("pool",))
+)
+db_pool_connections = registry.register(
+    Gauge("db_pool_connections", "Pool connections by state.", ("pool", "state"))
+)
+weather_upstream_duration = registry.register(
+    Histogram("weather_upstream_duration_seconds", "Weather API call latency.", ("outcome",))
+)
+weather_cache = registry.register(
+    Counter("weather_cache_lookups_total", "Weather cache lookups by result.", ("result",))
+)
+hash_pool = registry.register(Gauge("hash_pool", "Password hash pool counters.", ("stat",)))
+rate_limited = registry.register(
+    Counter("rate_limited_total", "Requests rejected with 429 by a rate limit.", ("limit",))
+)
+requests_shed = registry.register(
+    Counter("requests_shed_total", "Requests rejected with 503 by admission control.", ("reason",))
+)
+admission_waiting = registry.register(
+    Gauge("admission_queue_waiting", "Requests waiting for an admission slot.")
+)
+group_commit_size = registry.register(
+    Histogram("group_commit_writes", "Writes committed per group-commit transaction.", (), (1, 2, 4, 8, 16, 32, 64, 128))
+)
+db_read_sessions = registry.register(
+    Counter("db_read_sessions_total", "Read-only request sessions by the database serving them.", ("target",))
+)
+replica_healthy = registry.register(
+    Gauge("db_replica_healthy", "1 while a read replica passes its health check.", ("replica",))
+)
+replica_lag = registry.register(
+    Gauge("db_replica_lag_changes", "Change-log entries a read replica trails the primary by.", ("replica",))
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "query_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+# Per-request SQL counters; the context is inherited by run_sync greenlets and threadpool calls
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_query_duration.observe(value=elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute, drop its start time here
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Count and time every statement run on ``engine`` (a sync Engine or AsyncEngine.sync_engine),
+    and report its pool's connection states at scrape time.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    def collect_pool():
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            db_pool_connections.set(name, "checked_out", value=pool.checkedout())
+            db_pool_connections.set(name, "idle", value=pool.checkedin())
+
+    registry.add_collector(collect_pool)
+
+
+class TimedCheckout:
+    """
+    Pool mixin that records how long each checkout waited for a connection.
+    """
+
+    metrics_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(self.metrics_name, value=time.perf_counter() - start)
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so scanners can't blow up the series count
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL statement counts per route template.
+
+    Adds a Server-Timing header with the request's database time and statement count.
+    """
+
+    def __init__(self, app, on_finish: Optional[Callable] = None):
+        self.app = app
+        self.on_finish = on_finish
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+        http_in_flight.inc(method)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.query_seconds * 1000:.2f};desc="{stats.queries} queries"'.encode("latin-1"),
+                ))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = _route_template(scope)
+            http_in_flight.dec(method)
+            http_requests.inc(method, route, str(status))
+            http_request_duration.observe(method, route, value=elapsed)
+            db_queries.observe(route, value=stats.queries)
+            current_request.reset(token)
+            if self.on_finish is not None:
+                self.on_finish(method, route, status, elapsed, stats)
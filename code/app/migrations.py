@@ -0,0 +1,159 @@
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from app import search, stats
+
+metadata = MetaData()
+
+# One row per applied migration
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", String, server_default=func.now()),
+)
+
+
+def _full_text_search(connection: Connection) -> None:
+    search.create_search_index(connection)
+
+
+def _lookup_indexes(connection: Connection) -> None:
+    # (park_id, id) serves both `park_id = ?` lookups and per-park listings ordered by id,
+    # so a separate single-column park_id index would only duplicate it
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_species_park_id_id ON species (park_id, id)",
+        "CREATE INDEX IF NOT EXISTS ix_species_name ON species (name)",
+        "CREATE INDEX IF NOT EXISTS ix_parks_name ON parks (name)",
+    ):
+        connection.execute(text(statement))
+
+
+def _invalidation_log(connection: Connection) -> None:
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS invalidations ("
+        "id INTEGER PRIMARY KEY, kind VARCHAR NOT NULL, key VARCHAR NOT NULL, "
+        "created_at FLOAT NOT NULL, expires_at FLOAT NOT NULL)"
+    ))
+    connection.execute(text("CREATE INDEX IF NOT EXISTS ix_invalidations_expires_at ON invalidations (expires_at)"))
+
+
+def _park_images(connection: Connection) -> None:
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS park_images ("
+        "id INTEGER PRIMARY KEY, park_id INTEGER NOT NULL REFERENCES parks (id) ON DELETE CASCADE, "
+        "position INTEGER NOT NULL, url VARCHAR NOT NULL, width INTEGER, height INTEGER, "
+        "content_hash VARCHAR, created_at VARCHAR DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_park_images_park_id_position ON park_images (park_id, position)"
+    ))
+    if "images" not in {column["name"] for column in inspect(connection).get_columns("parks")}:
+        return
+    # Move the comma-joined URLs into rows, keeping their order, then drop the old column
+    images = [
+        {"park_id": park_id, "position": position, "url": url}
+        for park_id, joined in connection.execute(text("SELECT id, images FROM parks WHERE images IS NOT NULL"))
+        for position, url in enumerate(part.strip() for part in joined.split(",") if part.strip())
+    ]
+    if images:
+        connection.execute(
+            text("INSERT INTO park_images (park_id, position, url) VALUES (:park_id, :position, :url)"), images
+        )
+    connection.execute(text("ALTER TABLE parks DROP COLUMN images"))
+
+
+def _change_log(connection: Connection) -> None:
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS change_log ("
+        "id INTEGER PRIMARY KEY, entity VARCHAR NOT NULL, entity_id INTEGER NOT NULL, "
+        "op VARCHAR NOT NULL, changed_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    for table in ("parks", "species"):
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)"))
+    if connection.dialect.name == "postgresql":
+        # SQLite keeps the CURRENT_TIMESTAMP text it already stores, which DateTime reads as is
+        for table, columns in (
+            ("parks", ("created_at", "updated_at")),
+            ("park_images", ("created_at",)),
+            ("species", ("created_at", "updated_at")),
+            ("users", ("created_at", "updated_at")),
+        ):
+            for column in columns:
+                connection.execute(text(
+                    f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TIMESTAMP USING {column}::timestamp"
+                ))
+    if connection.execute(text("SELECT 1 FROM change_log LIMIT 1")).first() is not None:
+        return
+    # Existing rows start the log as upserts, so a first sync from token 0 returns everything
+    for entity, table in (("park", "parks"), ("species", "species")):
+        connection.execute(text(
+            f"INSERT INTO change_log (entity, entity_id, op) SELECT '{entity}', id, 'upsert' FROM {table} ORDER BY id"
+        ))
+
+
+def _stats_tables(connection: Connection) -> None:
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS counters (name VARCHAR PRIMARY KEY, value INTEGER NOT NULL)"
+    ))
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS park_stats ("
+        "park_id INTEGER PRIMARY KEY REFERENCES parks (id) ON DELETE CASCADE, "
+        "species_count INTEGER NOT NULL, image_count INTEGER NOT NULL)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_park_stats_species_count ON park_stats (species_count DESC, park_id)"
+    ))
+    # Counted once from the existing rows; from here on every write keeps them current
+    stats.rebuild(connection)
+
+
+# Append only: never edit or reorder a migration once it has shipped.
+# Each step must be idempotent, since create_all already builds fresh databases from the models.
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "full-text search tables", _full_text_search),
+    (2, "lookup indexes on species.park_id, species.name and parks.name", _lookup_indexes),
+    (3, "invalidation log shared by worker processes", _invalidation_log),
+    (4, "park_images table replacing the comma-joined parks.images column", _park_images),
+    (5, "change_log table and updated_at indexes for delta sync", _change_log),
+    (6, "counters and park_stats tables for precomputed statistics", _stats_tables),
+]
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0]
+
+
+def current_version(connection: Connection) -> int:
+    return connection.execute(select(func.coalesce(func.max(schema_version.c.version), 0))).scalar_one()
+
+
+def pending(connection: Connection) -> List[Tuple[int, str]]:
+    version = current_version(connection)
+    return [(number, description) for number, description, _ in MIGRATIONS if number > version]
+
+
+def migrate(engine: Engine) -> List[int]:
+    """
+    Apply every pending migration, each in its own transaction. Returns the versions applied.
+    """
+    metadata.create_all(bind=engine)
+    applied = []
+    with engine.connect() as connection:
+        version = current_version(connection)
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            with engine.begin() as connection:
+                step(connection)
+                connection.execute(schema_version.insert().values(version=number, description=description))
+        except IntegrityError:
+            # Another worker starting at the same moment recorded it first; the steps are idempotent
+            continue
+        applied.append(number)
+    return applied
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, Float
+from sqlalchemy import create_engine, Column, DateTime, Integer, String, ForeignKey, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,36 +11,108 @@ class Park(Base):
     __tablename__ = "parks"
 
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     latitude = Column(Float)
     longitude = Column(Float)
     description = Column(String)
-    images = Column(String)
-    created_at = Column(String, server_default=func.now())
-    updated_at = Column(String, server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), index=True)
     species = relationship("Species", back_populates="park")
+    images = relationship(
+        "ParkImage", back_populates="park", order_by="ParkImage.position", cascade="all, delete-orphan"
+    )
+
+
+class ParkImage(Base):
+    __tablename__ = "park_images"
+    __table_args__ = (Index("ix_park_images_park_id_position", "park_id", "position"),)
+
+    id = Column(Integer, primary_key=True)
+    park_id = Column(Integer, ForeignKey("parks.id", ondelete="CASCADE"), nullable=False)
+    # Gallery order within the park; removing an image leaves a gap rather than renumbering
+    position = Column(Integer, nullable=False)
+    url = Column(String, nullable=False)
+    width = Column(Integer)
+    height = Column(Integer)
+    content_hash = Column(String)
+    created_at = Column(DateTime, server_default=func.now())
+
+    park = relationship("Park", back_populates="images")
 
     
 class Species(Base):
     __tablename__ = "species"
+    # Model indexes only apply to new databases, existing ones get them from app/migrations.py
+    __table_args__ = (Index("ix_species_park_id_id", "park_id", "id"),)
 
     id = Column(Integer, primary_key=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     scientific_name = Column(String)
     park_id = Column(Integer, ForeignKey("parks.id"))
     description = Column(String)
     image = Column(String)
-    created_at = Column(String, server_default=func.now())
-    updated_at = Column(String, server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), index=True)
 
     park = relationship("Park", back_populates="species")
 
 
+class Invalidation(Base):
+    """
+    Append-only log of cache invalidations shared by all worker processes (see app/invalidation.py).
+    """
+    __tablename__ = "invalidations"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    created_at = Column(Float, nullable=False)
+    # Replayed by newly started workers until then, and pruned some time after
+    expires_at = Column(Float, nullable=False, index=True)
+
+
+class Change(Base):
+    """
+    Append-only log of park and species writes, read by GET /sync (see app/changelog.py).
+
+    The id is the sync token: a client that has seen every change up to id N only
+    needs the rows past N.
+    """
+    __tablename__ = "change_log"
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)
+    changed_at = Column(DateTime, server_default=func.now())
+
+
+class Counter(Base):
+    """
+    Running row counts, moved by the crud writes in their own transactions (see app/stats.py),
+    so totals are a primary-key read instead of a COUNT(*).
+    """
+    __tablename__ = "counters"
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class ParkStats(Base):
+    """
+    Per-park counts, kept like Counter. `python -m app.cli rebuild-stats` recomputes both.
+    """
+    __tablename__ = "park_stats"
+    park_id = Column(Integer, ForeignKey("parks.id", ondelete="CASCADE"), primary_key=True)
+    species_count = Column(Integer, nullable=False, default=0)
+    image_count = Column(Integer, nullable=False, default=0)
+
+    # Already in GET /stats top-parks order, so that read stops after the first rows
+    __table_args__ = (Index("ix_park_stats_species_count", species_count.desc(), park_id),)
+
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
     role = Column(String, default="visitor")  # Default role for new users
-    created_at = Column(String, server_default=func.now())
-    updated_at = Column(String, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
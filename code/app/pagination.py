@@ -0,0 +1,86 @@
+import base64
+import binascii
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Turn an opaque cursor back into the last seen id, or raise a 400.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, value = raw.split(":", 1)
+        if prefix != "id":
+            raise ValueError(raw)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, rows, limit: int) -> None:
+    """
+    Expose the cursor for the page after ``rows`` in the X-Next-Cursor header.
+
+    A short page means the listing is exhausted, so no header is sent.
+    """
+    if rows and len(rows) >= limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+
+
+def set_total_count(response: Response, total: Optional[int]) -> None:
+    """
+    Expose the size of the whole listing in X-Total-Count. Callers pass a stats counter,
+    never a COUNT(*), and only for listings the counter describes (no filters).
+    """
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def after_id_from(cursor: Optional[str]) -> Optional[int]:
+    return decode_cursor(cursor) if cursor else None
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a client timestamp to the naive UTC the database's CURRENT_TIMESTAMP values use.
+    Timestamps without an offset are taken as UTC already.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_ids(ids: str, max_ids: int) -> List[int]:
+    """
+    Turn "3,1,2" into ids in request order with repeats dropped, or raise a 400.
+    """
+    try:
+        values = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    unique = list(dict.fromkeys(values))
+    if not unique:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(unique) > max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {max_ids} ids per request")
+    return unique
+
+
+def in_requested_order(rows, ids: Sequence[int]) -> Tuple[list, List[int]]:
+    """
+    Reorder rows fetched with ``id IN (...)`` to follow ``ids``; also returns the ids with no row.
+    """
+    by_id = {row.id: row for row in rows}
+    return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+
+def set_missing_ids(response: Response, missing: Sequence[int]) -> None:
+    if missing:
+        response.headers["X-Missing-Ids"] = ",".join(str(i) for i in missing)
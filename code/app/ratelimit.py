@@ -0,0 +1,240 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
+
+from app import config, metrics, models
+from app.auth import get_admin_user, get_current_user
+
+
+class RateLimited(Exception):
+    def __init__(self, limit: str, retry_after: float):
+        super().__init__(limit)
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class Rule(NamedTuple):
+    requests: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.seconds
+
+
+def parse_rule(value: str) -> Optional[Rule]:
+    """
+    Parse "<requests>/<seconds>", e.g. "10/60". An empty value means no limit.
+    """
+    if not value:
+        return None
+    requests, seconds = value.split("/")
+    return Rule(int(requests), float(seconds))
+
+
+class MemoryBackend:
+    """
+    Token buckets held in this process, least recently used ones dropped past ``max_keys``
+    so a spray of addresses can't grow it without bound.
+    """
+
+    shared = False
+
+    def __init__(self, max_keys: int = config.RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from ``key``'s bucket. Returns 0 if it had one, else the seconds until it will.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens, wait = tokens - 1, 0.0
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# Refill and take in one round trip; the wait comes back as a string since Redis truncates Lua numbers
+_TAKE_SCRIPT = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """
+    Buckets shared by every worker, for any client exposing the redis-py ``eval`` API.
+
+    ``take`` blocks on a network round trip, so Limiter calls it from the threadpool.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "parks-api:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        return float(self.client.eval(_TAKE_SCRIPT, 1, self.prefix + key, rate, burst, time.time()))
+
+
+class Limiter:
+    def __init__(self, backend, rules: Dict[str, Optional[Rule]]):
+        self.backend = backend
+        self.rules = rules
+
+    async def hit(self, name: str, key: str) -> None:
+        """
+        Count one request against limit ``name`` for ``key``; raises RateLimited once the bucket is empty.
+        """
+        rule = self.rules.get(name)
+        if self.backend is None or rule is None:
+            return
+        args = (f"{name}:{key}", rule.rate, rule.requests)
+        # A shared backend is a network round trip; keep it off the event loop
+        wait = await run_in_threadpool(self.backend.take, *args) if self.backend.shared else self.backend.take(*args)
+        if wait > 0:
+            metrics.rate_limited.inc(name)
+            raise RateLimited(name, wait)
+
+
+def make_backend():
+    if config.RATE_LIMIT_BACKEND == "memory":
+        return MemoryBackend()
+    if config.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend.from_url(config.RATE_LIMIT_REDIS_URL)
+    return None
+
+
+limiter = Limiter(make_backend(), {
+    "login_ip": parse_rule(config.RATE_LIMIT_LOGIN_IP),
+    "login_user": parse_rule(config.RATE_LIMIT_LOGIN_USER),
+    "register_ip": parse_rule(config.RATE_LIMIT_REGISTER_IP),
+    "write_user": parse_rule(config.RATE_LIMIT_WRITE_USER),
+    "export_user": parse_rule(config.RATE_LIMIT_EXPORT_USER),
+})
+
+
+def client_ip(request: Request) -> str:
+    if config.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+# Route dependencies. They run before the handler, so a limited login never reaches bcrypt.
+
+async def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    await limiter.hit("login_ip", client_ip(request))
+    await limiter.hit("login_user", form_data.username.lower())
+
+
+async def limit_register(request: Request):
+    await limiter.hit("register_ip", client_ip(request))
+
+
+async def limit_writes(current_user: models.User = Depends(get_admin_user)):
+    await limiter.hit("write_user", current_user.username)
+
+
+async def limit_exports(current_user: models.User = Depends(get_current_user)):
+    await limiter.hit("export_user", current_user.username)
+
+
+async def _reject(send, status: int, retry_after: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware capping the requests a worker serves at once.
+
+    Requests past ``max_concurrency`` wait for a slot; once ``queue_limit`` are already
+    waiting, or one has waited ``queue_timeout`` seconds, they get 503 with Retry-After
+    instead of adding to latency for everyone. Health checks and metrics are never held back.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_concurrency: int = config.MAX_CONCURRENT_REQUESTS,
+        queue_limit: int = config.ADMISSION_QUEUE_LIMIT,
+        queue_timeout: float = config.ADMISSION_QUEUE_TIMEOUT,
+        exempt: Tuple[str, ...] = ("/health", "/metrics"),
+    ):
+        self.app = app
+        self.max_concurrency = max_concurrency
+        self.queue_limit = queue_limit
+        self.queue_timeout = queue_timeout
+        self.exempt = exempt
+        # Created on first use so it binds to the serving event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt):
+            return await self.app(scope, receive, send)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._semaphore.locked():
+            if self._waiting >= self.queue_limit:
+                metrics.requests_shed.inc("queue_full")
+                return await _reject(send, 503, 1, "Server is busy, try again shortly")
+            self._waiting += 1
+            metrics.admission_waiting.inc()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                metrics.requests_shed.inc("queue_timeout")
+                return await _reject(send, 503, math.ceil(self.queue_timeout), "Server is busy, try again shortly")
+            finally:
+                self._waiting -= 1
+                metrics.admission_waiting.dec()
+        else:
+            await self._semaphore.acquire()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,154 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app import config, log, metrics, models
+
+logger = log.get_logger(__name__)
+
+# Read-your-writes: set on responses to writes, reads carrying it go to the primary until it expires
+STICKY_COOKIE = "parks_primary_until"
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+        # How many change-log entries it trails the primary by, as of the last check
+        self.lag: Optional[int] = None
+
+    def mark(self, healthy: bool, reason: str = "") -> None:
+        if healthy != self.healthy:
+            log.event(logger, logging.WARNING if not healthy else logging.INFO,
+                      "replica " + ("recovered" if healthy else "unavailable"), replica=self.name, reason=reason)
+        self.healthy = healthy
+        metrics.replica_healthy.set(self.name, value=1 if healthy else 0)
+
+
+def _last_change(session) -> int:
+    return session.scalar(select(func.coalesce(func.max(models.Change.id), 0)))
+
+
+class ReplicaSet:
+    """
+    Read replicas served round-robin, skipping any that failed their last health check.
+
+    A replica is checked every ``interval`` seconds by reading the newest change-log id, which
+    also yields how far it trails the primary, and is taken out at once when a request on it
+    hits a database error. With no healthy replica, reads go to the primary.
+    """
+
+    def __init__(self, replicas: List[Replica], interval: float = config.REPLICA_HEALTH_INTERVAL):
+        self.replicas = replicas
+        self.interval = interval
+        self._next = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_urls(cls, urls: List[str], make_engine: Callable[[str], AsyncEngine]) -> "ReplicaSet":
+        replicas = []
+        for url in urls:
+            name = make_url(url).render_as_string(hide_password=True)
+            replicas.append(Replica(name, make_engine(url)))
+            metrics.replica_healthy.set(name, value=1)
+        return cls(replicas)
+
+    def choose(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    async def _check(self, replica: Replica, primary_last: Optional[int]) -> None:
+        try:
+            async with replica.sessionmaker() as db:
+                last = await asyncio.wait_for(db.run_sync(_last_change), config.REPLICA_HEALTH_TIMEOUT)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as exc:
+            replica.lag = None
+            replica.mark(False, reason=str(exc) or type(exc).__name__)
+            return
+        if primary_last is not None:
+            replica.lag = max(primary_last - last, 0)
+            metrics.replica_lag.set(replica.name, value=replica.lag)
+        replica.mark(True)
+
+    async def check(self, primary_factory) -> None:
+        primary_last = None
+        try:
+            async with primary_factory() as db:
+                primary_last = await db.run_sync(_last_change)
+        except SQLAlchemyError:
+            pass
+        await asyncio.gather(*(self._check(replica, primary_last) for replica in self.replicas))
+
+    async def _run(self, primary_factory) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check(primary_factory)
+
+    async def start(self, primary_factory) -> None:
+        if not self.replicas:
+            return
+        await self.check(primary_factory)
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(primary_factory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def status(self) -> List[dict]:
+        return [{"name": r.name, "healthy": r.healthy, "lag_changes": r.lag} for r in self.replicas]
+
+
+def sticky_until(cookies) -> float:
+    try:
+        return float(cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware marking clients that just wrote, so their reads skip the replicas for
+    READ_YOUR_WRITES_SECONDS and see their own change even while replicas catch up.
+
+    Handlers opt in through the get_write_db dependency, which flags the request; successful
+    responses to flagged requests get a short-lived cookie that get_read_db honours.
+    """
+
+    def __init__(self, app, window: float = config.READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                if scope.get("state", {}).get("wrote_primary"):
+                    until = time.time() + self.window
+                    cookie = f"{STICKY_COOKIE}={until:.3f}; Max-Age={int(self.window) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"set-cookie", cookie.encode("latin-1"))
+                    ])
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
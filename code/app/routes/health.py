@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import migrations
+from app.db import get_async_db, read_replicas
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def liveness():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(db: AsyncSession = Depends(get_async_db)):
+    """
+    Ready once the database answers and its schema is at the latest migration. Replicas are
+    reported but do not gate readiness: reads fall back to the primary while they are down.
+    """
+    try:
+        version = await db.run_sync(lambda session: migrations.current_version(session.connection()))
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable")
+    if version < migrations.latest_version():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Schema at version {version}, expected {migrations.latest_version()}",
+        )
+    ready = {"status": "ready", "schema_version": version}
+    if read_replicas.replicas:
+        ready["replicas"] = read_replicas.status()
+    return ready
@@ -1,104 +1,312 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
-from sqlalchemy.orm import Session
-from app import crud, schemas, models
-from app.db import get_db
+from datetime import datetime
+from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, bulk, config, ratelimit, schemas, models, stats
+from app.db import get_async_db, get_read_db, get_write_db
 from app.auth import get_current_user, get_admin_user
-import requests
+from app.cache import response_cache
+from app.geo import park_locator
+from app.pagination import after_id_from, in_requested_order, naive_utc, parse_ids, set_missing_ids, set_next_cursor, set_total_count
+from app.serializers import PARK_COLUMNS, PARK_FIELDS, columns_for, image_to_dict, images_by_park, json_response, park_to_dict, parks_with_species, species_to_dict
+from app.weather import WeatherUnavailable, get_weather_client
 from typing import Optional
 
 
 router = APIRouter(prefix="/parks", tags=["parks"])
 
+INCLUDES = {"species"}
 
-@router.get("/", response_model=List[schemas.Park])
-def read_parks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    parks = crud.get_parks(db, skip=skip, limit=limit)
-    return [
-        schemas.Park(
-            id=park.id,
-            name=park.name,
-            description=park.description,
-            location=schemas.Location(latitude=park.latitude, longitude=park.longitude),
-            images=park.images,
-            created_at=park.created_at,
-            updated_at=park.updated_at
-        )
-        for park in parks
-    ]
-
-
-@router.get("/{park_id}", response_model=schemas.Park)
-def read_park(park_id: int, db: Session = Depends(get_db)):
-    db_park = crud.get_park(db, park_id=park_id)
-    if db_park is None:
-        raise HTTPException(status_code=404, detail="Park not found")
-    
-    # Map the db_park (SQLAlchemy model) to the Pydantic schema
-    return schemas.Park(
-        id=db_park.id,
-        name=db_park.name,
-        description=db_park.description,
-        location=schemas.Location(latitude=db_park.latitude, longitude=db_park.longitude),
-        images=db_park.images,
-        created_at=db_park.created_at,
-        updated_at=db_park.updated_at
+
+def _includes(include: Optional[str]) -> set:
+    requested = {part.strip() for part in include.split(",") if part.strip()} if include else set()
+    unknown = requested - INCLUDES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def _fields(fields: Optional[str], includes: set) -> Optional[set]:
+    """
+    The top-level keys to return (id is always kept), or None for all of them.
+    """
+    if fields is None:
+        return None
+    requested = {part.strip() for part in fields.split(",") if part.strip()}
+    allowed = set(PARK_FIELDS) | ({"species", "species_count"} if "species" in includes else set())
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
+
+async def _load_images(db: AsyncSession, park_ids: List[int]) -> dict:
+    return images_by_park(await async_crud.get_images_for_parks(db, park_ids)) if park_ids else {}
+
+
+async def _park_dicts(db: AsyncSession, parks, includes: set = frozenset(), fields: Optional[set] = None) -> list:
+    """
+    Serialize park rows with their images (and species when included), one query per kind
+    for the whole page. With ``fields`` the rows hold only the selected columns
+    (see _columns), and images or species are not queried unless asked for.
+    """
+    park_ids = [park.id for park in parks]
+    images = await _load_images(db, park_ids) if fields is None or "images" in fields else {}
+    dicts = [park_to_dict(park, images.get(park.id, ()), fields) for park in parks]
+    if "species" in includes and (fields is None or fields & {"species", "species_count"}):
+        rows = await async_crud.get_species_for_parks(db, park_ids, config.EMBED_SPECIES_LIMIT) if park_ids else []
+        dicts = parks_with_species(dicts, rows)
+        if fields is not None:
+            dicts = [{key: value for key, value in park.items() if key in fields} for park in dicts]
+    return dicts
+
+
+def _columns(fields: Optional[set]) -> tuple:
+    return PARK_COLUMNS if fields is None else columns_for(PARK_FIELDS, fields)
+
+
+# CSV exports keep the URLs in one comma-joined cell, which the CSV import reads back
+IMAGES_EXPORT = bulk.Related("images", _load_images, lambda images: ",".join(image.url for image in images))
+
+
+@router.get("/", response_model=Union[List[schemas.ParkWithSpecies], List[schemas.Park]])
+async def read_parks(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Comma-separated related data to embed: species"),
+    ids: Optional[str] = Query(
+        None,
+        description="Comma-separated park ids to fetch in one query, returned in this order; "
+        "ids with no park are listed in X-Missing-Ids. skip, limit and cursor are ignored.",
+    ),
+    updated_since: Optional[datetime] = Query(
+        None,
+        description="Only parks changed after this time (ISO 8601). Timestamps have whole-second "
+        "resolution and deletes are not listed; use GET /sync for exact incremental sync.",
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,location; "
+        "only their columns are read from the database",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    includes = _includes(include)
+    selected = _fields(fields, includes)
+    wanted = parse_ids(ids, config.BATCH_MAX_IDS) if ids is not None else None
+
+    async def build():
+        if wanted is not None:
+            rows = await async_crud.get_park_rows_by_ids(db, wanted, _columns(selected))
+            parks, missing = in_requested_order(rows, wanted)
+        else:
+            parks = await async_crud.get_park_rows(
+                db,
+                skip=skip,
+                limit=limit,
+                after_id=after_id_from(cursor),
+                columns=_columns(selected),
+                updated_since=naive_utc(updated_since),
+            )
+        response = json_response(await _park_dicts(db, parks, includes, selected))
+        if wanted is not None:
+            set_missing_ids(response, missing)
+        else:
+            set_next_cursor(response, parks, limit)
+            if updated_since is None:
+                set_total_count(response, (await async_crud.get_totals(db)).get(stats.PARKS))
+        return response
+
+    namespaces = ("parks", "species") if "species" in includes else ("parks",)
+    return await response_cache.cached(request, namespaces, build)
+
+
+@router.get("/nearby", response_model=List[schemas.NearbyPark])
+async def read_nearby_parks(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(50.0, gt=0, le=20040),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    primary: AsyncSession = Depends(get_async_db),
+):
+    async def load_points():
+        # The index is kept until the next park write, so build it from data that already has that write
+        return await async_crud.get_park_locations(primary)
+
+    index = await park_locator.get_index(load_points)
+    matches = index.nearby(lat, lon, radius_km, limit)
+    park_ids = [park_id for _, park_id in matches]
+    parks, _ = in_requested_order(await async_crud.get_park_rows_by_ids(db, park_ids), park_ids)
+    distances = {park_id: distance for distance, park_id in matches}
+    return json_response([
+        dict(park, distance_km=round(distances[park["id"]], 3)) for park in await _park_dicts(db, parks)
+    ])
+
+
+@router.get("/export", dependencies=[Depends(ratelimit.limit_exports)])
+async def export_parks(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        bulk.stream_export(db, PARK_COLUMNS, park_to_dict, format, IMAGES_EXPORT),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="parks.{format}"'},
     )
 
 
-@router.post("/", response_model=schemas.Park, status_code=status.HTTP_201_CREATED)
-def create_park(
+@router.get("/{park_id}", response_model=Union[schemas.ParkWithSpecies, schemas.Park])
+async def read_park(
+    request: Request,
+    park_id: int,
+    include: Optional[str] = Query(None, description="Comma-separated related data to embed: species"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    includes = _includes(include)
+
+    async def build():
+        db_park = await async_crud.get_park_row(db, park_id=park_id)
+        if db_park is None:
+            raise HTTPException(status_code=404, detail="Park not found")
+        return json_response((await _park_dicts(db, [db_park], includes))[0])
+
+    namespaces = ("parks", "species") if "species" in includes else ("parks",)
+    return await response_cache.cached(request, namespaces, build)
+
+
+@router.get("/{park_id}/stats", response_model=schemas.ParkStats)
+async def read_park_stats(
+    request: Request,
+    park_id: int,
+    recent: int = Query(10, ge=0, le=100, description="How many of the park's newest species to list"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Species and image counts for one park, read from its precomputed stats row.
+    """
+    async def build():
+        row = await async_crud.get_park_stats(db, park_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Park not found")
+        species = await async_crud.get_recent_species(db, recent, park_id) if recent else []
+        return json_response({
+            "park_id": row.park_id,
+            "species_count": row.species_count,
+            "image_count": row.image_count,
+            "recent_species": [species_to_dict(s) for s in species],
+        })
+
+    return await response_cache.cached(request, ("parks", "species"), build)
+
+
+@router.post("/", response_model=schemas.Park, status_code=status.HTTP_201_CREATED, dependencies=[Depends(ratelimit.limit_writes)])
+async def create_park(
     park: schemas.ParkCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    return crud.create_park(db, park)
+    db_park = await async_crud.create_park(db, park)
+    return json_response(park_to_dict(db_park, db_park.images), status_code=status.HTTP_201_CREATED)
+
 
+@router.post("/bulk", response_model=schemas.ImportReport, dependencies=[Depends(ratelimit.limit_writes)])
+async def bulk_create_parks(
+    request: Request,
+    db: AsyncSession = Depends(get_write_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    """
+    Import parks from a CSV or NDJSON body. Valid rows are committed chunk by chunk,
+    invalid ones are skipped and reported by line number.
+    """
+    report = bulk.ImportReport()
+    async for rows, errors in bulk.validated_chunks(request, bulk.park_row):
+        report.add_errors(errors)
+        if rows:
+            report.inserted += await async_crud.bulk_create_parks(db, [row for _, row in rows])
+    return json_response(report.as_dict())
 
-@router.put("/{park_id}", response_model=schemas.Park)
-def update_park(
+
+@router.put("/{park_id}", response_model=schemas.Park, dependencies=[Depends(ratelimit.limit_writes)])
+async def update_park(
     park_id: int,
     park: schemas.ParkCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    db_park = crud.update_park(db, park_id=park_id, park=park)
+    db_park = await async_crud.update_park(db, park_id=park_id, park=park)
     if db_park is None:
         raise HTTPException(status_code=404, detail="Park not found")
-    return db_park
+    return json_response(park_to_dict(db_park, db_park.images))
 
 
-@router.delete("/{park_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_park(
+@router.delete("/{park_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(ratelimit.limit_writes)])
+async def delete_park(
     park_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    if not crud.delete_park(db, park_id=park_id):
+    if not await async_crud.delete_park(db, park_id=park_id):
         raise HTTPException(status_code=404, detail="Park not found")
     return None
 
 
+@router.get("/{park_id}/images", response_model=List[schemas.ParkImage])
+async def read_park_images(request: Request, park_id: int, db: AsyncSession = Depends(get_read_db)):
+    async def build():
+        rows = await async_crud.get_images_for_parks(db, [park_id])
+        if not rows and await async_crud.get_park_row(db, park_id=park_id) is None:
+            raise HTTPException(status_code=404, detail="Park not found")
+        return json_response([image_to_dict(row) for row in rows])
+
+    return await response_cache.cached(request, ("parks",), build)
+
+
+@router.post(
+    "/{park_id}/images",
+    response_model=schemas.ParkImage,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(ratelimit.limit_writes)],
+)
+async def add_park_image(
+    park_id: int,
+    image: schemas.ParkImageCreate,
+    db: AsyncSession = Depends(get_write_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    db_image = await async_crud.add_park_image(db, park_id=park_id, image=image)
+    if db_image is None:
+        raise HTTPException(status_code=404, detail="Park not found")
+    return json_response(image_to_dict(db_image), status_code=status.HTTP_201_CREATED)
+
+
+@router.delete(
+    "/{park_id}/images/{image_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(ratelimit.limit_writes)],
+)
+async def delete_park_image(
+    park_id: int,
+    image_id: int,
+    db: AsyncSession = Depends(get_write_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    if not await async_crud.delete_park_image(db, park_id=park_id, image_id=image_id):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return None
+
+
 @router.get("/{park_id}/weather", response_model=schemas.WeatherData)
-async def get_weather(park_id: int, db: Session = Depends(get_db)):
-    db_park = crud.get_park(db, park_id=park_id)
+async def get_weather(park_id: int, db: AsyncSession = Depends(get_read_db)):
+    db_park = await async_crud.get_park(db, park_id=park_id)
     if db_park is None:
         raise HTTPException(status_code=404, detail="Park not found")
-    latitude = db_park.latitude
-    longitude = db_park.longitude
-
-    api_key = "1b1c332cdf1e8c7cae8983a059a8b56f"  
-    weather_url = f"https://api.openweathermap.org/data/2.5/weather?lat={latitude}&lon={longitude}&appid={api_key}&units=metric"
-    response = requests.get(weather_url)
-    response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-    weather_data = response.json()
-    if weather_data:
-      return {
-          "temperature": weather_data["main"]["temp"],
-          "description": weather_data["weather"][0]["description"],
-          "humidity": weather_data["main"]["humidity"],
-          "wind_speed": weather_data["wind"]["speed"],
-      }
-    else:
-        raise HTTPException(status_code=404, detail="Weather data not found")
-    
+    try:
+        return await get_weather_client().get_weather(db_park.latitude, db_park.longitude)
+    except WeatherUnavailable:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Weather data unavailable")
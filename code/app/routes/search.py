@@ -0,0 +1,36 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, schemas
+from app.db import get_read_db
+from app.cache import response_cache
+from app.serializers import json_response
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+SEARCH_TYPES = {"park": ("parks",), "species": ("species",)}
+
+
+@router.get("", response_model=List[schemas.SearchResult])
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Optional[str] = Query(None, description="Restrict results to 'park' or 'species'"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if type is not None and type not in SEARCH_TYPES:
+        raise HTTPException(status_code=400, detail="type must be 'park' or 'species'")
+    kinds = (type,) if type else tuple(SEARCH_TYPES)
+
+    async def build():
+        rows = await async_crud.search(db, q, kinds, limit=limit, offset=offset)
+        # bm25 is lower-is-better, flip it so clients sort by a descending score
+        return json_response([
+            {"type": row.type, "id": row.id, "name": row.name, "snippet": row.snippet, "score": -row.rank}
+            for row in rows
+        ])
+
+    namespaces = sorted({ns for kind in kinds for ns in SEARCH_TYPES[kind]})
+    return await response_cache.cached(request, namespaces, build)
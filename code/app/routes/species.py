@@ -1,61 +1,160 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app import crud, schemas, models
-from app.db import get_db
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, bulk, config, ratelimit, schemas, models, stats
+from app.db import get_read_db, get_write_db
 from app.auth import get_current_user, get_admin_user
+from app.cache import response_cache
+from app.pagination import after_id_from, in_requested_order, naive_utc, parse_ids, set_missing_ids, set_next_cursor, set_total_count
+from app.serializers import SPECIES_COLUMNS, SPECIES_FIELDS, columns_for, json_response, species_response, species_to_dict
 
 router = APIRouter(prefix="/species", tags=["species"])
 
 
+def _fields(fields: Optional[str]) -> Optional[set]:
+    if fields is None:
+        return None
+    requested = {part.strip() for part in fields.split(",") if part.strip()}
+    unknown = requested - set(SPECIES_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
+
 @router.get("/", response_model=List[schemas.Species])
-def read_species(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    species = crud.get_species(db, skip=skip, limit=limit)
-    return species
+async def read_species(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    ids: Optional[str] = Query(
+        None,
+        description="Comma-separated species ids to fetch in one query, returned in this order; "
+        "ids with no species are listed in X-Missing-Ids. skip, limit and cursor are ignored.",
+    ),
+    updated_since: Optional[datetime] = Query(
+        None,
+        description="Only species changed after this time (ISO 8601). Timestamps have whole-second "
+        "resolution and deletes are not listed; use GET /sync for exact incremental sync.",
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,name,park_id; "
+        "only their columns are read from the database",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    wanted = parse_ids(ids, config.BATCH_MAX_IDS) if ids is not None else None
+    selected = _fields(fields)
+    columns = SPECIES_COLUMNS if selected is None else columns_for(SPECIES_FIELDS, selected)
+
+    async def build():
+        if wanted is not None:
+            rows = await async_crud.get_species_rows_by_ids(db, wanted, columns)
+            species, missing = in_requested_order(rows, wanted)
+            response = species_response(species, fields=selected)
+            set_missing_ids(response, missing)
+        else:
+            species = await async_crud.get_species_rows(
+                db,
+                skip=skip,
+                limit=limit,
+                after_id=after_id_from(cursor),
+                columns=columns,
+                updated_since=naive_utc(updated_since),
+            )
+            response = species_response(species, fields=selected)
+            set_next_cursor(response, species, limit)
+            if updated_since is None:
+                set_total_count(response, (await async_crud.get_totals(db)).get(stats.SPECIES))
+        return response
+
+    return await response_cache.cached(request, ("species",), build)
+
+
+@router.get("/export", dependencies=[Depends(ratelimit.limit_exports)])
+async def export_species(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        bulk.stream_export(db, SPECIES_COLUMNS, species_to_dict, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="species.{format}"'},
+    )
 
 
 @router.get("/{species_id}", response_model=schemas.Species)
-def read_species_by_id(species_id: int, db: Session = Depends(get_db)):
-    db_species = crud.get_species_by_id(db, species_id=species_id)
+async def read_species_by_id(species_id: int, db: AsyncSession = Depends(get_read_db)):
+    db_species = await async_crud.get_species_by_id(db, species_id=species_id)
     if db_species is None:
         raise HTTPException(status_code=404, detail="Species not found")
     return db_species
 
 
 @router.get("/parks/{park_id}/species", response_model=List[schemas.Species])
-def read_species_by_park(park_id: int, db: Session = Depends(get_db)):
-    species = crud.get_species_by_park(db, park_id=park_id)
-    return species
+async def read_species_by_park(request: Request, park_id: int, db: AsyncSession = Depends(get_read_db)):
+    async def build():
+        return species_response(await async_crud.get_species_by_park(db, park_id=park_id))
+
+    return await response_cache.cached(request, ("species",), build)
 
 
-@router.post("/", response_model=schemas.Species, status_code=status.HTTP_201_CREATED)
-def create_species(
+@router.post("/", response_model=schemas.Species, status_code=status.HTTP_201_CREATED, dependencies=[Depends(ratelimit.limit_writes)])
+async def create_species(
     species: schemas.SpeciesCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
+    current_user: models.User = Depends(get_admin_user),
+):
+    return await async_crud.create_species(db, species)
+
+
+@router.post("/bulk", response_model=schemas.ImportReport, dependencies=[Depends(ratelimit.limit_writes)])
+async def bulk_create_species(
+    request: Request,
+    db: AsyncSession = Depends(get_write_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    return crud.create_species(db, species)
+    """
+    Import species from a CSV or NDJSON body. Valid rows are committed chunk by chunk,
+    invalid ones (including unknown park_id) are skipped and reported by line number.
+    """
+    report = bulk.ImportReport()
+    async for rows, errors in bulk.validated_chunks(request, bulk.species_row):
+        known = await async_crud.get_existing_park_ids(db, list({row["park_id"] for _, row in rows}))
+        errors += [
+            {"line": line, "errors": [f"park_id: park {row['park_id']} does not exist"]}
+            for line, row in rows if row["park_id"] not in known
+        ]
+        report.add_errors(sorted(errors, key=lambda error: error["line"]))
+        rows = [row for _, row in rows if row["park_id"] in known]
+        if rows:
+            report.inserted += await async_crud.bulk_create_species(db, rows)
+    return json_response(report.as_dict())
 
 
-@router.put("/{species_id}", response_model=schemas.Species)
-def update_species(
+@router.put("/{species_id}", response_model=schemas.Species, dependencies=[Depends(ratelimit.limit_writes)])
+async def update_species(
     species_id: int,
     species: schemas.SpeciesCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    db_species = crud.update_species(db, species_id=species_id, species=species)
+    db_species = await async_crud.update_species(db, species_id=species_id, species=species)
     if db_species is None:
         raise HTTPException(status_code=404, detail="Species not found")
     return db_species
 
 
-@router.delete("/{species_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_species(
+@router.delete("/{species_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(ratelimit.limit_writes)])
+async def delete_species(
     species_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    if not crud.delete_species(db, species_id=species_id):
+    if not await async_crud.delete_species(db, species_id=species_id):
         raise HTTPException(status_code=404, detail="Species not found")
     return None
\ No newline at end of file
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, schemas, stats
+from app.db import get_read_db
+from app.cache import response_cache
+from app.serializers import json_response, species_to_dict
+
+router = APIRouter(tags=["stats"])
+
+
+@router.get("/stats", response_model=schemas.Stats)
+async def read_stats(
+    request: Request,
+    top: int = Query(10, ge=0, le=100, description="How many parks with the most species to list"),
+    recent: int = Query(10, ge=0, le=100, description="How many of the newest species to list"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Totals and per-park rankings for dashboards, all from the precomputed counters: no
+    request counts or aggregates over the species table.
+    """
+    async def build():
+        totals = await async_crud.get_totals(db)
+        top_parks = await async_crud.get_top_parks(db, top) if top else []
+        species = await async_crud.get_recent_species(db, recent) if recent else []
+        return json_response({
+            **{name: totals.get(name, 0) for name in stats.COUNTERS},
+            "top_parks": [row._asdict() for row in top_parks],
+            "recent_species": [species_to_dict(s) for s in species],
+        })
+
+    return await response_cache.cached(request, ("parks", "species"), build)
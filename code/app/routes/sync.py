@@ -0,0 +1,151 @@
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import async_crud, changelog, config, schemas
+from app.db import get_read_db
+from app.pagination import decode_cursor, encode_cursor
+from app.serializers import dump_json, images_by_park, json_response, park_to_dict, species_to_dict
+
+router = APIRouter(tags=["sync"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def _entities(types: Optional[str]) -> Tuple[str, ...]:
+    if types is None:
+        return changelog.ENTITIES
+    requested = tuple(dict.fromkeys(part.strip() for part in types.split(",") if part.strip()))
+    unknown = set(requested) - set(changelog.ENTITIES)
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail="types must be a comma-separated list of park, species")
+    return requested
+
+
+async def _changes(db: AsyncSession, entries: Sequence[changelog.Entry]) -> List[dict]:
+    """
+    Turn collapsed log entries into sync changes: upserts carry the row as it is now, in
+    the same shape as GET /parks/{id} or /species/{id}. One query per kind for the batch.
+    """
+    wanted = {entity: [] for entity in changelog.ENTITIES}
+    for entry in entries:
+        if entry.op == changelog.UPSERT:
+            wanted[entry.entity].append(entry.entity_id)
+    parks = (
+        {row.id: row for row in await async_crud.get_park_rows_by_ids(db, wanted[changelog.PARK])}
+        if wanted[changelog.PARK] else {}
+    )
+    images = images_by_park(await async_crud.get_images_for_parks(db, list(parks))) if parks else {}
+    species = (
+        {row.id: row for row in await async_crud.get_species_rows_by_ids(db, wanted[changelog.SPECIES])}
+        if wanted[changelog.SPECIES] else {}
+    )
+    changes = []
+    for entry in entries:
+        data = None
+        if entry.op == changelog.UPSERT:
+            if entry.entity == changelog.PARK and entry.entity_id in parks:
+                data = park_to_dict(parks[entry.entity_id], images.get(entry.entity_id, ()))
+            elif entry.entity == changelog.SPECIES and entry.entity_id in species:
+                data = species_to_dict(species[entry.entity_id])
+        # An upsert whose row is already gone was deleted by a later change, so it syncs as that delete
+        change = {"op": changelog.UPSERT if data is not None else changelog.DELETE, "type": entry.entity, "id": entry.entity_id}
+        if data is not None:
+            change["data"] = data
+        changes.append(change)
+    return changes
+
+
+async def _ndjson(db: AsyncSession, since: int, limit: int, entities: Tuple[str, ...]) -> AsyncIterator[bytes]:
+    """
+    Every change past ``since``, one per line, read ``limit`` log rows at a time; the last
+    line holds the token for the next sync. The generator owns and closes ``db``.
+    """
+    try:
+        has_more = True
+        while has_more:
+            entries, since, has_more = await async_crud.get_changes(db, since, limit, entities)
+            changes = await _changes(db, entries)
+            if changes:
+                yield b"".join(dump_json(change) + b"\n" for change in changes)
+        yield dump_json({"next": encode_cursor(since)}) + b"\n"
+    finally:
+        await db.close()
+
+
+def _event(name: str, token: str, data) -> bytes:
+    return b"id: " + token.encode() + b"\nevent: " + name.encode() + b"\ndata: " + dump_json(data) + b"\n\n"
+
+
+async def _sse(
+    db: AsyncSession, since: int, limit: int, entities: Tuple[str, ...], follow: bool
+) -> AsyncIterator[bytes]:
+    """
+    Server-sent events: the backlog past ``since``, a ``caught-up`` event, then (with
+    ``follow``) new changes as they are committed, until SYNC_STREAM_MAX_SECONDS have passed.
+
+    Each event id is the token to resume from, which EventSource sends back as
+    Last-Event-ID when it reconnects.
+    """
+    deadline = time.monotonic() + config.SYNC_STREAM_MAX_SECONDS
+    caught_up = False
+    idle = 0.0
+    try:
+        while True:
+            entries, since, has_more = await async_crud.get_changes(db, since, limit, entities)
+            changes = await _changes(db, entries)
+            # Hand the connection back while waiting; the next poll also starts a fresh snapshot
+            await db.close()
+            if changes:
+                idle = 0.0
+                yield b"".join(
+                    _event(change["op"], encode_cursor(entry.change_id), change) for entry, change in zip(entries, changes)
+                )
+            if has_more:
+                continue
+            if not caught_up:
+                caught_up = True
+                yield _event("caught-up", encode_cursor(since), {"next": encode_cursor(since)})
+            if not follow or time.monotonic() >= deadline:
+                return
+            if idle >= config.SYNC_KEEPALIVE:
+                idle = 0.0
+                yield b": keepalive\n\n"
+            await asyncio.sleep(config.SYNC_POLL_INTERVAL)
+            idle += config.SYNC_POLL_INTERVAL
+    finally:
+        await db.close()
+
+
+@router.get("/sync", response_model=schemas.SyncPage)
+async def sync(
+    request: Request,
+    since: Optional[str] = Query(
+        None, description="Token from the previous sync; omit it or pass 0 to receive every park and species once"
+    ),
+    types: Optional[str] = Query(None, description="Comma-separated kinds to sync: park, species"),
+    limit: int = Query(config.SYNC_BATCH_SIZE, ge=1, le=config.SYNC_MAX_BATCH),
+    format: str = Query("json", pattern="^(json|ndjson|sse)$"),
+    follow: bool = Query(True, description="sse only: keep the stream open and push changes as they happen"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Upserts and deletes since ``since``, in the order they happened, each row once however
+    many times it changed. ``json`` returns one batch of at most ``limit`` log rows with the
+    next token; ``ndjson`` and ``sse`` stream until the client is caught up.
+    """
+    entities = _entities(types)
+    if format == "sse":
+        # EventSource resends the last event id it saw when it reconnects
+        since = request.headers.get("last-event-id") or since
+    # "0" is the token a client holds before its first sync
+    start = decode_cursor(since) if since and since != "0" else 0
+    if format == "json":
+        entries, last, has_more = await async_crud.get_changes(db, start, limit, entities)
+        return json_response({"changes": await _changes(db, entries), "next": encode_cursor(last), "has_more": has_more})
+    stream = _ndjson(db, start, limit, entities) if format == "ndjson" else _sse(db, start, limit, entities, follow)
+    return StreamingResponse(stream, media_type=MEDIA_TYPES[format], headers={"Cache-Control": "no-cache"})
@@ -1,46 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app import crud, schemas, models
-from app.db import get_db
-from app.auth import create_access_token, get_current_user, get_admin_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, hashing, ratelimit, schemas, models
+from app.db import get_async_db, get_write_db
+from app.auth import create_access_token, decode_token, get_current_user, get_admin_user, oauth2_scheme
+from app.pagination import after_id_from, set_next_cursor
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_username(db, username=user.username)
+@router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED, dependencies=[Depends(ratelimit.limit_register)])
+async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await async_crud.get_user_by_username(db, username=user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
-    return crud.create_user(db, user)
+    hashed_password = await hashing.hash_password(user.password)
+    return await async_crud.create_user(db, user, hashed_password=hashed_password)
 
-@router.post("/login", response_model=schemas.Token)
-def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_username(db, username=form_data.username)
-    if not user or not crud.verify_password(form_data.password, user.password):
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(ratelimit.limit_login)])
+async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await async_crud.get_user_by_username(db, username=form_data.username)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = create_access_token(data={"sub": user.username, "role": user.role })
+    verified, new_hash = await hashing.verify_and_update(form_data.password, user.password)
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash predates the current scheme/work factor, upgrade it transparently
+        await async_crud.update_user_password(db, user_id=user.id, hashed_password=new_hash)
+    access_token = create_access_token(data={"sub": user.username, "uid": user.id, "role": user.role })
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    payload = decode_token(token)
+    if payload.get("jti"):
+        # Recorded in the database so every worker rejects the token, not just this one
+        await async_crud.revoke_token(db, payload["jti"], payload["exp"])
+    return None
+
 @router.get("/me", response_model=schemas.User)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
+async def read_users_me(current_user: models.User = Depends(get_current_user)):
     return current_user
 
 @router.get("/", response_model=list[schemas.User])
-def read_users(db: Session = Depends(get_db), current_user: models.User = Depends(get_admin_user), skip: int = 0, limit: int = 100):
-    users = crud.get_users(db, skip=skip, limit=limit)
+async def read_users(response: Response, db: AsyncSession = Depends(get_async_db), current_user: models.User = Depends(get_admin_user), skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    users = await async_crud.get_users(db, skip=skip, limit=limit, after_id=after_id_from(cursor))
+    set_next_cursor(response, users, limit)
     return users
     
 
 @router.put("/{user_id}/role", response_model=schemas.User)
-def update_user_role(
+async def update_user_role(
     user_id: int,
     role: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
     current_user: models.User = Depends(get_admin_user),
 ):
-    db_user = crud.update_user_role(db, user_id=user_id, role=role)
+    db_user = await async_crud.update_user_role(db, user_id=user_id, role=role)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
\ No newline at end of file
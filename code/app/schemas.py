@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 
 class Location(BaseModel):
@@ -6,11 +7,39 @@ class Location(BaseModel):
     longitude: float
 
 
+class ParkImageBase(BaseModel):
+    url: str
+    width: Optional[int] = Field(None, gt=0)
+    height: Optional[int] = Field(None, gt=0)
+    content_hash: Optional[str] = None
+
+class ParkImageCreate(ParkImageBase):
+    # 0-based place in the gallery; appended after the last image when omitted
+    position: Optional[int] = Field(None, ge=0)
+
+class ParkImage(ParkImageBase):
+    id: int
+    position: int
+    class Config:
+        orm_mode = True
+
+
 class ParkBase(BaseModel):
     name: str
     description: str
     location: Location
-    images: Optional[str] = None
+    # Leaving images out of an update keeps the park's current gallery
+    images: Optional[List[ParkImageBase]] = None
+
+    @field_validator("images", mode="before")
+    @classmethod
+    def _image_urls(cls, value):
+        # Also accept plain URLs, and the comma-joined string older clients send
+        if isinstance(value, str):
+            value = [url.strip() for url in value.split(",") if url.strip()]
+        if isinstance(value, list):
+            value = [{"url": item} if isinstance(item, str) else item for item in value]
+        return value
     
 class ParkCreate(ParkBase):
   pass
@@ -18,12 +47,17 @@ class ParkCreate(ParkBase):
 
 class Park(ParkBase):
     id: int
-    created_at : Optional[str] = None
-    updated_at : Optional[str] = None
+    images: List[ParkImage] = []
+    created_at : Optional[datetime] = None
+    updated_at : Optional[datetime] = None
     class Config:
         orm_mode = True
 
 
+class NearbyPark(Park):
+    distance_km: float
+
+
 class SpeciesBase(BaseModel):
     name: str
     scientific_name: Optional[str] = None
@@ -35,11 +69,15 @@ class SpeciesCreate(SpeciesBase):
 
 class Species(SpeciesBase):
     id: int
-    created_at : Optional[str] = None
-    updated_at : Optional[str] = None
+    created_at : Optional[datetime] = None
+    updated_at : Optional[datetime] = None
     class Config:
         orm_mode = True
 
+class ParkWithSpecies(Park):
+    species: List[Species]
+    species_count: int
+
 class UserBase(BaseModel):
   username: str
 
@@ -49,8 +87,8 @@ class UserCreate(UserBase):
 class User(UserBase):
     id: int
     role: str
-    created_at : Optional[str] = None
-    updated_at : Optional[str] = None
+    created_at : Optional[datetime] = None
+    updated_at : Optional[datetime] = None
 
     class Config:
         orm_mode = True
@@ -59,8 +97,57 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
 
+class RowError(BaseModel):
+    line: int
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[RowError]
+    errors_truncated: bool
+
+class SearchResult(BaseModel):
+    type: str
+    id: int
+    name: str
+    snippet: Optional[str] = None
+    score: float
+
 class WeatherData(BaseModel):
     temperature: float
     description: str
     humidity: int
-    wind_speed: float
\ No newline at end of file
+    wind_speed: float
+
+class SyncChange(BaseModel):
+    op: str
+    type: str
+    id: int
+    # The current row for upserts, absent for deletes
+    data: Optional[dict] = None
+
+class SyncPage(BaseModel):
+    changes: List[SyncChange]
+    next: str
+    has_more: bool
+
+class ParkStats(BaseModel):
+    park_id: int
+    species_count: int
+    image_count: int
+    # Newest first
+    recent_species: List[Species]
+
+class TopPark(BaseModel):
+    park_id: int
+    name: str
+    species_count: int
+    image_count: int
+
+class Stats(BaseModel):
+    parks: int
+    species: int
+    park_images: int
+    top_parks: List[TopPark]
+    recent_species: List[Species]
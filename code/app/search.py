@@ -0,0 +1,125 @@
+import re
+from typing import List, Optional, Sequence
+
+from sqlalchemy import or_, select, text, union_all, literal
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app import models
+
+# External-content FTS5 tables: the text lives in parks/species, the index is kept in sync by triggers
+FTS_TABLES = {
+    "parks_fts": ("parks", ("name", "description")),
+    "species_fts": ("species", ("name", "scientific_name", "description")),
+}
+
+# bm25 column weights, a hit in the name outranks one in the description
+_PARK_WEIGHTS = "10.0, 1.0"
+_SPECIES_WEIGHTS = "10.0, 5.0, 1.0"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts_ddl(fts_table: str, content_table: str, columns: Sequence[str]) -> List[str]:
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{cols}, content='{content_table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE ON {content_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+    ]
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Create the FTS5 tables and sync triggers (SQLite only), backfilling any new table.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    for fts_table, (content_table, columns) in FTS_TABLES.items():
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts_table}
+        ).first()
+        for statement in _fts_ddl(fts_table, content_table, columns):
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+
+
+def to_match_query(q: str) -> Optional[str]:
+    """
+    Turn free text into an FTS5 query: every word must match, each as a prefix.
+    """
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search(db: Session, q: str, kinds: Sequence[str] = ("park", "species"), limit: int = 20, offset: int = 0):
+    match = to_match_query(q)
+    if match is None:
+        return []
+    if db.get_bind().dialect.name != "sqlite":
+        return _search_like(db, q, kinds, limit, offset)
+    parts = []
+    if "park" in kinds:
+        parts.append(
+            "SELECT 'park' AS type, rowid AS id, name, "
+            "snippet(parks_fts, -1, '[', ']', '…', 12) AS snippet, "
+            f"bm25(parks_fts, {_PARK_WEIGHTS}) AS rank FROM parks_fts WHERE parks_fts MATCH :match"
+        )
+    if "species" in kinds:
+        parts.append(
+            "SELECT 'species' AS type, rowid AS id, name, "
+            "snippet(species_fts, -1, '[', ']', '…', 12) AS snippet, "
+            f"bm25(species_fts, {_SPECIES_WEIGHTS}) AS rank FROM species_fts WHERE species_fts MATCH :match"
+        )
+    if not parts:
+        return []
+    statement = text(f"{' UNION ALL '.join(parts)} ORDER BY rank LIMIT :limit OFFSET :offset")
+    return db.execute(statement, {"match": match, "limit": limit, "offset": offset}).all()
+
+
+def _like_pattern(q: str) -> str:
+    # The query is matched literally, so its own wildcards and the escape character are escaped
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _search_like(db: Session, q: str, kinds: Sequence[str], limit: int, offset: int):
+    # Servers without FTS5 get an unranked substring match over the same columns
+    pattern = _like_pattern(q)
+    parts = []
+    if "park" in kinds:
+        parts.append(
+            select(
+                literal("park").label("type"), models.Park.id, models.Park.name,
+                models.Park.description.label("snippet"), literal(0.0).label("rank"),
+            ).where(or_(
+                models.Park.name.ilike(pattern, escape="\\"),
+                models.Park.description.ilike(pattern, escape="\\"),
+            ))
+        )
+    if "species" in kinds:
+        parts.append(
+            select(
+                literal("species").label("type"), models.Species.id, models.Species.name,
+                models.Species.description.label("snippet"), literal(0.0).label("rank"),
+            ).where(or_(
+                models.Species.name.ilike(pattern, escape="\\"),
+                models.Species.scientific_name.ilike(pattern, escape="\\"),
+                models.Species.description.ilike(pattern, escape="\\"),
+            ))
+        )
+    if not parts:
+        return []
+    return db.execute(union_all(*parts).limit(limit).offset(offset)).all()
@@ -0,0 +1,166 @@
+import json
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Response
+
+from app import models
+
+# Columns selected by the fast park read path; rows come back as plain tuples
+PARK_COLUMNS = (
+    models.Park.id,
+    models.Park.name,
+    models.Park.description,
+    models.Park.latitude,
+    models.Park.longitude,
+    models.Park.created_at,
+    models.Park.updated_at,
+)
+
+# schemas.Park keys in output order and the columns each one is read from (images live in park_images)
+PARK_FIELDS = {
+    "name": (models.Park.name,),
+    "description": (models.Park.description,),
+    "location": (models.Park.latitude, models.Park.longitude),
+    "images": (),
+    "id": (models.Park.id,),
+    "created_at": (models.Park.created_at,),
+    "updated_at": (models.Park.updated_at,),
+}
+
+IMAGE_COLUMNS = (
+    models.ParkImage.park_id,
+    models.ParkImage.id,
+    models.ParkImage.position,
+    models.ParkImage.url,
+    models.ParkImage.width,
+    models.ParkImage.height,
+    models.ParkImage.content_hash,
+)
+
+SPECIES_COLUMNS = (
+    models.Species.id,
+    models.Species.name,
+    models.Species.scientific_name,
+    models.Species.park_id,
+    models.Species.description,
+    models.Species.image,
+    models.Species.created_at,
+    models.Species.updated_at,
+)
+
+# schemas.Species keys in output order, each read from the column of the same name
+SPECIES_FIELDS = {
+    name: (getattr(models.Species, name),)
+    for name in ("name", "scientific_name", "park_id", "description", "image", "id", "created_at", "updated_at")
+}
+
+
+def columns_for(all_fields: Dict[str, tuple], fields: Set[str]) -> Tuple:
+    """
+    Columns to select for a ``fields=`` projection. The id is always selected,
+    since cursors, includes and images are keyed on it.
+    """
+    id_column = all_fields["id"][0]
+    return (id_column,) + tuple(
+        column for name, columns in all_fields.items() if name in fields for column in columns if column is not id_column
+    )
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def image_to_dict(image) -> dict:
+    return {
+        "url": image.url,
+        "width": image.width,
+        "height": image.height,
+        "content_hash": image.content_hash,
+        "id": image.id,
+        "position": image.position,
+    }
+
+
+def images_by_park(image_rows: Iterable) -> Dict[int, list]:
+    """
+    Group image rows (from crud.get_images_for_parks, already in gallery order) by park id.
+    """
+    grouped: Dict[int, list] = {}
+    for row in image_rows:
+        grouped.setdefault(row.park_id, []).append(row)
+    return grouped
+
+
+def park_to_dict(park, images: Iterable = (), fields: Optional[Set[str]] = None) -> dict:
+    """
+    Build the schemas.Park shape from a row tuple or a models.Park instance and its image rows.
+
+    With ``fields``, only those keys are built, from a row selected with columns_for(PARK_FIELDS, fields).
+    """
+    if fields is not None:
+        return {name: _park_value(park, name, images) for name in PARK_FIELDS if name in fields}
+    return {
+        "name": park.name,
+        "description": park.description,
+        "location": {"latitude": park.latitude, "longitude": park.longitude},
+        "images": [image_to_dict(image) for image in images],
+        "id": park.id,
+        "created_at": park.created_at,
+        "updated_at": park.updated_at,
+    }
+
+
+def _park_value(park, name: str, images: Iterable):
+    if name == "location":
+        return {"latitude": park.latitude, "longitude": park.longitude}
+    if name == "images":
+        return [image_to_dict(image) for image in images]
+    return getattr(park, name)
+
+
+def species_to_dict(species, fields: Optional[Set[str]] = None) -> dict:
+    if fields is not None:
+        return {name: getattr(species, name) for name in SPECIES_FIELDS if name in fields}
+    return {
+        "name": species.name,
+        "scientific_name": species.scientific_name,
+        "park_id": species.park_id,
+        "description": species.description,
+        "image": species.image,
+        "id": species.id,
+        "created_at": species.created_at,
+        "updated_at": species.updated_at,
+    }
+
+
+def parks_with_species(parks: List[dict], species_rows: Iterable) -> list:
+    """
+    Nest species rows (from crud.get_species_for_parks) under already serialized parks.
+    """
+    embedded = {}
+    counts = {}
+    for row in species_rows:
+        embedded.setdefault(row.park_id, []).append(species_to_dict(row))
+        counts[row.park_id] = row.total
+    return [
+        dict(park, species=embedded.get(park["id"], []), species_count=counts.get(park["id"], 0))
+        for park in parks
+    ]
+
+
+def dump_json(content) -> bytes:
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def json_response(content, status_code: int = 200, headers=None) -> Response:
+    """
+    Return already-shaped content without a second pass through response_model validation.
+    """
+    return Response(dump_json(content), status_code=status_code, headers=headers, media_type="application/json")
+
+
+def species_response(species: Iterable, status_code: int = 200, headers=None, fields: Optional[Set[str]] = None) -> Response:
+    return json_response([species_to_dict(s, fields) for s in species], status_code, headers)
@@ -0,0 +1,186 @@
+from collections import Counter as Tally
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+PARKS = "parks"
+SPECIES = "species"
+PARK_IMAGES = "park_images"
+COUNTERS = (PARKS, SPECIES, PARK_IMAGES)
+
+counters = models.Counter.__table__
+park_stats = models.ParkStats.__table__
+
+# Every write moves the counters before park_stats rows, the order rebuild locks them in,
+# so concurrent writers and a rebuild queue up instead of deadlocking.
+
+
+def add(db: Session, name: str, delta: int) -> None:
+    """
+    Move counter ``name`` by ``delta`` inside ``db``'s open transaction, like changelog.record,
+    so the totals commit (or roll back) together with the rows they count.
+    """
+    if delta:
+        db.execute(update(counters).where(counters.c.name == name).values(value=counters.c.value + delta))
+
+
+def _adjust_parks(db: Session, column: str, deltas: Dict[Optional[int], int]) -> None:
+    rows = [{"key": park_id, "delta": delta} for park_id, delta in deltas.items() if park_id is not None and delta]
+    if rows:
+        db.execute(
+            update(park_stats)
+            .where(park_stats.c.park_id == bindparam("key"))
+            .values({column: park_stats.c[column] + bindparam("delta")}),
+            rows,
+        )
+
+
+def parks_added(db: Session, image_counts: Dict[int, int]) -> None:
+    """
+    Start stats rows for new parks, ``image_counts`` mapping each park id to its gallery size.
+    """
+    if not image_counts:
+        return
+    add(db, PARKS, len(image_counts))
+    add(db, PARK_IMAGES, sum(image_counts.values()))
+    db.execute(insert(park_stats), [
+        {"park_id": park_id, "species_count": 0, "image_count": images} for park_id, images in image_counts.items()
+    ])
+
+
+def park_removed(db: Session, park_id: int) -> None:
+    # Its species are detached rather than deleted, so only the park and its images leave the totals
+    images = db.scalar(select(park_stats.c.image_count).where(park_stats.c.park_id == park_id)) or 0
+    add(db, PARKS, -1)
+    add(db, PARK_IMAGES, -images)
+    db.execute(delete(park_stats).where(park_stats.c.park_id == park_id))
+
+
+def images_changed(db: Session, park_id: int, delta: int) -> None:
+    add(db, PARK_IMAGES, delta)
+    _adjust_parks(db, "image_count", {park_id: delta})
+
+
+def species_added(db: Session, park_ids: Iterable[Optional[int]]) -> None:
+    """
+    Count new species, given the park id of each (None for species outside any park).
+    """
+    per_park = Tally(park_ids)
+    add(db, SPECIES, sum(per_park.values()))
+    _adjust_parks(db, "species_count", per_park)
+
+
+def species_removed(db: Session, park_id: Optional[int]) -> None:
+    add(db, SPECIES, -1)
+    _adjust_parks(db, "species_count", {park_id: -1})
+
+
+def species_moved(db: Session, old_park_id: Optional[int], new_park_id: Optional[int]) -> None:
+    if old_park_id != new_park_id:
+        _adjust_parks(db, "species_count", {old_park_id: -1, new_park_id: 1})
+
+
+def totals(db: Session) -> Dict[str, int]:
+    return dict(db.execute(select(counters.c.name, counters.c.value)).all())
+
+
+def for_park(db: Session, park_id: int):
+    return db.execute(select(park_stats).where(park_stats.c.park_id == park_id)).first()
+
+
+def top_parks(db: Session, limit: int):
+    """
+    The ``limit`` parks with the most species, read in order from the species_count index.
+    """
+    query = (
+        select(park_stats.c.park_id, models.Park.name, park_stats.c.species_count, park_stats.c.image_count)
+        .join(models.Park, models.Park.id == park_stats.c.park_id)
+        .order_by(park_stats.c.species_count.desc(), park_stats.c.park_id)
+        .limit(limit)
+    )
+    return db.execute(query).all()
+
+
+def _expected_totals(db: Session) -> Dict[str, int]:
+    return {
+        PARKS: db.scalar(select(func.count()).select_from(models.Park)),
+        SPECIES: db.scalar(select(func.count()).select_from(models.Species)),
+        PARK_IMAGES: db.scalar(select(func.count()).select_from(models.ParkImage)),
+    }
+
+
+def _species_count(park_id):
+    # Correlated counts, each answered from the (park_id, ...) index of its table
+    return select(func.count()).where(models.Species.park_id == park_id).scalar_subquery()
+
+
+def _image_count(park_id):
+    return select(func.count()).where(models.ParkImage.park_id == park_id).scalar_subquery()
+
+
+def _expected_park_stats():
+    return select(
+        models.Park.id.label("park_id"),
+        _species_count(models.Park.id).label("species_count"),
+        _image_count(models.Park.id).label("image_count"),
+    )
+
+
+def check(db: Session) -> Dict[str, object]:
+    """
+    Compare the stored stats with counts taken from the tables themselves. Returns the
+    counters that differ as {name: {"stored": .., "actual": ..}} and how many parks'
+    rows are wrong, missing or left over from deleted parks.
+    """
+    stored = totals(db)
+    drifted = {
+        name: {"stored": stored.get(name), "actual": actual}
+        for name, actual in _expected_totals(db).items()
+        if stored.get(name) != actual
+    }
+    expected = _expected_park_stats().subquery()
+    wrong = db.scalar(
+        select(func.count())
+        .select_from(expected.outerjoin(park_stats, park_stats.c.park_id == expected.c.park_id))
+        .where(or_(
+            park_stats.c.park_id.is_(None),
+            park_stats.c.species_count != expected.c.species_count,
+            park_stats.c.image_count != expected.c.image_count,
+        ))
+    )
+    orphaned = db.scalar(
+        select(func.count()).select_from(park_stats).where(park_stats.c.park_id.not_in(select(models.Park.id)))
+    )
+    return {"counters": drifted, "parks": wrong + orphaned}
+
+
+def rebuild(db: Session) -> Dict[str, object]:
+    """
+    Recompute every counter and park row from the tables, in the caller's transaction.
+    Returns the drift found beforehand (see check).
+
+    Rows are updated in place, never deleted and re-added: on PostgreSQL the counter rows
+    are locked first, and writers queued behind the rebuild then apply their deltas on top
+    of the recomputed values instead of to rows that no longer exist.
+    """
+    db.execute(select(counters.c.name).with_for_update())
+    drift = check(db)
+    stored = totals(db)
+    for name, value in _expected_totals(db).items():
+        if name in stored:
+            db.execute(update(counters).where(counters.c.name == name).values(value=value))
+        else:
+            db.execute(insert(counters).values(name=name, value=value))
+    db.execute(update(park_stats).values(
+        species_count=_species_count(park_stats.c.park_id), image_count=_image_count(park_stats.c.park_id)
+    ))
+    db.execute(insert(park_stats).from_select(
+        ["park_id", "species_count", "image_count"],
+        _expected_park_stats().where(models.Park.id.not_in(select(park_stats.c.park_id))),
+    ))
+    db.execute(delete(park_stats).where(park_stats.c.park_id.not_in(select(models.Park.id))))
+    return drift
+
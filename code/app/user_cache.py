@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app import config, schemas
+
+
+class UserCache:
+    """
+    Small in-process TTL cache of authenticated principals, keyed by username.
+
+    ``invalidate`` also records when the user last changed, so tokens issued
+    before that moment are no longer trusted on their claims alone.
+    """
+
+    def __init__(self, ttl: float = config.USER_CACHE_TTL, max_size: int = config.USER_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._changed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[schemas.User]:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[username]
+                return None
+            return entry[1]
+
+    def put(self, user: schemas.User) -> None:
+        with self._lock:
+            self._entries[user.username] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str, at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries.pop(username, None)
+            changed_at = time.time() if at is None else at
+            self._changed_at[username] = max(changed_at, self._changed_at.get(username, 0.0))
+
+    def changed_since(self, username: str, issued_at: float) -> bool:
+        return self._changed_at.get(username, 0.0) >= issued_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._changed_at.clear()
+
+
+class RevocationList:
+    """
+    Revoked token ids (``jti``), kept until the token would have expired anyway.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._revoked[jti] = expires_at
+            now = time.time()
+            for key in [k for k, exp in self._revoked.items() if exp < now]:
+                del self._revoked[key]
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+
+
+user_cache = UserCache()
+revoked_tokens = RevocationList()
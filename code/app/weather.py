@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from app import config, metrics
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class WeatherUnavailable(Exception):
+    """
+    Raised when the upstream weather API fails or returns an unusable payload.
+    """
+
+
+class WeatherClient:
+    """
+    Async OpenWeatherMap client with a shared connection pool, a TTL cache keyed
+    on rounded coordinates and single-flight fetches per cache key.
+
+    The cache is an LRU of at most ``max_entries`` coordinates. Each write also drops the
+    least recently used entries that are past their stale window, so coordinates nobody
+    asks for again don't stay in memory until the cap is reached.
+    """
+
+    def __init__(
+        self,
+        base_url: str = config.WEATHER_API_URL,
+        api_key: str = config.WEATHER_API_KEY,
+        ttl: float = config.WEATHER_CACHE_TTL,
+        stale_ttl: float = config.WEATHER_STALE_TTL,
+        max_entries: int = config.WEATHER_CACHE_MAX_ENTRIES,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        # httpx is only imported once a weather client is actually needed
+        import httpx
+
+        self.base_url = base_url
+        self.api_key = api_key
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.upstream_calls = 0
+        self._client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(config.WEATHER_TIMEOUT, connect=config.WEATHER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=config.WEATHER_MAX_CONNECTIONS,
+                max_keepalive_connections=config.WEATHER_MAX_CONNECTIONS,
+            ),
+        )
+        self._cache: "OrderedDict[Tuple[float, float], Tuple[float, dict]]" = OrderedDict()
+        self._inflight: Dict[Tuple[float, float], asyncio.Task] = {}
+
+    async def get_weather(self, latitude: float, longitude: float) -> dict:
+        key = (
+            round(latitude, config.WEATHER_COORD_PRECISION),
+            round(longitude, config.WEATHER_COORD_PRECISION),
+        )
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                metrics.weather_cache.inc("hit")
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                # Serve the stale value and let the refresh finish in the background
+                metrics.weather_cache.inc("stale")
+                self._refresh(key)
+                return entry[1]
+        metrics.weather_cache.inc("miss")
+        # shield() keeps a cancelled request from cancelling the fetch other callers share
+        return await asyncio.shield(self._refresh(key))
+
+    def _refresh(self, key: Tuple[float, float]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return task
+
+    def _fetch_done(self, key: Tuple[float, float], task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved so failed background refreshes don't warn
+            task.exception()
+
+    async def _fetch(self, key: Tuple[float, float]) -> dict:
+        import httpx
+
+        latitude, longitude = key
+        params = {"lat": latitude, "lon": longitude, "appid": self.api_key, "units": "metric"}
+        self.upstream_calls += 1
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._client.get(self.base_url, params=params)
+            response.raise_for_status()
+            payload = response.json()
+            data = {
+                "temperature": payload["main"]["temp"],
+                "description": payload["weather"][0]["description"],
+                "humidity": payload["main"]["humidity"],
+                "wind_speed": payload["wind"]["speed"],
+            }
+            outcome = "ok"
+        except (httpx.HTTPError, ValueError, KeyError, IndexError, TypeError) as exc:
+            raise WeatherUnavailable(str(exc)) from exc
+        finally:
+            metrics.weather_upstream_duration.observe(outcome, value=time.perf_counter() - start)
+        self._store(key, data)
+        return data
+
+    def _store(self, key: Tuple[float, float], data: dict) -> None:
+        now = time.monotonic()
+        self._cache[key] = (now, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > 1:
+            oldest_key, (fetched_at, _) = next(iter(self._cache.items()))
+            if len(self._cache) <= self.max_entries and now - fetched_at < self.ttl + self.stale_ttl:
+                break
+            del self._cache[oldest_key]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: Optional[WeatherClient] = None
+
+
+def get_weather_client() -> WeatherClient:
+    global _client
+    if _client is None:
+        _client = WeatherClient()
+    return _client
+
+
+def set_weather_client(client: Optional[WeatherClient]) -> None:
+    """
+    Replace the shared client, e.g. with one bound to a stub upstream transport.
+    """
+    global _client
+    _client = client
+
+
+async def close_weather_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from app import config, log, metrics
+
+logger = log.get_logger(__name__)
+
+
+class Job(NamedTuple):
+    fn: Callable
+    args: tuple
+    future: asyncio.Future
+
+
+def _apply(session, jobs: List[Job]) -> list:
+    results = [job.fn(session, *job.args, commit=False) for job in jobs]
+    session.commit()
+    return results
+
+
+class WriteQueue:
+    """
+    Group commit for the admin writes: concurrent requests hand their crud write to one
+    flusher task, which runs up to ``max_batch`` of them in a single transaction and commits
+    once, so a burst pays one lock acquisition and one fsync per group instead of per write.
+
+    A group is closed ``interval`` seconds after its first write or when full; writes that
+    arrive while it commits form the next one. If any write in a group fails, the group is
+    rolled back and its writes replayed one transaction each, so only the failing request
+    sees the error. Each crud function must accept ``commit=False`` and leave committing to
+    the caller, and ``write`` is the retrying runner (async_crud._write) used for both.
+    """
+
+    def __init__(
+        self,
+        write: Callable[..., Awaitable],
+        interval: float = config.GROUP_COMMIT_INTERVAL,
+        max_batch: int = config.GROUP_COMMIT_MAX_BATCH,
+        drain_timeout: float = config.GROUP_COMMIT_DRAIN_TIMEOUT,
+    ):
+        self.write = write
+        self.interval = interval
+        self.max_batch = max_batch
+        self.drain_timeout = drain_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session_factory = None
+        # The group being collected or committed, taken off the queue but not yet settled
+        self._group: List[Job] = []
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def submit(self, fn: Callable, *args):
+        """
+        Queue ``fn(session, *args, commit=False)`` and return its result once its group commits.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(Job(fn, args, future))
+        return await future
+
+    async def _next_group(self) -> List[Job]:
+        group = self._group = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.interval
+        while len(group) < self.max_batch:
+            if not self._queue.empty():
+                group.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                group.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return group
+
+    async def _commit(self, group: List[Job]) -> None:
+        metrics.group_commit_size.observe(value=len(group))
+        async with self._session_factory() as db:
+            try:
+                results = await self.write(db, _apply, group)
+            except Exception as exc:
+                await db.rollback()
+                if len(group) == 1:
+                    _settle(group[0], exc=exc)
+                    return
+                log.event(logger, logging.DEBUG, "write group failed, replaying singly", size=len(group))
+                for job in group:
+                    await self._commit([job])
+                return
+        for job, result in zip(group, results):
+            _settle(job, result)
+
+    async def _run(self) -> None:
+        while True:
+            group = await self._next_group()
+            try:
+                await self._commit(group)
+            except Exception as exc:
+                # Never leave a request waiting on a group the flusher could not finish
+                for job in group:
+                    _settle(job, exc=exc)
+            finally:
+                self._group = []
+                for _ in group:
+                    self._queue.task_done()
+
+    async def start(self, session_factory) -> None:
+        if self._task is None:
+            self._session_factory = session_factory
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Wait up to ``drain_timeout`` for the queued writes to commit, then stop the flusher and
+        fail whatever is still pending, so no request waits on a queue nobody reads.
+        """
+        if self._task is None:
+            return
+        # Commit what was already accepted rather than failing those requests, for a while
+        try:
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            log.event(logger, logging.WARNING, "write queue not drained, failing the rest", queued=self._queue.qsize())
+        # The flusher clears its group as it unwinds; whatever it held is failed below
+        unsettled = self._group
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        stopped = RuntimeError("Write queue stopped before the write committed")
+        for job in unsettled:
+            _settle(job, exc=stopped)
+        while not self._queue.empty():
+            _settle(self._queue.get_nowait(), exc=stopped)
+
+
+def _settle(job: Job, result=None, exc: Optional[BaseException] = None) -> None:
+    # The request may have gone away (client disconnect cancels its future)
+    if job.future.done():
+        return
+    if exc is not None:
+        job.future.set_exception(exc)
+    else:
+        job.future.set_result(result)
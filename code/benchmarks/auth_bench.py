@@ -0,0 +1,62 @@
+"""
+Authenticated request latency with AUTH_MODE=db vs AUTH_MODE=stateless.
+
+    python -m benchmarks.auth_bench --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app import config
+from app.auth import create_access_token
+from app.main import app
+from app.user_cache import user_cache
+from benchmarks.common import override_db, summarize, temp_database
+
+
+async def drive(token: str, requests: int, concurrency: int) -> dict:
+    samples = []
+    pending = iter(range(requests))
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+        async def worker():
+            for _ in pending:
+                start = time.perf_counter()
+                response = await http.get("/users/me", headers=headers)
+                response.raise_for_status()
+                samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return dict(summarize(samples), rps=requests / elapsed)
+
+
+async def run(requests: int, concurrency: int, async_engine) -> dict:
+    token = create_access_token({"sub": "user1", "uid": 1, "role": "visitor"})
+    results = {}
+    try:
+        for mode in ("db", "stateless"):
+            config.AUTH_MODE = mode
+            user_cache.clear()
+            results[mode] = await drive(token, requests, concurrency)
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    with temp_database(parks=1, users=1000) as session_factory:
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(args.requests, args.concurrency, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
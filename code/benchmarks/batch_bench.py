@@ -0,0 +1,78 @@
+"""
+Fetching N parks or species with one GET ?ids=... vs N GETs of /{id}, the way clients
+load favourites and itinerary stops.
+
+    python -m benchmarks.batch_bench --sizes 1 10 50 100 --rounds 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from app import ratelimit
+from app.cache import response_cache
+from app.main import app
+from benchmarks.common import override_db, temp_database
+
+
+async def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await fn()
+    return (time.perf_counter() - start) / rounds
+
+
+async def run(sizes, rounds: int, parks: int, species: int, async_engine) -> dict:
+    rng = random.Random(7)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+            # Warm up the pool and route setup so the first size isn't charged for it
+            await http.get("/parks/1")
+            for kind, total in (("parks", parks), ("species", species)):
+                for size in sizes:
+                    ids = rng.sample(range(1, total + 1), size)
+
+                    async def batch():
+                        response = await http.get(f"/{kind}/", params={"ids": ",".join(map(str, ids))})
+                        response.raise_for_status()
+                        assert [item["id"] for item in response.json()] == ids
+
+                    async def one_by_one():
+                        for item_id in ids:
+                            (await http.get(f"/{kind}/{item_id}")).raise_for_status()
+
+                    batch_seconds = await timed(batch, rounds)
+                    single_seconds = await timed(one_by_one, rounds)
+                    results[f"{kind}_{size}"] = {
+                        "batch_ms": batch_seconds * 1000,
+                        "per_id_ms": single_seconds * 1000,
+                        "batch_items_per_second": size / batch_seconds,
+                        "per_id_items_per_second": size / single_seconds,
+                        "speedup": single_seconds / batch_seconds,
+                    }
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--parks", type=int, default=1000)
+    parser.add_argument("--species", type=int, default=20_000)
+    args = parser.parse_args()
+    # Both paths have to reach the database every round
+    response_cache.backend = None
+    ratelimit.limiter.backend = None
+    with temp_database(parks=args.parks, species=args.species) as session_factory:
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(args.sizes, args.rounds, args.parks, args.species, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Species ingest throughput: POST /species/bulk (streamed NDJSON) vs one POST /species/ per row,
+and the streaming export's rows/s and peak Python memory.
+
+    python -m benchmarks.bulk_bench --rows 200000 --single-rows 500
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import bulk, config, ratelimit
+from app.auth import create_access_token
+from app.main import app
+from app.serializers import SPECIES_COLUMNS, species_to_dict
+from benchmarks.common import override_db, temp_database
+
+
+def species_record(i: int, parks: int) -> dict:
+    return {
+        "name": f"Imported species {i}",
+        "scientific_name": f"Genus imported{i}",
+        "park_id": i % parks + 1,
+        "description": f"Bulk loaded species number {i}",
+        "image": f"https://example.com/imported{i}.jpg",
+    }
+
+
+async def ndjson_body(rows: int, parks: int, lines_per_chunk: int = 500):
+    batch = []
+    for i in range(rows):
+        batch.append(json.dumps(species_record(i, parks)))
+        if len(batch) == lines_per_chunk:
+            yield ("\n".join(batch) + "\n").encode("utf-8")
+            batch = []
+    if batch:
+        yield "\n".join(batch).encode("utf-8")
+
+
+async def drain_export(session_factory) -> int:
+    size = 0
+    async for chunk in bulk.stream_export(session_factory(), SPECIES_COLUMNS, species_to_dict, "ndjson"):
+        size += len(chunk)
+    return size
+
+
+async def run(args, async_engine) -> dict:
+    results = {}
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "user1", "uid": 1, "role": "admin"})}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+            start = time.perf_counter()
+            for i in range(args.single_rows):
+                response = await http.post("/species/", json=species_record(i, args.parks), headers=headers)
+                response.raise_for_status()
+            elapsed = time.perf_counter() - start
+            results["single_post"] = {"rows": args.single_rows, "rows_per_second": args.single_rows / elapsed}
+
+            start = time.perf_counter()
+            response = await http.post(
+                "/species/bulk",
+                content=ndjson_body(args.rows, args.parks),
+                headers=dict(headers, **{"Content-Type": "application/x-ndjson"}),
+            )
+            response.raise_for_status()
+            elapsed = time.perf_counter() - start
+            report = response.json()
+            results["bulk_ndjson"] = {
+                "rows": args.rows,
+                "inserted": report["inserted"],
+                "failed": report["failed"],
+                "rows_per_second": args.rows / elapsed,
+            }
+
+        # Drive the export generator directly: the ASGI test transport buffers whole bodies
+        session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+        start = time.perf_counter()
+        size = await drain_export(session_factory)
+        elapsed = time.perf_counter() - start
+        # Second pass under tracemalloc, which would skew the timing of the first
+        tracemalloc.start()
+        await drain_export(session_factory)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["export_ndjson"] = {
+            "bytes": size,
+            "rows_per_second": (args.rows + args.single_rows) / elapsed,
+            "peak_python_mb": peak / 2**20,
+        }
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--single-rows", type=int, default=500)
+    parser.add_argument("--parks", type=int, default=100)
+    args = parser.parse_args()
+    config.AUTH_MODE = "stateless"
+    ratelimit.limiter.backend = None
+    with temp_database(parks=args.parks, users=1) as session_factory:
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(args, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import create_async_db_engine, create_db_engine, get_async_db, get_db
+from benchmarks import datagen
+
+
+@contextmanager
+def temp_database(parks: int = 10, species: int = 0, users: int = 0, seed: int = 42):
+    """
+    Create a throwaway SQLite database filled with synthetic rows (see benchmarks.datagen)
+    and yield a session factory.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        datagen.generate(engine, parks=parks, species=species, users=users, seed=seed)
+        try:
+            yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        finally:
+            engine.dispose()
+
+
+def override_db(app, session_factory):
+    """
+    Point the app's database dependencies at the database behind ``session_factory``.
+
+    Returns the async engine so the caller can dispose of it.
+    """
+    async_engine = create_async_db_engine(str(session_factory.kw["bind"].url))
+    async_session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def _get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_async_db] = _get_async_db
+    return async_engine
+
+
+@contextmanager
+def timer():
+    result = {}
+    start = time.perf_counter()
+    yield result
+    result["seconds"] = time.perf_counter() - start
+
+
+def summarize(samples):
+    """
+    Return count, mean and p50/p95/p99 (milliseconds) for a list of durations in seconds.
+    """
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
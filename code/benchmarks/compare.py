@@ -0,0 +1,71 @@
+"""
+Diff two benchmarks.load_driver reports, e.g. from the commits before and after a change.
+Exits 1 when a p99 or throughput figure regressed by more than --threshold percent.
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import List, Tuple
+
+# metric -> whether a larger value is better
+METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True}
+# Only these fail the comparison; p50/p95 are reported but too noisy on shared machines to gate on
+GATED = ("p99_ms", "rps")
+
+
+def change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(before: dict, after: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """
+    Table lines for every section both reports share, and the regressions past ``threshold``.
+    """
+    lines = [f"{'section':<20} {'metric':<8} {'before':>10} {'after':>10} {'change':>8}"]
+    regressions = []
+    sections = [("overall", before["overall"], after["overall"])] + [
+        (name, before["endpoints"][name], after["endpoints"][name])
+        for name in before["endpoints"] if name in after["endpoints"]
+    ]
+    for name, old, new in sections:
+        for metric, higher_is_better in METRICS.items():
+            if metric not in old or metric not in new:
+                continue
+            delta = change(old[metric], new[metric])
+            worse = -delta if higher_is_better else delta
+            flag = ""
+            if metric in GATED and worse > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {metric} {delta:+.1f}%")
+            lines.append(f"{name:<20} {metric:<8} {old[metric]:>10.2f} {new[metric]:>10.2f} {delta:>+7.1f}%{flag}")
+        errors = new.get("errors", 0) - old.get("errors", 0)
+        if errors > 0:
+            regressions.append(f"{name} errors +{errors}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    for key in ("dataset", "concurrency", "response_cache"):
+        if before["meta"].get(key) != after["meta"].get(key):
+            print(f"warning: {key} differs ({before['meta'].get(key)} vs {after['meta'].get(key)})", file=sys.stderr)
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    lines, regressions = compare(before, after, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print("\nregressions: " + ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Bytes on the wire and latency for large list pages, with and without ``fields=`` and
+response compression.
+
+    python -m benchmarks.compression_bench --page-size 1000 --requests 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import update
+
+from app import compression, models
+from app.cache import response_cache
+from app.main import app
+from benchmarks.common import override_db, summarize, temp_database
+
+# Roughly the length of a real park or species description
+DESCRIPTION = " ".join(["Wetlands, cork oak forest and migrating birds along the northern coast."] * 8)
+
+PAGES = {
+    "parks": ("/parks/", "id,name,location"),
+    "species": ("/species/", "id,name,park_id"),
+}
+
+
+async def measure(http, path: str, params: dict, encoding: str, requests: int) -> dict:
+    samples, wire_bytes, body_bytes = [], 0, 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await http.get(path, params=params, headers={"Accept-Encoding": encoding})
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        wire_bytes = response.num_bytes_downloaded
+        body_bytes = len(response.content)
+    stats = summarize(samples)
+    return {"wire_bytes": wire_bytes, "json_bytes": body_bytes, "p50_ms": stats["p50_ms"], "p99_ms": stats["p99_ms"]}
+
+
+async def run(page_size: int, requests: int, async_engine) -> dict:
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli is not None else [])
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+            for kind, (path, sparse) in PAGES.items():
+                for label, fields in (("all_fields", None), ("sparse", sparse)):
+                    params = {"limit": page_size}
+                    if fields:
+                        params["fields"] = fields
+                    for encoding in encodings:
+                        results[f"{kind}_{label}_{encoding}"] = await measure(http, path, params, encoding, requests)
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    # Every request builds and serializes its page, as a cache miss would
+    response_cache.backend = None
+    with temp_database(parks=args.page_size, species=args.page_size) as session_factory:
+        with session_factory() as db:
+            db.execute(update(models.Park).values(description=DESCRIPTION))
+            db.execute(update(models.Species).values(description=DESCRIPTION))
+            db.commit()
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(args.page_size, args.requests, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Synthetic parks, species and users at whatever scale a benchmark needs, inserted in bulk.
+
+Used by benchmarks.common.temp_database, or on its own to fill a database file that the
+app, the load driver or scaling_bench can then run against:
+
+    python -m benchmarks.datagen --database-url sqlite:///./bench.db --parks 5000 --species 200000 --users 10000
+"""
+import argparse
+import json
+import random
+import time
+from typing import Dict, Iterator, List
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app import hashing, migrations, models, stats
+
+# Rows per executemany, so large datasets never sit in memory all at once
+CHUNK_SIZE = 10_000
+IMAGES_PER_PARK = 2
+# Stored for every generated user unless a password is given; it verifies against nothing
+PLACEHOLDER_HASH = "not-a-real-hash"
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(engine: Engine, model, rows: Iterator[dict]) -> None:
+    for chunk in _chunks(rows, CHUNK_SIZE):
+        with engine.begin() as conn:
+            conn.execute(insert(model), chunk)
+
+
+def generate(
+    engine: Engine, parks: int = 10, species: int = 0, users: int = 0, seed: int = 42, password_hash: str = PLACEHOLDER_HASH
+) -> Dict[str, int]:
+    """
+    Insert ``parks`` parks (each with IMAGES_PER_PARK images), ``species`` species spread at
+    random over them and ``users`` visitors named user1..userN. The same seed always gives
+    the same rows, so results stay comparable across commits.
+    """
+    rng = random.Random(seed)
+    _insert(engine, models.Park, (
+        {
+            "name": f"Park {i}",
+            "description": f"Synthetic park number {i}",
+            "latitude": rng.uniform(30.0, 37.5),
+            "longitude": rng.uniform(7.5, 11.5),
+        }
+        for i in range(1, parks + 1)
+    ))
+    _insert(engine, models.ParkImage, (
+        {"park_id": i, "position": position, "url": f"https://example.com/park{i}{chr(ord('a') + position)}.jpg"}
+        for i in range(1, parks + 1)
+        for position in range(IMAGES_PER_PARK)
+    ))
+    _insert(engine, models.Species, (
+        {
+            "name": f"Species {i}",
+            "scientific_name": f"Genus species{i}",
+            "park_id": rng.randint(1, max(parks, 1)),
+            "description": f"Synthetic species number {i}",
+            "image": f"https://example.com/species{i}.jpg",
+        }
+        for i in range(1, species + 1)
+    ))
+    _insert(engine, models.User, (
+        {"username": f"user{i}", "password": password_hash, "role": "visitor"}
+        for i in range(1, users + 1)
+    ))
+    # The inserts above bypass crud, so the precomputed stats are counted once at the end
+    with engine.begin() as conn:
+        stats.rebuild(conn)
+    return {"parks": parks, "park_images": parks * IMAGES_PER_PARK, "species": species, "users": users}
+
+
+def main():
+    from app.db import create_db_engine
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True, help="an empty database, e.g. sqlite:///./bench.db")
+    parser.add_argument("--parks", type=int, default=1000)
+    parser.add_argument("--species", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--user-password", help="give every user this password (hashed once) so they can log in")
+    args = parser.parse_args()
+    engine = create_db_engine(args.database_url)
+    try:
+        start = time.perf_counter()
+        models.Base.metadata.create_all(bind=engine)
+        password_hash = hashing.hash_password_sync(args.user_password) if args.user_password else PLACEHOLDER_HASH
+        counts = generate(engine, args.parks, args.species, args.users, args.seed, password_hash)
+        # Migrating after the bulk insert builds the search index and change log in one pass each
+        migrations.migrate(engine)
+        print(json.dumps(dict(counts, seconds=time.perf_counter() - start), indent=2))
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
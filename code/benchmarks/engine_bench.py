@@ -0,0 +1,85 @@
+"""
+Mixed read/write throughput from concurrent threads: bare engine vs db.create_db_engine.
+
+    python -m benchmarks.engine_bench --threads 16 --seconds 5 --write-ratio 0.2
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.db import create_db_engine
+from benchmarks.common import temp_database
+
+
+def run(engine, threads: int, seconds: float, write_ratio: float) -> dict:
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(n):
+        rng = random.Random(n)
+        local = {"reads": 0, "writes": 0, "errors": 0}
+        while time.perf_counter() < deadline:
+            db = session_factory()
+            try:
+                if rng.random() < write_ratio:
+                    crud.create_species(db, schemas.SpeciesCreate(name=f"bench-{n}", park_id=rng.randint(1, 10)))
+                    local["writes"] += 1
+                else:
+                    crud.get_species(db, limit=20, after_id=rng.randint(0, 10_000))
+                    local["reads"] += 1
+            except OperationalError:
+                db.rollback()
+                local["errors"] += 1
+            finally:
+                db.close()
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    counts["ops_per_second"] = (counts["reads"] + counts["writes"]) / seconds
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+    results = {}
+    with temp_database(parks=10, species=20_000) as session_factory:
+        source = session_factory.kw["bind"].url.database
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, factory in (
+                ("baseline", lambda url: create_engine(url, connect_args={"check_same_thread": False})),
+                ("tuned", create_db_engine),
+            ):
+                path = os.path.join(tmp, f"{name}.db")
+                shutil.copy(source, path)
+                engine = factory(f"sqlite:///{path}")
+                try:
+                    results[name] = run(engine, args.threads, args.seconds, args.write_ratio)
+                finally:
+                    engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+GridIndex radius queries vs a brute-force haversine scan over synthetic points.
+
+    python -m benchmarks.geo_bench --points 1000000 --queries 200
+"""
+import argparse
+import heapq
+import json
+import random
+import time
+
+from app.geo import GridIndex, haversine_km
+from benchmarks.common import summarize
+
+
+def brute_force(points, lat, lon, radius_km, limit):
+    matches = []
+    for point_id, plat, plon in points:
+        distance = haversine_km(lat, lon, plat, plon)
+        if distance <= radius_km:
+            matches.append((distance, point_id))
+    return heapq.nsmallest(limit, matches)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--brute-force-queries", type=int, default=3)
+    parser.add_argument("--radius-km", type=float, nargs="+", default=[5.0, 25.0, 100.0])
+    parser.add_argument("--limit", type=int, default=10)
+    # Dense synthetic data wants finer cells than the few-hundred-parks default
+    parser.add_argument("--cell-degrees", type=float, default=0.05)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    # Roughly Tunisia-sized bounding box so queries have realistic densities
+    points = [(i, rng.uniform(30.0, 37.5), rng.uniform(7.5, 11.5)) for i in range(args.points)]
+    start = time.perf_counter()
+    index = GridIndex(points, cell_degrees=args.cell_degrees)
+    results = {"points": args.points, "cell_degrees": args.cell_degrees, "build_seconds": time.perf_counter() - start}
+
+    queries = [(rng.uniform(30.0, 37.5), rng.uniform(7.5, 11.5)) for _ in range(args.queries)]
+    for radius in args.radius_km:
+        samples = []
+        for lat, lon in queries:
+            start = time.perf_counter()
+            index.nearby(lat, lon, radius, args.limit)
+            samples.append(time.perf_counter() - start)
+        row = {"grid_index": summarize(samples)}
+        samples = []
+        for lat, lon in queries[: args.brute_force_queries]:
+            start = time.perf_counter()
+            expected = brute_force(points, lat, lon, radius, args.limit)
+            samples.append(time.perf_counter() - start)
+            assert expected == index.nearby(lat, lon, radius, args.limit)
+        row["brute_force"] = summarize(samples)
+        results[f"radius_{radius:g}km"] = row
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+GET /parks/?include=species vs the client-side N+1 pattern it replaces, with the SQL
+statements each issues (tests/test_parks.py checks the embedded read's count stays flat).
+
+    python -m benchmarks.include_bench --page-sizes 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import event
+
+from app.cache import response_cache
+from app.main import app
+from benchmarks.common import override_db, temp_database
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+async def get_json(http, path: str):
+    response = await http.get(path)
+    response.raise_for_status()
+    return response.json()
+
+
+async def run(page_sizes, async_engine) -> dict:
+    counter = StatementCounter(async_engine.sync_engine)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+            for size in page_sizes:
+                counter.count = 0
+                start = time.perf_counter()
+                await get_json(http, f"/parks/?limit={size}&include=species")
+                embedded = {"seconds": time.perf_counter() - start, "statements": counter.count}
+
+                counter.count = 0
+                start = time.perf_counter()
+                parks = await get_json(http, f"/parks/?limit={size}")
+                for park in parks:
+                    await get_json(http, f"/species/parks/{park['id']}/species")
+                n_plus_one = {"seconds": time.perf_counter() - start, "statements": counter.count}
+                results[size] = {"include_species": embedded, "n_plus_one": n_plus_one}
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--species", type=int, default=50_000)
+    args = parser.parse_args()
+    # Every request has to reach the database for the counts to mean anything
+    response_cache.backend = None
+    with temp_database(parks=max(args.page_sizes), species=args.species) as session_factory:
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(args.page_sizes, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
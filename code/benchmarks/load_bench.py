@@ -0,0 +1,94 @@
+"""
+Requests per second at increasing concurrency: the async app vs sync ``def`` handlers.
+
+The sync baseline mirrors the old handlers (sync Session from get_db, run in
+Starlette's threadpool) so both apps serve the same queries from the same data.
+
+    python -m benchmarks.load_bench --concurrency 10 100 500 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import crud, schemas
+from app.db import create_db_engine, get_db
+from app.main import app
+from app.serializers import json_response, park_to_dict
+from benchmarks.common import override_db, summarize, temp_database
+
+sync_app = FastAPI()
+
+
+@sync_app.get("/parks/{park_id}", response_model=schemas.Park)
+def sync_read_park(park_id: int, db: Session = Depends(get_db)):
+    return json_response(park_to_dict(crud.get_park_row(db, park_id=park_id), crud.get_images_for_parks(db, [park_id])))
+
+
+@sync_app.get("/species/", response_model=List[schemas.Species])
+def sync_read_species(limit: int = 20, db: Session = Depends(get_db)):
+    return crud.get_species(db, limit=limit)
+
+
+async def drive(target, concurrency: int, requests: int, parks: int) -> dict:
+    rng = random.Random(concurrency)
+    paths = [
+        f"/parks/{rng.randint(1, parks)}" if rng.random() < 0.5 else "/species/?limit=20"
+        for _ in range(requests)
+    ]
+    samples = []
+    queue = iter(paths)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(target), base_url="http://test", timeout=None) as http:
+        async def worker():
+            for path in queue:
+                start = time.perf_counter()
+                response = await http.get(path)
+                response.raise_for_status()
+                samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return dict(summarize(samples), rps=requests / elapsed)
+
+
+async def run(concurrency_levels, requests: int, parks: int, async_engine) -> dict:
+    results = {}
+    try:
+        for concurrency in concurrency_levels:
+            results[concurrency] = {
+                "sync_threadpool": await drive(sync_app, concurrency, requests, parks),
+                "async": await drive(app, concurrency, requests, parks),
+            }
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--parks", type=int, default=100)
+    args = parser.parse_args()
+    with temp_database(parks=args.parks, species=10_000) as session_factory:
+        async_engine = override_db(app, session_factory)
+        # Sync handlers keep their connection until a worker thread is free to run get_db's
+        # cleanup, so a bounded pool deadlocks under load; give the baseline an unbounded one
+        sync_engine = create_db_engine(str(session_factory.kw["bind"].url), pool_size=64, max_overflow=-1)
+        override_db(sync_app, sessionmaker(autocommit=False, autoflush=False, bind=sync_engine))
+        try:
+            results = asyncio.run(run(args.concurrency, args.requests, args.parks, async_engine))
+        finally:
+            sync_engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
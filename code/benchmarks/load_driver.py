@@ -0,0 +1,172 @@
+"""
+Closed-loop HTTP load on the real app through in-process ASGI transport (no sockets, no
+server), with a weighted mix of read endpoints. Reports p50/p95/p99 and requests per
+second, overall and per endpoint, as JSON that benchmarks.compare can diff across commits.
+
+    python -m benchmarks.load_driver --concurrency 50 --duration 20 --output before.json
+    python -m benchmarks.load_driver --database-url sqlite:///./bench.db   # filled by benchmarks.datagen
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import migrations, models
+from app.cache import response_cache
+from app.db import create_db_engine
+from app.main import app
+from app.pagination import encode_cursor
+from benchmarks.common import override_db, summarize, temp_database
+
+# name -> (weight, path builder); builders get a Random and the dataset's (parks, species) counts
+Scenario = Tuple[int, Callable[[random.Random, int, int], str]]
+SCENARIOS: Dict[str, Scenario] = {
+    "park": (25, lambda rng, parks, species: f"/parks/{rng.randint(1, parks)}"),
+    "park_with_species": (5, lambda rng, parks, species: f"/parks/{rng.randint(1, parks)}?include=species"),
+    "parks_page": (10, lambda rng, parks, species: f"/parks/?limit=50&cursor={encode_cursor(rng.randint(0, parks))}"),
+    "parks_batch": (5, lambda rng, parks, species: "/parks/?ids=" + ",".join(
+        str(rng.randint(1, parks)) for _ in range(20)
+    )),
+    "species": (20, lambda rng, parks, species: f"/species/{rng.randint(1, species)}"),
+    "species_page": (10, lambda rng, parks, species: f"/species/?limit=50&cursor={encode_cursor(rng.randint(0, species))}"),
+    "species_by_park": (10, lambda rng, parks, species: f"/species/parks/{rng.randint(1, parks)}/species"),
+    "nearby": (10, lambda rng, parks, species: (
+        f"/parks/nearby?lat={rng.uniform(30.0, 37.5):.3f}&lon={rng.uniform(7.5, 11.5):.3f}&radius_km=50"
+    )),
+    "search": (5, lambda rng, parks, species: f"/search?q=species%20{rng.randint(1, species)}"),
+}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty.stdout.strip() else "")
+
+
+def _report(samples, statuses: Dict[int, int], elapsed: float) -> dict:
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    return dict(
+        summarize(samples) if samples else {"count": 0},
+        rps=len(samples) / elapsed if elapsed else 0.0,
+        errors=errors,
+        statuses={str(status): count for status, count in sorted(statuses.items())},
+    )
+
+
+async def drive(
+    http, scenarios: Dict[str, Scenario], concurrency: int, duration: float, parks: int, species: int, seed: int
+) -> Tuple[Dict[str, list], Dict[str, Dict[int, int]], float]:
+    """
+    Run ``concurrency`` clients, each issuing its next request as soon as the last one
+    answers, for ``duration`` seconds. Returns latencies and status counts per scenario.
+    """
+    names = list(scenarios)
+    weights = [scenarios[name][0] for name in names]
+    samples = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def client(rng: random.Random):
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            path = scenarios[name][1](rng, parks, species)
+            start = time.perf_counter()
+            response = await http.get(path)
+            samples[name].append(time.perf_counter() - start)
+            statuses[name][response.status_code] = statuses[name].get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(random.Random(seed + i)) for i in range(concurrency)))
+    return samples, statuses, time.perf_counter() - start
+
+
+async def run(args, parks: int, species: int, async_engine) -> dict:
+    scenarios = {name: SCENARIOS[name] for name in args.scenarios}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+            if args.warmup > 0:
+                await drive(http, scenarios, args.concurrency, args.warmup, parks, species, args.seed + 10_000)
+            samples, statuses, elapsed = await drive(
+                http, scenarios, args.concurrency, args.duration, parks, species, args.seed
+            )
+    finally:
+        await async_engine.dispose()
+    all_samples = [sample for name in samples for sample in samples[name]]
+    all_statuses: Dict[int, int] = {}
+    for counts in statuses.values():
+        for status, count in counts.items():
+            all_statuses[status] = all_statuses.get(status, 0) + count
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "dataset": {"parks": parks, "species": species},
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "response_cache": response_cache.backend is not None,
+            "weights": {name: scenario[0] for name, scenario in scenarios.items()},
+        },
+        "overall": _report(all_samples, all_statuses, elapsed),
+        "endpoints": {name: _report(samples[name], statuses[name], elapsed) for name in scenarios},
+    }
+
+
+def _counts(session_factory) -> Tuple[int, int]:
+    with session_factory() as db:
+        return db.scalar(select(func.count(models.Park.id))), db.scalar(select(func.count(models.Species.id)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds run first")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--parks", type=int, default=1000)
+    parser.add_argument("--species", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="run against this database instead of a fresh synthetic one")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache so every read hits the database")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+    if args.no_cache:
+        response_cache.backend = None
+
+    def measure(session_factory) -> dict:
+        parks, species = _counts(session_factory)
+        async_engine = override_db(app, session_factory)
+        return asyncio.run(run(args, parks, species, async_engine))
+
+    if args.database_url:
+        engine = create_db_engine(args.database_url)
+        try:
+            results = measure(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+        finally:
+            engine.dispose()
+    else:
+        with temp_database(parks=args.parks, species=args.species, seed=args.seed) as session_factory:
+            # Builds the full-text index GET /search reads
+            migrations.migrate(session_factory.kw["bind"])
+            results = measure(session_factory)
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+POST /users/login throughput with bcrypt in the hashing process pool.
+
+    BCRYPT_ROUNDS=12 python -m benchmarks.login_bench --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+from sqlalchemy import update
+
+from app import config, hashing, models, ratelimit
+from app.main import app
+from benchmarks.common import override_db, summarize, temp_database
+
+PASSWORD = "BenchP@ssw0rd"
+
+
+async def run(logins: int, concurrency: int, users: int, async_engine) -> dict:
+    samples = []
+    pending = iter(range(logins))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+        async def worker():
+            for i in pending:
+                start = time.perf_counter()
+                response = await http.post(
+                    "/users/login", data={"username": f"user{i % users + 1}", "password": PASSWORD}
+                )
+                response.raise_for_status()
+                samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    await async_engine.dispose()
+    workers = max(config.HASH_POOL_WORKERS, 1)
+    return dict(
+        summarize(samples),
+        logins_per_second=logins / elapsed,
+        logins_per_second_per_core=logins / elapsed / min(workers, os.cpu_count() or 1),
+        bcrypt_rounds=config.BCRYPT_ROUNDS,
+        pool_workers=config.HASH_POOL_WORKERS,
+        pool_stats=dict(hashing.pool.stats),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+    # Measures hashing throughput, not the per-client login limits
+    ratelimit.limiter.backend = None
+    with temp_database(parks=1, users=args.users) as session_factory:
+        db = session_factory()
+        try:
+            db.execute(update(models.User).values(password=hashing.hash_password_sync(PASSWORD)))
+            db.commit()
+        finally:
+            db.close()
+        async_engine = override_db(app, session_factory)
+        try:
+            print(json.dumps(asyncio.run(run(args.logins, args.concurrency, args.users, async_engine)), indent=2))
+        finally:
+            hashing.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+The crud reads behind the hot endpoints, each against the shared synthetic dataset.
+"""
+from app import changelog, crud, search
+from benchmarks.micro.conftest import DATASET
+
+PARK_ID = DATASET["parks"] // 2
+SPECIES_ID = DATASET["species"] // 2
+PAGE = 100
+
+
+def bench_get_park_row(benchmark, db):
+    assert benchmark(crud.get_park_row, db, PARK_ID) is not None
+
+
+def bench_get_park_rows_page(benchmark, db):
+    benchmark(crud.get_park_rows, db, limit=PAGE, after_id=PARK_ID // 2)
+
+
+def bench_get_park_rows_by_ids(benchmark, db):
+    ids = list(range(1, DATASET["parks"] + 1, max(DATASET["parks"] // 50, 1)))
+    assert len(benchmark(crud.get_park_rows_by_ids, db, ids)) == len(ids)
+
+
+def bench_get_images_for_parks(benchmark, db):
+    benchmark(crud.get_images_for_parks, db, list(range(PARK_ID, PARK_ID + PAGE)))
+
+
+def bench_get_park_orm(benchmark, db):
+    # The ORM path the single-park routes started from, for comparison with get_park_row
+    benchmark(lambda: (db.expunge_all(), crud.get_park(db, PARK_ID)))
+
+
+def bench_get_species_rows_page(benchmark, db):
+    benchmark(crud.get_species_rows, db, limit=PAGE, after_id=SPECIES_ID)
+
+
+def bench_get_species_by_park(benchmark, db):
+    benchmark(lambda: (db.expunge_all(), crud.get_species_by_park(db, PARK_ID)))
+
+
+def bench_get_species_for_parks(benchmark, db):
+    benchmark(crud.get_species_for_parks, db, list(range(PARK_ID, PARK_ID + 20)), 50)
+
+
+def bench_search(benchmark, db):
+    benchmark(search.search, db, f"species {SPECIES_ID}")
+
+
+def bench_changelog_read(benchmark, db):
+    benchmark(changelog.read, db, 0, 500)
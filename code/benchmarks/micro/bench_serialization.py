@@ -0,0 +1,65 @@
+"""
+Serializing a page of rows: the dict-building fast path, JSON encoding and compression,
+and what response_model-style Pydantic validation would add on top.
+"""
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app import compression, crud, schemas, serializers
+
+PAGE = 100
+PARK_LIST = TypeAdapter(List[schemas.Park])
+SPECIES_LIST = TypeAdapter(List[schemas.Species])
+
+
+@pytest.fixture(scope="module")
+def park_page(session_factory):
+    with session_factory() as db:
+        rows = crud.get_park_rows(db, limit=PAGE)
+        images = serializers.images_by_park(crud.get_images_for_parks(db, [row.id for row in rows]))
+    return rows, images
+
+
+@pytest.fixture(scope="module")
+def species_page(session_factory):
+    with session_factory() as db:
+        return crud.get_species_rows(db, limit=PAGE)
+
+
+def _park_dicts(park_page):
+    rows, images = park_page
+    return [serializers.park_to_dict(row, images.get(row.id, ())) for row in rows]
+
+
+def bench_park_to_dict(benchmark, park_page):
+    benchmark(_park_dicts, park_page)
+
+
+def bench_park_page_json(benchmark, park_page):
+    benchmark(lambda: serializers.dump_json(_park_dicts(park_page)))
+
+
+def bench_park_page_validated_json(benchmark, park_page):
+    benchmark(lambda: PARK_LIST.dump_json(PARK_LIST.validate_python(_park_dicts(park_page))))
+
+
+def bench_species_page_json(benchmark, species_page):
+    benchmark(lambda: serializers.dump_json([serializers.species_to_dict(row) for row in species_page]))
+
+
+def bench_species_page_sparse_json(benchmark, species_page):
+    fields = {"id", "name", "park_id"}
+    benchmark(lambda: serializers.dump_json([serializers.species_to_dict(row, fields) for row in species_page]))
+
+
+def bench_species_page_validated_json(benchmark, species_page):
+    benchmark(lambda: SPECIES_LIST.dump_json(
+        SPECIES_LIST.validate_python([serializers.species_to_dict(row) for row in species_page])
+    ))
+
+
+def bench_species_page_gzip(benchmark, species_page):
+    body = serializers.dump_json([serializers.species_to_dict(row) for row in species_page])
+    benchmark(compression.compress_body, body, "gzip")
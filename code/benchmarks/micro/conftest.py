@@ -0,0 +1,39 @@
+"""
+Fixtures for the pytest-benchmark microbenchmarks of the crud reads and serializers.
+They need pytest and pytest-benchmark, which the app itself does not.
+
+    python -m pytest benchmarks/micro --benchmark-json=micro.json
+    BENCH_SPECIES=200000 python -m pytest benchmarks/micro -k species
+    pytest-benchmark compare 0001 0002   # runs saved with --benchmark-autosave
+"""
+import os
+
+import pytest
+
+from app import migrations
+from benchmarks.common import temp_database
+
+DATASET = {
+    "parks": int(os.getenv("BENCH_PARKS", 1000)),
+    "species": int(os.getenv("BENCH_SPECIES", 20_000)),
+    "users": int(os.getenv("BENCH_USERS", 1000)),
+}
+
+
+@pytest.fixture(scope="session")
+def session_factory():
+    with temp_database(**DATASET) as factory:
+        # Search and the change log come from the migrations, as on a deployed database
+        migrations.migrate(factory.kw["bind"])
+        yield factory
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    # pytest-benchmark already records the commit and machine; results only compare on the same data
+    output_json["dataset"] = DATASET
@@ -0,0 +1,50 @@
+"""
+Page latency of offset vs keyset pagination for crud.get_species as page depth grows.
+
+    python -m benchmarks.pagination_bench --species 200000 --limit 100
+"""
+import argparse
+import json
+import time
+
+from app import crud
+from benchmarks.common import summarize, temp_database
+
+
+def run(session_factory, total: int, limit: int, repeat: int) -> dict:
+    depths = sorted({0, 1_000, 10_000, total // 2, max(total - limit, 0)})
+    results = {}
+    db = session_factory()
+    try:
+        for depth in depths:
+            row = {}
+            for mode in ("offset", "keyset"):
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    if mode == "offset":
+                        crud.get_species(db, skip=depth, limit=limit)
+                    else:
+                        crud.get_species(db, limit=limit, after_id=depth)
+                    samples.append(time.perf_counter() - start)
+                    db.expunge_all()
+                row[mode] = summarize(samples)["p50_ms"]
+            results[depth] = row
+    finally:
+        db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--species", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with temp_database(parks=10, species=args.species) as session_factory:
+        results = run(session_factory, args.species, args.limit, args.repeat)
+    print(json.dumps({"p50_ms_by_depth": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
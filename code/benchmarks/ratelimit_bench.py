@@ -0,0 +1,104 @@
+"""
+Overhead of the rate limiter and admission control, and how admission control sheds a burst.
+
+    python -m benchmarks.ratelimit_bench --calls 200000 --requests 5000
+    python -m benchmarks.ratelimit_bench --redis-url redis://localhost:6379/0
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from fastapi import Depends, FastAPI, Request
+
+from app.ratelimit import AdmissionMiddleware, Limiter, MemoryBackend, RateLimited, RedisBackend, Rule
+from benchmarks.common import summarize
+
+
+async def hit_cost(limiter: Limiter, calls: int, keys: int) -> dict:
+    """
+    Microseconds per Limiter.hit spread over ``keys`` distinct clients (the rule never trips).
+    """
+    start = time.perf_counter()
+    for i in range(calls):
+        await limiter.hit("bench", f"10.0.{i % keys // 256}.{i % 256}")
+    elapsed = time.perf_counter() - start
+    return {"calls": calls, "keys": keys, "us_per_call": elapsed / calls * 1e6}
+
+
+def make_app(limiter=None, admission: bool = False, delay: float = 0.0) -> FastAPI:
+    app = FastAPI()
+
+    async def limited(request: Request):
+        if limiter is not None:
+            await limiter.hit("bench", request.client.host)
+
+    @app.get("/ping", dependencies=[Depends(limited)])
+    async def ping():
+        if delay:
+            await asyncio.sleep(delay)
+        return {"ok": True}
+
+    if admission:
+        app.add_middleware(AdmissionMiddleware, max_concurrency=4, queue_limit=8, queue_timeout=0.2)
+    return app
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int) -> dict:
+    samples, statuses = [], {}
+    pending = iter(range(requests))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+        async def worker():
+            for _ in pending:
+                start = time.perf_counter()
+                response = await http.get("/ping")
+                samples.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return dict(summarize(samples), statuses=statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--redis-url", help="also measure the Redis backend")
+    args = parser.parse_args()
+    generous = {"bench": Rule(10**9, 1)}
+    backends = {"memory": MemoryBackend()}
+    if args.redis_url:
+        backends["redis"] = RedisBackend.from_url(args.redis_url)
+    results = {}
+    for name, backend in backends.items():
+        limiter = Limiter(backend, generous)
+        calls = args.calls if name == "memory" else args.calls // 100
+        results[f"hit_{name}_1_key"] = asyncio.run(hit_cost(limiter, calls, 1))
+        results[f"hit_{name}_100k_keys"] = asyncio.run(hit_cost(limiter, calls, 100_000))
+
+    memory_limiter = Limiter(MemoryBackend(), generous)
+    results["request_baseline"] = asyncio.run(drive(make_app(), args.requests, 10))
+    results["request_rate_limited"] = asyncio.run(drive(make_app(memory_limiter), args.requests, 10))
+    results["request_admission"] = asyncio.run(drive(make_app(admission=True), args.requests, 4))
+
+    # A burst of 100 slow requests against 4 slots and 8 queue places: the rest are shed at once
+    results["burst_shedding"] = asyncio.run(drive(make_app(admission=True, delay=0.05), 100, 100))
+    # 20 logins' worth of requests against a 5/60 rule
+    strict = Limiter(MemoryBackend(), {"bench": Rule(5, 60)})
+    results["burst_rate_limited"] = asyncio.run(drive(_with_429(make_app(strict)), 20, 1))
+    print(json.dumps(results, indent=2))
+
+
+def _with_429(app: FastAPI) -> FastAPI:
+    from fastapi.responses import JSONResponse
+
+    @app.exception_handler(RateLimited)
+    async def handler(request, exc):
+        return JSONResponse({"detail": "rate limited"}, status_code=429)
+
+    return app
+
+
+if __name__ == "__main__":
+    main()
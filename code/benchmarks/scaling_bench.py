@@ -0,0 +1,134 @@
+"""
+Read throughput of `python -m app.main` at increasing WORKERS, driven over real TCP by
+separate load-generator processes, plus a concurrent-writer run that counts failed writes.
+
+Scaling is bounded by the cores available: with os.cpu_count() == 1 the workers and the
+load generators share one core and extra workers cannot add throughput.
+
+    python -m benchmarks.scaling_bench --workers 1 2 4 --clients 4 --seconds 10
+    python -m benchmarks.scaling_bench --workers 4 --writers 16 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.startup_bench import SOURCE_DB, free_port, wait_ready
+
+READ_PATHS = ("/parks/{park_id}", "/parks/?limit=20", "/species/?limit=20", "/species/parks/{park_id}/species")
+PARK_IDS = (1, 2, 4, 5)
+
+
+def _load_client(port: int, concurrency: int, seconds: float, token, seed: int, results) -> None:
+    """
+    One load-generator process: ``concurrency`` connections issuing requests for ``seconds``.
+    Reads when ``token`` is None, otherwise creates species as the admin it identifies.
+    """
+    async def run():
+        rng = random.Random(seed)
+        samples, errors = [], {}
+        deadline = time.perf_counter() + seconds
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", headers=headers, limits=limits, timeout=30) as http:
+            async def worker():
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    if token:
+                        response = await http.post("/species/", json={
+                            "name": f"Bench species {rng.random()}", "scientific_name": "Genus bench",
+                            "park_id": rng.choice(PARK_IDS), "description": "scaling bench write",
+                        })
+                    else:
+                        path = rng.choice(READ_PATHS).format(park_id=rng.choice(PARK_IDS))
+                        response = await http.get(path)
+                    if response.status_code < 400:
+                        samples.append(time.perf_counter() - start)
+                    else:
+                        key = f"{response.status_code} {response.text[:80]}"
+                        errors[key] = errors.get(key, 0) + 1
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return samples, errors
+
+    results.put(asyncio.run(run()))
+
+
+def drive(port: int, clients: int, concurrency: int, seconds: float, token=None) -> dict:
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_load_client, args=(port, concurrency, seconds, token, seed, results))
+        for seed in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    samples, errors = [], {}
+    for _ in processes:
+        client_samples, client_errors = results.get()
+        samples.extend(client_samples)
+        for key, count in client_errors.items():
+            errors[key] = errors.get(key, 0) + count
+    for process in processes:
+        process.join()
+    return dict(summarize(samples) if samples else {"count": 0}, rps=len(samples) / seconds, errors=errors)
+
+
+def serve(workers: int, env: dict):
+    port = free_port()
+    env = dict(env, WORKERS=str(workers), HOST="127.0.0.1", PORT=str(port))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.main"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    wait_ready(port, time.perf_counter())
+    return process, port
+
+
+def admin_token(env: dict) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", "from app.auth import create_access_token;"
+                               "print(create_access_token({'sub': 'admin_user_789'}))"],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=4, help="load-generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections per load generator")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--writers", type=int, default=0, help="also run this many concurrent writer connections")
+    args = parser.parse_args()
+    results = {"cpu_count": os.cpu_count()}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "scaling.db")
+        shutil.copy(SOURCE_DB, db_path)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", LOG_LEVEL="warning", METRICS_ENABLED="0",
+                   RATE_LIMIT_BACKEND="none")
+        subprocess.run([sys.executable, "-m", "app.cli", "migrate"], env=env, check=True)
+        for workers in args.workers:
+            process, port = serve(workers, env)
+            try:
+                results[f"read_workers_{workers}"] = drive(port, args.clients, args.concurrency, args.seconds)
+                if args.writers:
+                    results[f"write_workers_{workers}"] = drive(
+                        port, args.clients, max(args.writers // args.clients, 1), args.seconds, admin_token(env)
+                    )
+            finally:
+                process.terminate()
+                process.wait()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
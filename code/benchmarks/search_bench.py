@@ -0,0 +1,94 @@
+"""
+GET /search latency over a large synthetic corpus, FTS5 vs a LIKE scan of the same columns.
+
+    python -m benchmarks.search_bench --species 200000 --queries 200
+"""
+import argparse
+import json
+import random
+import time
+
+from sqlalchemy import insert
+
+from app import models, search
+from benchmarks.common import summarize, temp_database
+
+COMMON_WORDS = (
+    "atlas cedar oak pine cork desert mountain wetland lagoon coast island forest steppe oasis "
+    "gazelle fennec jackal macaque falcon flamingo heron tortoise viper scorpion barbary dorcas "
+    "endemic migratory nocturnal rare endangered breeding coastal northern southern saharan"
+).split()
+
+
+def vocabulary(rng, size):
+    # Pseudo-words on top of the common ones, so most terms are selective like real names
+    letters = "abcdefghiklmnoprstuvz"
+    extra = {"".join(rng.choice(letters) for _ in range(rng.randint(5, 10))) for _ in range(size)}
+    return list(COMMON_WORDS) + sorted(extra)
+
+
+def sentence(rng, words, count):
+    picked = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            # Zipf-ish draw: low indexes (the common words) come up far more often
+            picked.append(words[min(int(rng.paretovariate(1.0)) - 1, len(words) - 1)])
+        else:
+            picked.append(rng.choice(words))
+    return " ".join(picked)
+
+
+def run_queries(session_factory, fn, queries, limit):
+    samples = []
+    with session_factory() as db:
+        for q in queries:
+            start = time.perf_counter()
+            fn(db, q, ("park", "species"), limit, 0)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parks", type=int, default=1000)
+    parser.add_argument("--species", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--like-queries", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    words = vocabulary(rng, args.vocabulary)
+    with temp_database(parks=args.parks) as session_factory:
+        engine = session_factory.kw["bind"]
+        with engine.begin() as conn:
+            conn.execute(insert(models.Species), [
+                {
+                    "name": sentence(rng, words, 2).title(),
+                    "scientific_name": sentence(rng, words, 2).capitalize(),
+                    "park_id": rng.randint(1, args.parks),
+                    "description": sentence(rng, words, 20),
+                    "image": f"https://example.com/species{i}.jpg",
+                }
+                for i in range(1, args.species + 1)
+            ])
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            search.create_search_index(conn)
+        results = {"species": args.species, "index_build_seconds": time.perf_counter() - start}
+
+        # Mix of full words, prefixes and two-word queries, common and rare terms alike
+        queries = [
+            rng.choice([rng.choice(words), rng.choice(words)[:4], f"{rng.choice(COMMON_WORDS)} {rng.choice(words)}"])
+            for _ in range(args.queries)
+        ]
+        results["fts5"] = run_queries(session_factory, search.search, queries, args.limit)
+        results["like_scan"] = run_queries(
+            session_factory, search._search_like, queries[: args.like_queries], args.limit
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+ORM + Pydantic park serialization vs the column-select fast path.
+
+    python -m benchmarks.serialization_bench --sizes 100 1000 10000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy.orm import selectinload
+
+from app import crud, models, schemas, serializers
+from benchmarks.common import summarize, temp_database
+
+PARK_LIST = TypeAdapter(List[schemas.Park])
+
+
+def orm_path(db, limit: int) -> bytes:
+    # What read_parks used to do: ORM objects -> schemas.Park -> response_model validation -> JSON
+    parks = [
+        schemas.Park(
+            id=park.id,
+            name=park.name,
+            description=park.description,
+            location=schemas.Location(latitude=park.latitude, longitude=park.longitude),
+            images=[schemas.ParkImage.model_validate(image, from_attributes=True) for image in park.images],
+            created_at=park.created_at,
+            updated_at=park.updated_at,
+        )
+        for park in db.query(models.Park).options(selectinload(models.Park.images)).order_by(models.Park.id).limit(limit)
+    ]
+    validated = PARK_LIST.validate_python(jsonable_encoder(parks))
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_path(db, limit: int) -> bytes:
+    rows = crud.get_park_rows(db, limit=limit)
+    images = serializers.images_by_park(crud.get_images_for_parks(db, [row.id for row in rows]))
+    return serializers.dump_json([serializers.park_to_dict(row, images.get(row.id, ())) for row in rows])
+
+
+def run(session_factory, sizes, repeat: int) -> dict:
+    results = {}
+    for size in sizes:
+        row = {}
+        for name, fn in (("orm_pydantic", orm_path), ("fast_path", fast_path)):
+            samples = []
+            for _ in range(repeat):
+                db = session_factory()
+                try:
+                    start = time.perf_counter()
+                    fn(db, size)
+                    samples.append(time.perf_counter() - start)
+                finally:
+                    db.close()
+            row[name] = summarize(samples)
+        row["speedup"] = row["orm_pydantic"]["p50_ms"] / row["fast_path"]["p50_ms"]
+        results[size] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with temp_database(parks=max(args.sizes)) as session_factory:
+        print(json.dumps(run(session_factory, args.sizes, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
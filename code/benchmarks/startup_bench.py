@@ -0,0 +1,95 @@
+"""
+Time-to-first-request for freshly started uvicorn workers, with and without the
+startup migration check, plus the bare import time of app.main.
+
+    python -m benchmarks.startup_bench --workers 4 --runs 3
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import summarize
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tunisia_parks.db")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, started: float, timeout: float = 60.0) -> float:
+    url = f"http://127.0.0.1:{port}/health/ready"
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"worker on port {port} not ready after {timeout}s")
+
+
+def start_workers(count: int, env: dict) -> list:
+    """
+    Start ``count`` single-process uvicorn workers at once and return each one's seconds to first 200.
+    """
+    workers = []
+    for _ in range(count):
+        port = free_port()
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        workers.append((process, port, started))
+    try:
+        return [wait_ready(port, started) for _, port, started in workers]
+    finally:
+        for process, _, _ in workers:
+            process.terminate()
+            process.wait()
+
+
+def import_seconds(env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], env=env, check=True, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "startup.db")
+        shutil.copy(SOURCE_DB, db_path)
+        base_env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", LOG_LEVEL="warning")
+        # Bring the copy up to date once, as the CLI would in a deploy step
+        subprocess.run([sys.executable, "-m", "app.cli", "migrate"], env=base_env, check=True)
+        results["import_app_main"] = summarize([import_seconds(base_env) for _ in range(args.runs)])
+        for label, migrate in (("startup_migrate", "1"), ("no_startup_work", "0")):
+            env = dict(base_env, STARTUP_MIGRATE=migrate)
+            samples = []
+            for _ in range(args.runs):
+                samples.extend(start_workers(args.workers, env))
+            results[label] = summarize(samples)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Bytes and time for a client to catch up after N writes: GET /sync from its last token
+vs downloading every park and species page again.
+
+    python -m benchmarks.sync_bench --parks 1000 --species 20000 --changes 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+from sqlalchemy import func, select
+
+from app import crud, models, schemas
+from app.cache import response_cache
+from app.main import app
+from app.pagination import encode_cursor
+from benchmarks.common import override_db, temp_database
+
+
+async def full_download(http) -> dict:
+    start, total_bytes, rows = time.perf_counter(), 0, 0
+    for path in ("/parks/", "/species/"):
+        params = {"limit": 1000}
+        while True:
+            response = await http.get(path, params=params)
+            response.raise_for_status()
+            total_bytes += len(response.content)
+            rows += len(response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+            params["cursor"] = cursor
+    return {"bytes": total_bytes, "rows": rows, "ms": (time.perf_counter() - start) * 1000}
+
+
+async def delta(http, token: str) -> dict:
+    start = time.perf_counter()
+    response = await http.get("/sync", params={"since": token, "format": "ndjson"})
+    response.raise_for_status()
+    lines = response.content.splitlines()
+    return {"bytes": len(response.content), "rows": len(lines) - 1, "ms": (time.perf_counter() - start) * 1000}
+
+
+def write(session_factory, species_ids) -> str:
+    """
+    Update ``species_ids`` one commit each, as the admin API would; returns the token from before.
+    """
+    with session_factory() as db:
+        token = encode_cursor(db.scalar(select(func.coalesce(func.max(models.Change.id), 0))))
+        for species_id in species_ids:
+            row = crud.get_species_by_id(db, species_id)
+            crud.update_species(db, species_id, schemas.SpeciesCreate(
+                name=row.name + " (revised)", scientific_name=row.scientific_name, park_id=row.park_id,
+                description=row.description, image=row.image,
+            ))
+    return token
+
+
+async def run(session_factory, species: int, changes, async_engine) -> dict:
+    rng = random.Random(3)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+            results["full_download"] = await full_download(http)
+            for count in changes:
+                token = write(session_factory, rng.sample(range(1, species + 1), count))
+                results[f"sync_after_{count}_writes"] = await delta(http, token)
+            # The same 10 rows written 100 times each sync as 10 rows per batch of log rows read
+            hot = rng.sample(range(1, species + 1), 10)
+            token = write(session_factory, hot * 100)
+            results["sync_after_1000_writes_to_10_rows"] = await delta(http, token)
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parks", type=int, default=1000)
+    parser.add_argument("--species", type=int, default=20_000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+    response_cache.backend = None
+    with temp_database(parks=args.parks, species=args.species) as session_factory:
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(session_factory, args.species, args.changes, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
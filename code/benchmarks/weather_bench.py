@@ -0,0 +1,58 @@
+"""
+Concurrent GET /parks/{park_id}/weather against a stub upstream.
+
+    python -m benchmarks.weather_bench --requests 500 --parks 5 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app import weather
+from app.main import app
+from benchmarks.common import override_db, summarize, temp_database
+from benchmarks.weather_stub import make_app
+
+
+async def run(requests: int, parks: int, latency: float, async_engine) -> dict:
+    stub = make_app(latency=latency)
+    client = weather.WeatherClient(base_url="http://stub/data/2.5/weather", transport=httpx.ASGITransport(stub))
+    weather.set_weather_client(client)
+    results = {}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            for phase in ("cold", "warm"):
+                samples = []
+
+                async def one(i):
+                    start = time.perf_counter()
+                    response = await http.get(f"/parks/{i % parks + 1}/weather")
+                    response.raise_for_status()
+                    samples.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                await asyncio.gather(*(one(i) for i in range(requests)))
+                elapsed = time.perf_counter() - start
+                results[phase] = dict(summarize(samples), rps=requests / elapsed)
+        results["upstream_requests"] = stub.state.counters["requests"]
+    finally:
+        await weather.close_weather_client()
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--parks", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    with temp_database(parks=args.parks) as session_factory:
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(args.requests, args.parks, args.latency, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
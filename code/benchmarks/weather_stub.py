@@ -0,0 +1,34 @@
+"""
+Minimal stand-in for the OpenWeatherMap ``/data/2.5/weather`` endpoint.
+
+Use it in-process through ``httpx.ASGITransport(make_app())`` or serve it with
+``uvicorn benchmarks.weather_stub:app --port 9000`` and set
+``WEATHER_API_URL=http://127.0.0.1:9000/data/2.5/weather``.
+"""
+import asyncio
+import os
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def make_app(latency: float = float(os.getenv("WEATHER_STUB_LATENCY", 0.05))):
+    state = {"requests": 0}
+
+    async def weather(request):
+        state["requests"] += 1
+        await asyncio.sleep(latency)
+        lat = float(request.query_params.get("lat", 0))
+        return JSONResponse({
+            "main": {"temp": round(20 + lat / 10, 2), "humidity": 60},
+            "weather": [{"description": "clear sky"}],
+            "wind": {"speed": 3.5},
+        })
+
+    stub = Starlette(routes=[Route("/data/2.5/weather", weather)])
+    stub.state.counters = state
+    return stub
+
+
+app = make_app()
@@ -0,0 +1,81 @@
+"""
+Admin write throughput at increasing concurrency: POST /species/ from N concurrent clients,
+each write committing on its own vs through the group-commit queue (GROUP_COMMIT_ENABLED).
+
+    python -m benchmarks.write_bench --writes 2000 --concurrency 1 4 16 64
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import async_crud, config, ratelimit
+from app.auth import create_access_token
+from app.main import app
+from benchmarks.common import override_db, summarize, temp_database
+
+
+def species_record(i: int, parks: int) -> dict:
+    return {
+        "name": f"Written species {i}",
+        "scientific_name": f"Genus written{i}",
+        "park_id": i % parks + 1,
+        "description": f"Species number {i} from the write benchmark",
+    }
+
+
+async def drive(http, headers, writes: int, concurrency: int, parks: int) -> dict:
+    pending = iter(range(writes))
+    latencies = []
+
+    async def client():
+        for i in pending:
+            start = time.perf_counter()
+            response = await http.post("/species/", json=species_record(i, parks), headers=headers)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return dict(summarize(latencies), writes_per_second=writes / elapsed)
+
+
+async def run(args, async_engine) -> dict:
+    results = {}
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "user1", "uid": 1, "role": "admin"})}
+    session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test", timeout=None) as http:
+            for mode in ("per_request", "group_commit"):
+                if mode == "group_commit":
+                    await async_crud.group_commit.start(session_factory)
+                for concurrency in args.concurrency:
+                    key = f"{mode}_c{concurrency}"
+                    results[key] = await drive(http, headers, args.writes, concurrency, args.parks)
+                await async_crud.group_commit.stop()
+    finally:
+        await async_engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--parks", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=config.GROUP_COMMIT_INTERVAL)
+    args = parser.parse_args()
+    config.AUTH_MODE = "stateless"
+    ratelimit.limiter.backend = None
+    async_crud.group_commit.interval = args.interval
+    with temp_database(parks=args.parks, users=1) as session_factory:
+        async_engine = override_db(app, session_factory)
+        print(json.dumps(asyncio.run(run(args, async_engine)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Fixtures for the API tests: the app against a throwaway migrated SQLite database seeded
+through the crud writes, with the response cache and rate limits off.
+
+    python -m pytest tests
+"""
+import asyncio
+import os
+
+# Cheapest bcrypt work factor, read by app.config on import
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from starlette.testclient import TestClient
+
+from app import crud, hashing, migrations, models, ratelimit, schemas
+from app.auth import create_access_token
+from app.cache import response_cache
+from app.db import create_async_db_engine, create_db_engine, get_async_db, get_db
+from app.main import app
+
+PASSWORD = "correct horse"
+
+# (name, latitude, longitude, image count)
+PARKS = [
+    ("Ichkeul", 37.15, 9.666, 2),
+    ("Boukornine", 36.742, 10.266, 1),
+    ("Chambi", 35.2, 8.66, 0),
+    ("Zembra", 37.12, 10.8, 1),
+    ("Jebil", 33.0, 9.1, 0),
+]
+# (name, park id)
+SPECIES = [
+    ("Golden wolf", 1),
+    ("Barbary macaque", 1),
+    ("Greylag goose", 1),
+    ("Barbary deer", 2),
+    ("Aleppo pine", 2),
+    ("Cuvier's gazelle", 3),
+    ("Striped hyena", 3),
+    ("Cory's shearwater", 4),
+    ("Fennec fox", 5),
+    ("Addax", 5),
+    ("Dorcas gazelle", 5),
+    ("Sand cat", 5),
+]
+# (username, role); the admin is user 1
+USERS = [("admin", "admin"), ("ranger", "visitor")]
+
+
+def seed(db) -> None:
+    for name, latitude, longitude, images in PARKS:
+        crud.create_park(db, schemas.ParkCreate(
+            name=name,
+            description=f"{name} national park",
+            location=schemas.Location(latitude=latitude, longitude=longitude),
+            images=[f"https://example.com/{name.lower()}{i}.jpg" for i in range(images)],
+        ))
+    for name, park_id in SPECIES:
+        crud.create_species(db, schemas.SpeciesCreate(name=name, park_id=park_id, description=f"{name} of park {park_id}"))
+    hashed = hashing.hash_password_sync(PASSWORD)
+    for username, role in USERS:
+        user = crud.create_user(db, schemas.UserCreate(username=username, password=PASSWORD), hashed)
+        crud.update_user_role(db, user.id, role)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    # As app.db.create_schema does: the models' tables, then the migrations' indexes, search and stats
+    models.Base.metadata.create_all(bind=engine)
+    migrations.migrate(engine)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        seed(db)
+    return factory
+
+
+@pytest.fixture
+def async_session_factory(engine):
+    async_engine = create_async_db_engine(str(engine.url))
+    try:
+        yield async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    finally:
+        asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def client(session_factory, async_session_factory, monkeypatch):
+    monkeypatch.setattr(ratelimit.limiter, "backend", None)
+    monkeypatch.setattr(response_cache, "backend", None)
+
+    def _get_db():
+        with session_factory() as db:
+            yield db
+
+    async def _get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_async_db] = _get_async_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def admin_headers():
+    return {"Authorization": "Bearer " + create_access_token({"sub": "admin"})}
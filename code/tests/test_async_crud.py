@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+
+from app import async_crud, crud
+from app.main import app
+
+
+def test_async_reads_match_the_sync_crud(async_session_factory, session_factory):
+    async def read():
+        async with async_session_factory() as db:
+            return await async_crud.get_park_rows(db, limit=10), await async_crud.get_species_by_park(db, 5)
+
+    parks, species = asyncio.run(read())
+    with session_factory() as db:
+        assert parks == crud.get_park_rows(db, limit=10)
+        assert [s.id for s in species] == [s.id for s in crud.get_species_by_park(db, 5)]
+
+
+def test_concurrent_requests_share_one_event_loop(client, admin_headers):
+    # client installs the database overrides; requests here go through the ASGI app on this loop
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as http:
+            reads = [http.get(f"/parks/{park_id}") for park_id in range(1, 6)] * 4
+            writes = [
+                http.post("/species/", json={"name": f"Concurrent {i}", "park_id": 1}, headers=admin_headers)
+                for i in range(5)
+            ]
+            return await asyncio.gather(*reads, *writes)
+
+    responses = asyncio.run(run())
+    assert [response.status_code for response in responses] == [200] * 20 + [201] * 5
+    assert len({response.json()["id"] for response in responses[20:]}) == 5
+    names = [species["name"] for species in client.get("/species/parks/1/species").json()]
+    assert sum(name.startswith("Concurrent") for name in names) == 5
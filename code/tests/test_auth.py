@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import event
+
+from app import config
+from app.auth import create_access_token
+from app.user_cache import user_cache
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(config, "AUTH_MODE", "stateless")
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def _bearer(**claims):
+    return {"Authorization": "Bearer " + create_access_token(claims)}
+
+
+def _user_lookups(engine, request):
+    lookups = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            lookups.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = request()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return response, len(lookups)
+
+
+def test_stateless_tokens_skip_the_user_lookup(client, stateless, async_session_factory):
+    headers = _bearer(sub="admin", uid=1, role="admin")
+    async_engine = async_session_factory.kw["bind"].sync_engine
+    response, lookups = _user_lookups(async_engine, lambda: client.get("/users/me", headers=headers))
+    assert response.status_code == 200
+    assert response.json()["role"] == "admin"
+    assert lookups == 0
+    # Tokens without the claims fall back to the database, once the cached principal is gone
+    user_cache.clear()
+    response, lookups = _user_lookups(async_engine, lambda: client.get("/users/me", headers=_bearer(sub="admin")))
+    assert response.status_code == 200
+    assert lookups == 1
+
+
+def test_role_change_outdates_the_claims_of_earlier_tokens(client, admin_headers, stateless):
+    ranger = _bearer(sub="ranger", uid=2, role="visitor")
+    species = {"name": "Promoted", "park_id": 1}
+    assert client.post("/species/", json=species, headers=ranger).status_code == 403
+    assert client.put("/users/2/role", params={"role": "admin"}, headers=admin_headers).status_code == 200
+    assert client.post("/species/", json=species, headers=ranger).status_code == 201
+
+
+def test_logout_revokes_the_token(client, stateless):
+    headers = _bearer(sub="ranger", uid=2, role="visitor")
+    assert client.get("/users/me", headers=headers).status_code == 200
+    assert client.post("/users/logout", headers=headers).status_code == 204
+    assert client.get("/users/me", headers=headers).status_code == 401
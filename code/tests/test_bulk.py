@@ -0,0 +1,41 @@
+import json
+
+from app import ratelimit
+
+CSV = (
+    "name,scientific_name,park_id,description\n"
+    "Fennec fox,Vulpes zerda,1,Desert fox\n"
+    "Barbary stag,Cervus elaphus barbarus,2,Red deer,unexpected\n"
+    "Dorcas gazelle,Gazella dorcas\n"
+)
+
+
+def test_csv_rows_with_the_wrong_field_count_are_rejected(client, admin_headers):
+    response = client.post(
+        "/species/bulk", content=CSV, headers=dict(admin_headers, **{"Content-Type": "text/csv"})
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["inserted"], report["failed"]) == (1, 2)
+    assert report["errors"] == [
+        {"line": 3, "errors": ["Expected 4 fields, got 5"]},
+        {"line": 4, "errors": ["Expected 4 fields, got 2"]},
+    ]
+
+
+def test_export_streams_every_park(client, admin_headers):
+    response = client.get("/parks/export", headers=admin_headers)
+    assert response.status_code == 200
+    parks = [json.loads(line) for line in response.text.splitlines()]
+    assert [park["id"] for park in parks] == [1, 2, 3, 4, 5]
+    assert len(parks[0]["images"]) == 2
+
+
+def test_export_needs_a_signed_in_user_and_is_rate_limited(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(ratelimit.limiter, "backend", ratelimit.MemoryBackend())
+    monkeypatch.setitem(ratelimit.limiter.rules, "export_user", ratelimit.Rule(1, 60))
+    assert client.get("/species/export").status_code == 401
+    assert client.get("/species/export", params={"format": "csv"}, headers=admin_headers).status_code == 200
+    response = client.get("/species/export", headers=admin_headers)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
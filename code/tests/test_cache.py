@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.cache import MemoryBackend, RedisBackend, response_cache
+
+
+class RecordingRedis:
+    """
+    Dict-backed stand-in for redis.Redis that notes whether each call ran on an event loop.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.calls_on_loop = 0
+        self.calls = 0
+
+    def _record(self):
+        self.calls += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.calls_on_loop += 1
+
+    def get(self, key):
+        self._record()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._record()
+        self.data[key] = value
+
+    def incr(self, key):
+        self._record()
+        self.data[key] = int(self.data.get(key) or 0) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend())
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = RecordingRedis()
+    monkeypatch.setattr(response_cache, "backend", RedisBackend(client))
+    return client
+
+
+def test_conditional_get_answers_304_with_the_same_etag(client, memory_cache):
+    first = client.get("/parks/1")
+    etag = first.headers["etag"]
+    second = client.get("/parks/1", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+
+
+def test_write_invalidates_cached_reads(client, admin_headers, memory_cache):
+    etag = client.get("/parks/").headers["etag"]
+    park = {"name": "Renamed", "description": "d", "location": {"latitude": 37.0, "longitude": 9.0}}
+    assert client.put("/parks/1", json=park, headers=admin_headers).status_code == 200
+    response = client.get("/parks/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Renamed"
+
+
+def test_redis_backend_is_called_off_the_event_loop(client, admin_headers, redis_client):
+    assert client.get("/parks/1").status_code == 200
+    assert client.get("/parks/1").status_code == 200
+    park = {"name": "Renamed", "description": "d", "location": {"latitude": 37.0, "longitude": 9.0}}
+    assert client.put("/parks/1", json=park, headers=admin_headers).status_code == 200
+    # The version bump lands before the write returns, so the next read is not stale
+    assert client.get("/parks/1").json()["name"] == "Renamed"
+    assert redis_client.data["parks-api:version:parks"] == 1
+    assert redis_client.calls > 0
+    assert redis_client.calls_on_loop == 0
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+
+from app import changelog, crud, schemas
+
+
+class RecordingSession:
+    def __init__(self, dialect: str):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name=dialect))
+        self.statements = []
+
+    def get_bind(self):
+        return self.bind
+
+    def execute(self, statement, parameters=None):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+
+def test_record_takes_the_advisory_lock_on_postgresql():
+    db = RecordingSession("postgresql")
+    changelog.record(db, changelog.PARK, [1, 2])
+    assert len(db.statements) == 2
+    assert "pg_advisory_xact_lock" in db.statements[0]
+    assert db.statements[1].startswith("INSERT INTO change_log")
+
+
+def test_record_takes_no_lock_on_sqlite():
+    db = RecordingSession("sqlite")
+    changelog.record(db, changelog.PARK, [1])
+    assert len(db.statements) == 1
+    changelog.record(db, changelog.PARK, [])
+    assert len(db.statements) == 1
+
+
+def _park(name: str, images=None) -> schemas.ParkCreate:
+    return schemas.ParkCreate(
+        name=name, description="d", location=schemas.Location(latitude=36.0, longitude=10.0), images=images
+    )
+
+
+def _species(name: str, park_id: int) -> schemas.SpeciesCreate:
+    return schemas.SpeciesCreate(name=name, park_id=park_id, description="d")
+
+
+WRITES = {
+    "create_park": lambda db: crud.create_park(db, _park("New", ["https://example.com/new.jpg"])),
+    "bulk_create_parks": lambda db: crud.bulk_create_parks(db, [{"name": "Bulk", "description": "d", "latitude": 1.0, "longitude": 2.0}]),
+    "update_park": lambda db: crud.update_park(db, 1, _park("Renamed", ["https://example.com/renamed.jpg"])),
+    "delete_park": lambda db: crud.delete_park(db, 2),
+    "add_park_image": lambda db: crud.add_park_image(db, 3, schemas.ParkImageCreate(url="https://example.com/added.jpg")),
+    "delete_park_image": lambda db: crud.delete_park_image(db, 1, 1),
+    "create_species": lambda db: crud.create_species(db, _species("New", 3)),
+    "bulk_create_species": lambda db: crud.bulk_create_species(db, [{"name": "Bulk", "park_id": 3, "description": "d"}]),
+    "update_species": lambda db: crud.update_species(db, 6, _species("Moved", 4)),
+    "delete_species": lambda db: crud.delete_species(db, 7),
+}
+
+
+@pytest.mark.parametrize("write", WRITES.values(), ids=WRITES.keys())
+def test_writes_take_the_log_lock_before_writing(write, engine, session_factory, monkeypatch):
+    events = []
+    monkeypatch.setattr(changelog, "lock", lambda db: events.append("lock"))
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.split(None, 1)[0].upper() in ("INSERT", "UPDATE", "DELETE"):
+            events.append("write")
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with session_factory() as db:
+            write(db)
+            db.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert events[0] == "lock"
+    assert "write" in events
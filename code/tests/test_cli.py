@@ -0,0 +1,42 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app import cli, db as app_db, migrations, models
+from app.db import create_db_engine
+
+
+def _park_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(models.Park)).scalar_one()
+
+
+def test_init_migrates_and_seeds_once(tmp_path, monkeypatch, capsys):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'cli.db'}")
+    monkeypatch.setattr(app_db, "engine", engine)
+    monkeypatch.setattr(app_db, "SessionLocal", sessionmaker(autoflush=False, bind=engine))
+    try:
+        assert cli.main(["status"]) == 1
+        assert "not initialised" in capsys.readouterr().out
+        assert cli.main(["init"]) == 0
+        seeded = _park_count(engine)
+        assert seeded > 0
+        assert cli.main(["status"]) == 0
+        latest = migrations.latest_version()
+        assert f"schema version: {latest} of {latest}" in capsys.readouterr().out
+        # Seeding an already seeded database is a no-op
+        assert cli.main(["seed"]) == 0
+        assert _park_count(engine) == seeded
+    finally:
+        engine.dispose()
+
+
+def test_readiness_follows_the_schema_version(client, engine):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "schema_version": migrations.latest_version()}
+    with engine.begin() as conn:
+        conn.execute(delete(migrations.schema_version).where(
+            migrations.schema_version.c.version == migrations.latest_version()
+        ))
+    assert client.get("/health/ready").status_code == 503
+    assert client.get("/health/live").status_code == 200
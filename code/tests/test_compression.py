@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+
+from app import compression
+from app.cache import MemoryBackend, response_cache
+
+
+def test_fields_trim_each_row_to_the_requested_keys(client):
+    parks = client.get("/parks/", params={"fields": "name,location"}).json()
+    assert [sorted(park) for park in parks] == [["id", "location", "name"]] * 5
+    species = client.get("/species/", params={"fields": "name", "limit": 2}).json()
+    assert species == [{"id": 1, "name": "Golden wolf"}, {"id": 2, "name": "Barbary macaque"}]
+    assert client.get("/parks/", params={"fields": "name,secret"}).status_code == 400
+    # Embedded data can be selected once it is included
+    assert client.get("/parks/", params={"fields": "species"}).status_code == 400
+    embedded = client.get("/parks/", params={"fields": "species_count", "include": "species"}).json()
+    assert [park["species_count"] for park in embedded] == [3, 2, 2, 1, 4]
+
+
+def test_large_responses_are_gzipped_and_small_ones_not(client):
+    large = client.get("/parks/", params={"include": "species"}, headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Accept-Encoding"
+    assert len(large.json()) == 5
+    small = client.get("/parks/3", params={"fields": "name"}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+    identity = client.get("/parks/", params={"include": "species"}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == large.json()
+
+
+def test_compressed_responses_revalidate_with_their_weak_etag(client, monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend())
+    headers = {"Accept-Encoding": "gzip"}
+    etag = client.get("/parks/", params={"include": "species"}, headers=headers).headers["etag"]
+    assert etag.startswith('W/"')
+    response = client.get("/parks/", params={"include": "species"}, headers=dict(headers, **{"If-None-Match": etag}))
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0, *", None if compression.brotli is None else "br"),
+    ("*;q=0", None),
+    ("identity", None),
+    ("GZIP;q=0.5", "gzip"),
+])
+def test_choose_encoding_honours_exclusions(header, expected):
+    assert compression.choose_encoding(header) == expected
+
+
+def test_compress_body_round_trips():
+    body = b'{"name": "Ichkeul"}' * 100
+    assert gzip.decompress(compression.compress_body(body, "gzip")) == body
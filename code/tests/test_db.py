@@ -0,0 +1,36 @@
+import asyncio
+
+from sqlalchemy import text
+
+from app import config
+from app.db import to_async_url
+
+PRAGMAS = ("journal_mode", "synchronous", "busy_timeout", "cache_size")
+SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+
+
+def _pragmas(conn):
+    return {name: conn.execute(text(f"PRAGMA {name}")).scalar() for name in PRAGMAS}
+
+
+def test_every_connection_gets_the_sqlite_pragmas(engine, async_session_factory):
+    expected = {
+        "journal_mode": config.SQLITE_JOURNAL_MODE.lower(),
+        "synchronous": SYNCHRONOUS[config.SQLITE_SYNCHRONOUS.upper()],
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -config.SQLITE_CACHE_SIZE_KB,
+    }
+    with engine.connect() as conn:
+        assert _pragmas(conn) == expected
+
+    async def async_pragmas():
+        async with async_session_factory() as db:
+            return await db.run_sync(lambda session: _pragmas(session.connection()))
+
+    assert asyncio.run(async_pragmas()) == expected
+
+
+def test_async_url_maps_to_the_async_driver():
+    assert to_async_url("sqlite:///./parks.db") == "sqlite+aiosqlite:///./parks.db"
+    assert to_async_url("postgresql://u:p@db/parks") == "postgresql+asyncpg://u:p@db/parks"
+    assert to_async_url("postgresql+psycopg2://u:p@db/parks") == "postgresql+asyncpg://u:p@db/parks"
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from app.geo import GridIndex, haversine_km, park_locator
+
+
+@pytest.fixture(autouse=True)
+def fresh_locator():
+    # The index is process-wide; rebuild it from each test's own database
+    park_locator.invalidate()
+
+
+def _nearby(client, **params):
+    response = client.get("/parks/nearby", params=params)
+    assert response.status_code == 200
+    return [(park["id"], park["distance_km"]) for park in response.json()]
+
+
+def test_nearby_parks_come_nearest_first_within_the_radius(client):
+    parks = _nearby(client, lat=37.1, lon=9.7, radius_km=100)
+    assert [park_id for park_id, _ in parks] == [1, 2, 4]
+    distances = [distance for _, distance in parks]
+    assert distances == sorted(distances) and distances[-1] <= 100
+    assert _nearby(client, lat=37.1, lon=9.7, radius_km=100, limit=2) == parks[:2]
+    assert _nearby(client, lat=37.1, lon=9.7, radius_km=1) == []
+
+
+def test_nearby_sees_a_park_created_after_the_index_was_built(client, admin_headers):
+    assert _nearby(client, lat=34.0, lon=8.0, radius_km=20) == []
+    park = {"name": "New", "description": "d", "location": {"latitude": 34.05, "longitude": 8.05}}
+    created = client.post("/parks/", json=park, headers=admin_headers).json()
+    assert [park_id for park_id, _ in _nearby(client, lat=34.0, lon=8.0, radius_km=20)] == [created["id"]]
+
+
+def test_nearby_rejects_out_of_range_coordinates(client):
+    assert client.get("/parks/nearby", params={"lat": 91, "lon": 0}).status_code == 422
+
+
+@pytest.mark.parametrize("lat, lon", [(0.0, 0.0), (36.8, 10.2), (-12.5, 179.9), (89.5, -40.0)])
+def test_grid_matches_a_brute_force_search(lat, lon):
+    rng = random.Random(7)
+    # More points than the brute-force cutoff, so the ring walk is what is checked
+    points = [(i, rng.uniform(-90, 90), rng.uniform(-180, 180)) for i in range(6000)]
+    index = GridIndex(points)
+    for radius_km, limit in ((300.0, 5), (1500.0, 20), (5000.0, 50)):
+        expected = sorted(
+            (haversine_km(lat, lon, plat, plon), point_id) for point_id, plat, plon in points
+            if haversine_km(lat, lon, plat, plon) <= radius_km
+        )[:limit]
+        assert index.nearby(lat, lon, radius_km, limit) == expected
@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+from passlib.context import CryptContext
+from sqlalchemy import select, update
+
+from app import hashing, models
+from tests.conftest import PASSWORD
+
+
+def _stored_hash(session_factory, username):
+    with session_factory() as db:
+        return db.scalar(select(models.User.password).where(models.User.username == username))
+
+
+def test_login_rehashes_a_password_stored_at_another_cost(client, session_factory):
+    old = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash(PASSWORD)
+    with session_factory() as db:
+        db.execute(update(models.User).where(models.User.username == "ranger").values(password=old))
+        db.commit()
+    response = client.post("/users/login", data={"username": "ranger", "password": PASSWORD})
+    assert response.status_code == 200
+    upgraded = _stored_hash(session_factory, "ranger")
+    assert upgraded != old
+    assert not hashing.get_context().needs_update(upgraded)
+    assert hashing.verify_and_update_sync(PASSWORD, upgraded) == (True, None)
+
+
+def test_hash_pool_rejects_past_its_queue_limit():
+    pool = hashing.HashPool(workers=0, max_concurrency=1, queue_limit=1)
+
+    async def run():
+        return await asyncio.gather(*(pool.run(time.sleep, 0.1) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [type(None), type(None), hashing.HashPoolBusy]
+    assert (pool.stats["completed"], pool.stats["rejected"]) == (2, 1)
@@ -0,0 +1,44 @@
+import time
+import uuid
+
+from sqlalchemy import insert, update
+
+from app import invalidation, models
+from app.cache import MemoryBackend, response_cache
+from app.user_cache import revoked_tokens
+
+
+def _publish_elsewhere(engine, kind, key, expires_in=0.0):
+    # What another worker's commit leaves behind: the row, without this process's after_commit hook
+    now = time.time()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Invalidation).values(kind=kind, key=key, created_at=now, expires_at=now + expires_in))
+
+
+def test_poll_drops_responses_another_worker_made_stale(client, engine, session_factory, monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend())
+    poller = invalidation.InvalidationPoller(interval=0)
+    with session_factory() as db:
+        poller.poll(db)
+    assert client.get("/parks/1").json()["name"] == "Ichkeul"
+    with engine.begin() as conn:
+        conn.execute(update(models.Park).where(models.Park.id == 1).values(name="Renamed elsewhere"))
+    _publish_elsewhere(engine, invalidation.NAMESPACE, "parks")
+    # Still served from this worker's cache until it polls
+    assert client.get("/parks/1").json()["name"] == "Ichkeul"
+    with session_factory() as db:
+        assert poller.poll(db) == 1
+        assert poller.poll(db) == 0
+    assert client.get("/parks/1").json()["name"] == "Renamed elsewhere"
+
+
+def test_a_new_worker_replays_only_live_revocations(engine, session_factory):
+    live, expired = uuid.uuid4().hex, uuid.uuid4().hex
+    _publish_elsewhere(engine, invalidation.TOKEN, live, expires_in=600)
+    _publish_elsewhere(engine, invalidation.TOKEN, expired, expires_in=-1)
+    _publish_elsewhere(engine, invalidation.NAMESPACE, "parks")
+    poller = invalidation.InvalidationPoller(interval=0)
+    with session_factory() as db:
+        poller.poll(db)
+    assert revoked_tokens.is_revoked(live)
+    assert not revoked_tokens.is_revoked(expired)
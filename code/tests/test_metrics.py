@@ -0,0 +1,42 @@
+import re
+
+from app import metrics
+
+
+def _sample(client, series: str) -> float:
+    match = re.search(rf"^{re.escape(series)} (\S+)$", client.get("/metrics").text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_are_counted_by_route_template(client):
+    series = 'http_requests_total{method="GET",route="/parks/{park_id}",status="200"}'
+    before = _sample(client, series)
+    client.get("/parks/1")
+    client.get("/parks/2")
+    assert _sample(client, series) == before + 2
+    unmatched = 'http_requests_total{method="GET",route="unmatched",status="404"}'
+    before = _sample(client, unmatched)
+    client.get("/no/such/path")
+    assert _sample(client, unmatched) == before + 1
+
+
+def test_server_timing_reports_the_requests_statements(client, async_session_factory, monkeypatch):
+    # instrument_engine adds a scrape-time collector; keep it to this test
+    monkeypatch.setattr(metrics.registry, "_collectors", list(metrics.registry._collectors))
+    metrics.instrument_engine(async_session_factory.kw["bind"].sync_engine, "test")
+    timing = client.get("/parks/1").headers["server-timing"]
+    assert re.fullmatch(r'db;dur=[0-9.]+;desc="[1-9][0-9]* queries"', timing)
+    assert 'db_pool_connections{pool="test",state="idle"}' in client.get("/metrics").text
+
+
+def test_histograms_render_cumulative_buckets():
+    histogram = metrics.Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe("/parks/", value=value)
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/parks/",le="0.1"} 1',
+        'latency_seconds_bucket{route="/parks/",le="1.0"} 3',
+        'latency_seconds_bucket{route="/parks/",le="+Inf"} 4',
+        'latency_seconds_sum{route="/parks/"} 4.25',
+        'latency_seconds_count{route="/parks/"} 4',
+    ]
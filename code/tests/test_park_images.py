@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app import models
+
+LONG_AGO = datetime(2000, 1, 1)
+
+
+def _age_park(session_factory, park_id):
+    with session_factory() as db:
+        db.execute(update(models.Park).where(models.Park.id == park_id).values(updated_at=LONG_AGO))
+        db.commit()
+
+
+def _updated_ids(client):
+    response = client.get("/parks/", params={"updated_since": "2001-01-01T00:00:00Z", "fields": "id"})
+    return {park["id"] for park in response.json()}
+
+
+def test_adding_an_image_bumps_park_updated_at(client, session_factory, admin_headers):
+    for park_id in range(1, 6):
+        _age_park(session_factory, park_id)
+    assert _updated_ids(client) == set()
+    response = client.post("/parks/2/images", json={"url": "https://example.com/new.jpg"}, headers=admin_headers)
+    assert response.status_code == 201
+    assert _updated_ids(client) == {2}
+
+
+def test_deleting_an_image_bumps_park_updated_at(client, session_factory, admin_headers):
+    image_id = client.get("/parks/1/images").json()[0]["id"]
+    for park_id in range(1, 6):
+        _age_park(session_factory, park_id)
+    response = client.delete(f"/parks/1/images/{image_id}", headers=admin_headers)
+    assert response.status_code == 204
+    assert _updated_ids(client) == {1}
+
+
+def test_image_for_missing_park_is_404(client, admin_headers):
+    response = client.post("/parks/999/images", json={"url": "https://example.com/x.jpg"}, headers=admin_headers)
+    assert response.status_code == 404
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import config, crud, schemas
+
+
+@contextmanager
+def count_statements(async_session_factory):
+    engine = async_session_factory.kw["bind"].sync_engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_include_species_runs_the_same_statements_at_any_page_size(client, async_session_factory):
+    counts = {}
+    for limit in (2, 5):
+        with count_statements(async_session_factory) as statements:
+            response = client.get("/parks/", params={"limit": limit, "include": "species"})
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = len(statements)
+    assert 0 < counts[2] == counts[5]
+
+
+def test_include_species_embeds_each_parks_species(client):
+    parks = client.get("/parks/", params={"include": "species"}).json()
+    assert [park["species_count"] for park in parks] == [3, 2, 2, 1, 4]
+    assert [species["name"] for species in parks[1]["species"]] == ["Barbary deer", "Aleppo pine"]
+    assert client.get("/parks/", params={"include": "weather"}).status_code == 400
+
+
+def _walk(client, path, limit, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = client.get(path, params=dict(params, limit=limit, **({"cursor": cursor} if cursor else {})))
+        assert response.status_code == 200
+        ids += [row["id"] for row in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, pages
+
+
+def test_cursor_pages_through_every_park_once(client):
+    assert _walk(client, "/parks/", 2) == ([1, 2, 3, 4, 5], 3)
+    assert _walk(client, "/species/", 4) == (list(range(1, 13)), 4)
+
+
+def test_cursor_skips_rows_deleted_behind_it(client, admin_headers):
+    first = client.get("/parks/", params={"limit": 2})
+    assert client.delete("/parks/1", headers=admin_headers).status_code == 204
+    rest = client.get("/parks/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [park["id"] for park in rest.json()] == [3, 4]
+
+
+def test_malformed_cursor_is_rejected(client):
+    assert client.get("/parks/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_park_reads_match_the_schema_and_the_stored_rows(client, session_factory):
+    # The handlers build JSON straight from column rows, without going through the schema
+    parks = client.get("/parks/").json()
+    assert [schemas.Park.model_validate(park).model_dump(mode="json") for park in parks] == parks
+    with session_factory() as db:
+        stored = crud.get_parks(db)
+        assert [
+            (park["name"], park["location"], [image["url"] for image in park["images"]]) for park in parks
+        ] == [
+            (park.name, {"latitude": park.latitude, "longitude": park.longitude}, [image.url for image in park.images])
+            for park in stored
+        ]
+    assert client.get("/parks/2").json() == parks[1]
+    assert client.get("/parks/99").status_code == 404
+
+
+def test_ids_come_back_in_request_order_with_the_missing_listed(client):
+    response = client.get("/parks/", params={"ids": "4,99,2,4,1,77"})
+    assert response.status_code == 200
+    assert [park["id"] for park in response.json()] == [4, 2, 1]
+    assert response.headers["X-Missing-Ids"] == "99,77"
+    assert "X-Next-Cursor" not in response.headers
+    species = client.get("/species/", params={"ids": "12,1"})
+    assert [row["id"] for row in species.json()] == [12, 1]
+    assert "X-Missing-Ids" not in species.headers
+
+
+def test_malformed_or_oversized_id_lists_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(config, "BATCH_MAX_IDS", 3)
+    assert client.get("/parks/", params={"ids": "1,two"}).status_code == 400
+    assert client.get("/parks/", params={"ids": ","}).status_code == 400
+    assert client.get("/species/", params={"ids": "1,2,3,4"}).status_code == 400
@@ -0,0 +1,99 @@
+"""
+Query-plan regression check: the hot crud reads must be answered through an index or the
+primary key, never a full table scan, on a database whose indexes came from the migrations.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app import changelog, crud, migrations, models, stats
+from app.db import create_db_engine
+from tests.conftest import seed
+
+# (label, crud call) pairs; each must be answered through an index or the primary key
+HOT_QUERIES = {
+    "get_park_row": lambda db: crud.get_park_row(db, 5),
+    "get_park_rows after cursor": lambda db: crud.get_park_rows(db, limit=50, after_id=2),
+    "get_park_rows_by_ids": lambda db: crud.get_park_rows_by_ids(db, [1, 2, 3]),
+    "get_images_for_parks": lambda db: crud.get_images_for_parks(db, [1, 2, 3]),
+    "get_species_by_park": lambda db: crud.get_species_by_park(db, 5),
+    "get_species after cursor": lambda db: crud.get_species(db, limit=50, after_id=2),
+    "get_species_for_parks": lambda db: crud.get_species_for_parks(db, [1, 2, 3], 10),
+    "changelog.read": lambda db: changelog.read(db, 2, 500),
+    "get_park_rows updated_since": lambda db: crud.get_park_rows(db, limit=50, updated_since=datetime(2100, 1, 1)),
+    "stats.for_park": lambda db: stats.for_park(db, 5),
+    "stats.top_parks": lambda db: stats.top_parks(db, 10),
+    "get_recent_species for a park": lambda db: crud.get_recent_species(db, 10, park_id=5),
+    "get_user_by_username": lambda db: crud.get_user_by_username(db, "ranger"),
+    "species by name": lambda db: db.execute(select(models.Species).where(models.Species.name == "Addax")).all(),
+    "parks by name": lambda db: db.execute(select(models.Park).where(models.Park.name == "Chambi")).all(),
+}
+
+
+def is_full_scan(detail: str) -> bool:
+    # "SCAN species" is a table scan; "SCAN species USING [COVERING] INDEX ..." walks an index
+    # and "SCAN (subquery-N)" / "SCAN anon_1" read intermediate results, not tables
+    words = detail.split()
+    return len(words) == 2 and words[0] == "SCAN" and words[1] in models.Base.metadata.tables
+
+
+def explain(db, run):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    plans = []
+    for statement, parameters in captured:
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, [row[3] for row in cursor.fetchall()]))
+        finally:
+            cursor.close()
+    return plans
+
+
+@pytest.fixture
+def migrated_session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    # Drop the model-declared indexes so the check covers what migrations give existing databases
+    with engine.begin() as conn:
+        for name in ("ix_species_park_id_id", "ix_species_name", "ix_parks_name"):
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    migrations.migrate(engine)
+    factory = sessionmaker(autoflush=False, bind=engine)
+    with factory() as db:
+        seed(db)
+    # No ANALYZE: on tables of a dozen rows the planner would rightly prefer a scan, while
+    # without statistics it takes whatever index serves the query, which is what is checked
+    try:
+        yield factory
+    finally:
+        engine.dispose()
+
+
+@pytest.mark.parametrize("run", HOT_QUERIES.values(), ids=HOT_QUERIES.keys())
+def test_hot_query_uses_an_index(run, migrated_session_factory):
+    with migrated_session_factory() as db:
+        plans = explain(db, run)
+    assert plans
+    for statement, details in plans:
+        scans = [detail for detail in details if is_full_scan(detail)]
+        assert not scans, f"{'; '.join(details)}\n{' '.join(statement.split())}"
+
+
+def test_is_full_scan_tells_table_scans_from_index_walks():
+    assert is_full_scan("SCAN parks")
+    assert not is_full_scan("SCAN species USING INDEX ix_species_park_id_id")
+    assert not is_full_scan("SEARCH parks USING INTEGER PRIMARY KEY (rowid=?)")
+    assert not is_full_scan("SCAN anon_1")
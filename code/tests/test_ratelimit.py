@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app import ratelimit
+from tests.conftest import PASSWORD
+
+
+class RecordingRedis:
+    """
+    Stand-in for redis.Redis whose token bucket always has room, noting calls made on an event loop.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.calls_on_loop = 0
+
+    def eval(self, script, numkeys, *args):
+        self.calls += 1
+        try:
+            asyncio.get_running_loop()
+            self.calls_on_loop += 1
+        except RuntimeError:
+            pass
+        return "0"
+
+
+def _login(client, password=PASSWORD):
+    return client.post("/users/login", data={"username": "ranger", "password": password})
+
+
+def test_login_past_the_limit_gets_429_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(ratelimit.limiter, "backend", ratelimit.MemoryBackend())
+    monkeypatch.setitem(ratelimit.limiter.rules, "login_user", ratelimit.Rule(2, 60))
+    assert _login(client, "wrong").status_code == 401
+    assert _login(client).status_code == 200
+    response = _login(client)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+
+
+def test_redis_backend_is_called_off_the_event_loop(client, admin_headers, monkeypatch):
+    redis = RecordingRedis()
+    monkeypatch.setattr(ratelimit.limiter, "backend", ratelimit.RedisBackend(redis))
+    assert _login(client).status_code == 200
+    species = {"name": "Barn owl", "park_id": 1}
+    assert client.post("/species/", json=species, headers=admin_headers).status_code == 201
+    assert redis.calls == 3
+    assert redis.calls_on_loop == 0
+
+
+def test_admission_control_sheds_past_the_queue_with_503():
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    admitted = ratelimit.AdmissionMiddleware(app, max_concurrency=1, queue_limit=1, queue_timeout=5)
+
+    async def burst():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(admitted), base_url="http://test") as http:
+            return await asyncio.gather(*(http.get("/slow") for _ in range(4)))
+
+    responses = asyncio.run(burst())
+    assert sorted(response.status_code for response in responses) == [200, 200, 503, 503]
+    assert all(response.headers["retry-after"] for response in responses if response.status_code == 503)
@@ -0,0 +1,47 @@
+import asyncio
+import sqlite3
+import time
+from contextlib import closing
+
+import pytest
+
+from app import db as app_db, replicas
+from app.db import create_async_db_engine
+
+
+@pytest.fixture
+def replica(engine, tmp_path, monkeypatch):
+    # A copy of the primary that has drifted, so responses show which database served them
+    path = tmp_path / "replica.db"
+    with closing(sqlite3.connect(engine.url.database)) as src, closing(sqlite3.connect(path)) as dst:
+        src.backup(dst)
+        dst.execute("UPDATE parks SET name = 'Replica copy' WHERE id = 1")
+        dst.commit()
+    replica = replicas.Replica("replica", create_async_db_engine(f"sqlite:///{path}"))
+    monkeypatch.setattr(app_db, "read_replicas", replicas.ReplicaSet([replica], interval=0))
+    yield replica
+    asyncio.run(replica.engine.dispose())
+
+
+def test_reads_go_to_a_healthy_replica_unless_the_client_just_wrote(client, replica):
+    assert client.get("/parks/1").json()["name"] == "Replica copy"
+    sticky = {"Cookie": f"{replicas.STICKY_COOKIE}={time.time() + 60}"}
+    assert client.get("/parks/1", headers=sticky).json()["name"] == "Ichkeul"
+    replica.mark(False)
+    assert client.get("/parks/1").json()["name"] == "Ichkeul"
+
+
+def test_health_check_measures_lag_and_takes_out_broken_replicas(
+    client, admin_headers, replica, async_session_factory, tmp_path
+):
+    species = {"name": "New", "park_id": 1}
+    assert client.post("/species/", json=species, headers=admin_headers).status_code == 201
+    asyncio.run(app_db.read_replicas.check(async_session_factory))
+    assert (replica.healthy, replica.lag) == (True, 1)
+    # An empty database: no change log to read
+    broken = replicas.Replica("broken", create_async_db_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+    try:
+        asyncio.run(replicas.ReplicaSet([broken]).check(async_session_factory))
+        assert (broken.healthy, broken.lag) == (False, None)
+    finally:
+        asyncio.run(broken.engine.dispose())
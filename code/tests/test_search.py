@@ -0,0 +1,35 @@
+from app import search
+
+
+def _names(rows):
+    return [row.name for row in rows]
+
+
+def test_search_finds_a_park_by_its_new_name_after_an_update(client, admin_headers):
+    response = client.put(
+        "/parks/3",
+        json={
+            "name": "Jugurtha Table",
+            "description": "Mesa in the Kef highlands",
+            "location": {"latitude": 35.2, "longitude": 8.66},
+        },
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert [(hit["type"], hit["id"]) for hit in client.get("/search", params={"q": "jugurtha"}).json()] == [("park", 3)]
+    assert client.get("/search", params={"q": "chambi", "type": "park"}).json() == []
+
+
+def test_search_matches_word_prefixes(client):
+    hits = client.get("/search", params={"q": "gaz", "type": "species"}).json()
+    assert {hit["name"] for hit in hits} == {"Cuvier's gazelle", "Dorcas gazelle"}
+    assert all("[" in hit["snippet"] for hit in hits)
+
+
+def test_like_fallback_matches_wildcards_literally(session_factory):
+    with session_factory() as db:
+        assert _names(search._search_like(db, "wolf", ("species",), 10, 0)) == ["Golden wolf"]
+        # Unescaped, each of these would match every row
+        for q in ("%", "_", "%o%"):
+            assert search._search_like(db, q, ("park", "species"), 100, 0) == []
+        assert search._search_like(db, "\\", ("park", "species"), 100, 0) == []
@@ -0,0 +1,43 @@
+from sqlalchemy import update
+
+from app import stats
+
+PARK = {"name": "Zaghouan", "description": "d", "location": {"latitude": 36.4, "longitude": 10.1}}
+
+
+def test_stats_stay_exact_through_every_kind_of_write(client, admin_headers, session_factory):
+    park = client.post("/parks/", json=dict(PARK, images=["https://example.com/a.jpg"]), headers=admin_headers).json()
+    writes = [
+        client.post(f"/parks/{park['id']}/images", json={"url": "https://example.com/b.jpg"}, headers=admin_headers),
+        client.delete("/parks/1/images/1", headers=admin_headers),
+        client.put("/parks/2", json=dict(PARK, images=[]), headers=admin_headers),
+        client.post("/species/", json={"name": "Barbary lion", "park_id": park["id"]}, headers=admin_headers),
+        client.put("/species/1", json={"name": "Golden wolf", "park_id": 3}, headers=admin_headers),
+        client.delete("/species/12", headers=admin_headers),
+        client.delete("/parks/4", headers=admin_headers),
+        client.post(
+            "/species/bulk",
+            content='{"name": "Imported", "park_id": 5}\n{"name": "Imported too", "park_id": 3}\n',
+            headers=dict(admin_headers, **{"Content-Type": "application/x-ndjson"}),
+        ),
+    ]
+    assert all(response.status_code < 300 for response in writes), [r.status_code for r in writes]
+    with session_factory() as db:
+        assert stats.check(db) == {"counters": {}, "parks": 0}
+    body = client.get("/stats", params={"recent": 0}).json()
+    assert (body["parks"], body["species"], body["park_images"]) == (5, 14, 3)
+    assert client.get("/species/", params={"limit": 1}).headers["X-Total-Count"] == "14"
+    top = {row["park_id"]: row["species_count"] for row in body["top_parks"]}
+    assert top == {1: 2, 2: 2, 3: 4, 5: 4, park["id"]: 1}
+
+
+def test_rebuild_repairs_drift_that_check_reports(session_factory):
+    with session_factory() as db:
+        db.execute(update(stats.counters).where(stats.counters.c.name == stats.SPECIES).values(value=99))
+        db.execute(update(stats.park_stats).where(stats.park_stats.c.park_id == 1).values(species_count=0))
+        db.commit()
+        drift = stats.check(db)
+        assert drift == {"counters": {stats.SPECIES: {"stored": 99, "actual": 12}}, "parks": 1}
+        assert stats.rebuild(db) == drift
+        db.commit()
+        assert stats.check(db) == {"counters": {}, "parks": 0}
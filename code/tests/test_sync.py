@@ -0,0 +1,21 @@
+def test_first_sync_from_token_zero(client):
+    response = client.get("/sync", params={"since": "0"})
+    assert response.status_code == 200
+    body = response.json()
+    assert {change["type"] for change in body["changes"]} == {"park", "species"}
+    assert body == client.get("/sync").json()
+
+
+def test_sync_rejects_malformed_token(client):
+    assert client.get("/sync", params={"since": "not-a-token"}).status_code == 400
+
+
+def test_sync_resumes_from_next_token(client, admin_headers):
+    token = client.get("/sync", params={"limit": 1000}).json()["next"]
+    assert client.get("/sync", params={"since": token}).json()["changes"] == []
+    response = client.put(
+        "/species/1", json={"name": "Renamed", "park_id": 1, "description": "d"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    changes = client.get("/sync", params={"since": token}).json()["changes"]
+    assert [(change["type"], change["id"], change["data"]["name"]) for change in changes] == [("species", 1, "Renamed")]
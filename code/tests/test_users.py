@@ -0,0 +1,20 @@
+from starlette.testclient import TestClient
+
+from app import replicas
+from app.main import app
+
+
+def test_role_change_sets_the_read_your_writes_cookie(client, admin_headers):
+    # main.py only installs the middleware when replicas are configured
+    sticky = TestClient(replicas.ReadYourWritesMiddleware(app))
+    response = sticky.put("/users/2/role", params={"role": "visitor"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["role"] == "visitor"
+    assert replicas.STICKY_COOKIE in response.cookies
+
+
+def test_admins_page_through_users_by_cursor(client, admin_headers):
+    first = client.get("/users/", params={"limit": 1}, headers=admin_headers)
+    assert [user["username"] for user in first.json()] == ["admin"]
+    rest = client.get("/users/", params={"limit": 1, "cursor": first.headers["X-Next-Cursor"]}, headers=admin_headers)
+    assert [user["username"] for user in rest.json()] == ["ranger"]
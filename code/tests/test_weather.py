@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+
+from app.weather import WeatherClient
+
+PAYLOAD = {"main": {"temp": 21.5, "humidity": 40}, "weather": [{"description": "clear sky"}], "wind": {"speed": 3.1}}
+
+
+def _client(**kwargs) -> WeatherClient:
+    return WeatherClient(
+        base_url="http://weather.test/",
+        api_key="k",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=PAYLOAD)),
+        **kwargs,
+    )
+
+
+async def _fetch_all(client: WeatherClient, points) -> None:
+    try:
+        for latitude, longitude in points:
+            await client.get_weather(latitude, longitude)
+    finally:
+        await client.aclose()
+
+
+def test_cache_is_capped_least_recently_used_first():
+    client = _client(max_entries=2)
+    asyncio.run(_fetch_all(client, [(36.1, 10.1), (36.2, 10.2), (36.1, 10.1), (36.3, 10.3)]))
+    assert list(client._cache) == [(36.1, 10.1), (36.3, 10.3)]
+    assert client.upstream_calls == 3
+
+
+def test_entries_past_the_stale_window_are_dropped_on_write():
+    client = _client(ttl=0, stale_ttl=0)
+    asyncio.run(_fetch_all(client, [(36.1, 10.1), (36.2, 10.2), (36.3, 10.3)]))
+    assert list(client._cache) == [(36.3, 10.3)]
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from app import async_crud, crud, models, schemas, write_queue
+
+
+def _species(name: str) -> schemas.SpeciesCreate:
+    return schemas.SpeciesCreate(name=name, park_id=1, description="d")
+
+
+def _fail(db, commit: bool = True):
+    crud.create_species(db, _species("Rolled back"), commit=False)
+    raise ValueError("invalid write")
+
+
+def test_a_failing_write_is_replayed_apart_from_its_group(async_session_factory, session_factory):
+    queue = write_queue.WriteQueue(async_crud._write, interval=0.05)
+
+    async def run():
+        await queue.start(async_session_factory)
+        try:
+            return await asyncio.gather(
+                queue.submit(crud.create_species, _species("First")),
+                queue.submit(_fail),
+                queue.submit(crud.create_species, _species("Second")),
+                return_exceptions=True,
+            )
+        finally:
+            await queue.stop()
+
+    first, failed, second = asyncio.run(run())
+    assert isinstance(failed, ValueError)
+    assert (first.name, second.name) == ("First", "Second")
+    with session_factory() as db:
+        names = [species.name for species in crud.get_species(db, limit=100)]
+    assert names.count("First") == names.count("Second") == 1
+    assert "Rolled back" not in names
+
+
+def test_stop_commits_the_writes_already_queued(async_session_factory, session_factory):
+    queue = write_queue.WriteQueue(async_crud._write, interval=0.05)
+
+    async def run():
+        await queue.start(async_session_factory)
+        writes = [asyncio.ensure_future(queue.submit(crud.create_species, _species(f"Queued {i}"))) for i in range(3)]
+        await asyncio.sleep(0)
+        await queue.stop()
+        return [write.result().name for write in writes]
+
+    assert asyncio.run(run()) == ["Queued 0", "Queued 1", "Queued 2"]
+    with session_factory() as db:
+        assert db.query(models.Species).filter(models.Species.name.like("Queued %")).count() == 3
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def rollback(self):
+        pass
+
+
+def test_stop_fails_what_does_not_drain_in_time():
+    async def stuck(db, fn, group):
+        await asyncio.sleep(60)
+
+    queue = write_queue.WriteQueue(stuck, interval=0, max_batch=1, drain_timeout=0.05)
+
+    async def run():
+        await queue.start(_Session)
+        writes = [asyncio.ensure_future(queue.submit(crud.create_species, _species(f"Stuck {i}"))) for i in range(2)]
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        await queue.stop()
+        elapsed = time.perf_counter() - start
+        return elapsed, await asyncio.gather(*writes, return_exceptions=True)
+
+    elapsed, errors = asyncio.run(run())
+    assert elapsed < 1
+    assert [type(error) for error in errors] == [RuntimeError, RuntimeError]
+    assert not queue.running